@@ -0,0 +1,119 @@
+import asyncio
+import concurrent.futures
+import threading
+
+from src import package_root
+from src.Database import Database
+
+
+class RunningQuery:
+    """
+    Tracks the connection a query is running on, so that it can be interrupted
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.cancelled = False
+
+    def start(self, conn):
+        with self._lock:
+            if self.cancelled:
+                raise asyncio.CancelledError()
+            self._conn = conn
+
+    def finish(self):
+        with self._lock:
+            self._conn = None
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            # only while still running, the connection may be reused afterwards
+            if self._conn is not None:
+                self._conn.interrupt()
+
+
+class AsyncDatabase:
+    """
+    asyncio front end to a Database
+
+    Queries run on a bounded pool of `workers` threads, each with its own
+    pooled connection, so the event loop is never blocked on sqlite. A query
+    that is cancelled, or exceeds its timeout, is interrupted in sqlite
+
+    >>> adb = AsyncDatabase("test.db")
+    >>> await asyncio.gather(adb.find_name("Bulbasaur"), adb.find_name("Mew"))
+    """
+
+    def __init__(self, dbfile, workers: int = 4, timeout: float | None = None):
+        if isinstance(dbfile, Database):
+            self._db = dbfile
+        else:
+            self._db = Database(dbfile, pool_size=workers)
+
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                               thread_name_prefix="pokedb")
+        self._timeout = timeout
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    @property
+    def db(self):
+        return self._db
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    async def run(self, func, *args, timeout: float | None = None):
+        """
+        Run the blocking `func(*args)` on the worker threads
+
+        `timeout` overrides the default given at construction
+        """
+        running = RunningQuery()
+
+        def call():
+            # func's own checkouts are re-entrant, and share this connection
+            with self.db.checkout() as conn:
+                running.start(conn)
+                try:
+                    return func(*args)
+                finally:
+                    running.finish()
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, call)
+
+        if timeout is None:
+            timeout = self.timeout
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError):
+            running.cancel()
+            raise
+
+    async def fetchall(self, cmd: str, params: tuple = (), timeout: float | None = None) -> list:
+        return await self.run(self.db.fetchall, cmd, params, timeout=timeout)
+
+    async def find_name(self, name: str | list | None = None, timeout: float | None = None) -> list:
+        return await self.run(self.db.find_name, name, timeout=timeout)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.db.close()
+
+
+if __name__ == "__main__":
+
+    async def main():
+        async with AsyncDatabase(package_root() / "sql/test.db") as adb:
+            print(await asyncio.gather(adb.find_name("Bulbasaur"), adb.find_name(["Charizard", "Darkrai"])))
+
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+"""
+Thin client for the query daemon (see Daemon.py), falling back to querying
+the database directly when no daemon is running
+
+python -m src.Client type fire
+python -m src.Client learns swordsdance extremespeed
+python -m src.Client --batch '[["find_name", "Mew"], ["stat", "spe >= 120"]]'
+"""
+import argparse
+import json
+import socket
+
+from src.Protocol import DEFAULT_DB, DEFAULT_SOCKET, recv_message, send_message
+
+
+class DaemonError(Exception):
+    """
+    A request the daemon failed, carrying the name of the error it raised
+    """
+
+    def __init__(self, error: str, message: str):
+        super().__init__(f"{error}: {message}")
+        self.error = error
+
+
+class Client:
+    """
+    Sends requests to a running daemon over one kept-open connection
+
+    With `fallback`, a missing daemon means answering in this process
+    instead. Results are plain json types (lists rather than tuples) in
+    both modes
+
+    >>> with Client() as client:
+    >>>     client.type("fire")
+    >>>     client.learns(["swordsdance", "extremespeed"])
+    """
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, dbfile=DEFAULT_DB, fallback: bool = True,
+                 timeout: float | None = None):
+        self._socket_path = str(socket_path)
+        self._dbfile = dbfile
+        self._fallback = fallback
+        self._timeout = timeout
+
+        self._sock = None
+        self._service = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def direct(self) -> bool:
+        """
+        Whether requests are being answered without the daemon
+        """
+        return self._service is not None
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._timeout)
+        try:
+            sock.connect(self._socket_path)
+        except OSError:
+            sock.close()
+            raise
+
+        self._sock = sock
+
+    def _send(self, message: dict):
+        if self._service is None and self._sock is None:
+            try:
+                self._connect()
+            except (FileNotFoundError, ConnectionRefusedError):
+                if not self._fallback:
+                    raise
+                # only paid for without a daemon
+                from src.Daemon import Service
+                self._service = Service(self._dbfile)
+
+        if self._service is not None:
+            # through json, so results look the same as over the socket
+            reply = json.loads(json.dumps(self._service.handle(message)))
+        else:
+            send_message(self._sock, message)
+            reply = recv_message(self._sock)
+            if reply is None:
+                self._sock.close()
+                self._sock = None
+                raise ConnectionError("daemon closed the connection")
+
+        if not reply["ok"]:
+            raise DaemonError(reply["error"], reply["message"])
+
+        return reply["result"]
+
+    def request(self, kind: str, *args):
+        return self._send({"request": [kind, *args]})
+
+    def batch(self, requests: list) -> list:
+        """
+        Many requests in one round trip, results in request order
+        """
+        return self._send({"batch": [list(r) for r in requests]})
+
+    def version(self) -> str:
+        return self.request("version")
+
+    def find_name(self, name: str | list) -> list:
+        return self.request("find_name", name)
+
+    def type(self, query: str | list) -> list:
+        return self.request("type", query)
+
+    def stat(self, query: str) -> list:
+        return self.request("stat", query)
+
+    def learns(self, names: list, match_all: bool = True) -> list:
+        return self.request("learns", names, match_all)
+
+    def power(self, query: str) -> list:
+        return self.request("power", query)
+
+    def pp(self, query: str) -> list:
+        return self.request("pp", query)
+
+    def priority(self, query: str) -> list:
+        return self.request("priority", query)
+
+    def crit_ratio(self, query: str) -> list:
+        return self.request("crit_ratio", query)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._service is not None:
+            self._service.close()
+            self._service = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="query the daemon, or the database directly")
+    parser.add_argument("kind", nargs="?", help="find_name, type, stat, learns, power, pp, priority, crit_ratio")
+    parser.add_argument("args", nargs="*")
+    parser.add_argument("--batch", help="json list of requests")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--no-fallback", action="store_true", help="fail if no daemon is running")
+    args = parser.parse_args()
+
+    with Client(args.socket, args.db, fallback=not args.no_fallback) as client:
+        try:
+            if args.batch is not None:
+                result = client.batch(json.loads(args.batch))
+            elif args.kind in ("learns", "find_name") or (args.kind == "type" and len(args.args) > 1):
+                result = client.request(args.kind, args.args)
+            else:
+                result = client.request(args.kind, " ".join(args.args))
+        except DaemonError as E:
+            parser.exit(1, f"{E}\n")
+
+        print(json.dumps(result))
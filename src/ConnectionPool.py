@@ -0,0 +1,219 @@
+import pathlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+# applied once to every connection, as it is opened
+DEFAULT_PRAGMAS = {"cache_size": -16000,
+                   "temp_store": "MEMORY"}
+
+# read-only serving: pages are mapped from the OS page cache (shared between
+# processes) rather than copied into each connection's own page cache
+READONLY_PRAGMAS = {"mmap_size": 1 << 30,
+                    "cache_size": -2000,
+                    "temp_store": "MEMORY",
+                    "query_only": 1}
+
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived sqlite connections
+
+    Connections are opened lazily (up to `size` of them) and handed back out
+    once released, so the connect and schema parse costs are only paid once
+    per connection rather than once per query.
+
+    Checkouts are re-entrant per thread: a thread that already holds a
+    connection gets that same connection back from nested checkouts.
+
+    With `readonly`, the file is opened as an immutable, read-only URI: sqlite
+    takes no locks and never checks for changes made by others, so the file
+    must not be modified while the pool is open (renaming a new file over it
+    is fine, the open connections keep reading the old one)
+
+    >>> pool = ConnectionPool("test.db")
+    >>> with pool.connection() as conn:
+    >>>     conn.execute("SELECT name FROM pokemon").fetchall()
+    >>> pool.close()
+    """
+
+    def __init__(self, file, size: int = 8, pragmas: dict | None = None, timeout: float | None = None,
+                 readonly: bool = False):
+        if size < 1:
+            raise ValueError(f"pool size must be at least 1, got {size}")
+
+        self._file = file
+        self._size = size
+        self._readonly = readonly
+        self._timeout = timeout
+
+        if pragmas is None:
+            pragmas = READONLY_PRAGMAS if readonly else DEFAULT_PRAGMAS
+        self._pragmas = pragmas
+
+        self._idle = []
+        self._nopen = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._local = threading.local()
+
+    @property
+    def file(self):
+        return self._file
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def pragmas(self):
+        return self._pragmas
+
+    @property
+    def readonly(self):
+        return self._readonly
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def nopen(self):
+        """
+        Number of connections currently open, idle or checked out
+        """
+        return self._nopen
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.readonly:
+            path = pathlib.Path(self.file)
+            if not path.exists():
+                # mode=ro would fail too, but with a less helpful message
+                raise FileNotFoundError(f"no database at {path}")
+            uri = path.resolve().as_uri() + "?mode=ro&immutable=1"
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(self.file, check_same_thread=False)
+        for pragma, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+
+        return conn
+
+    def held(self) -> bool:
+        """
+        Whether the calling thread has a connection checked out
+        """
+        return getattr(self._local, "conn", None) is not None
+
+    def acquire(self) -> sqlite3.Connection:
+        """
+        Check out a connection for the calling thread
+
+        Every call must be paired with a `release`, prefer `connection()`
+        """
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            self._local.depth += 1
+            return held
+
+        conn = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                if self._idle or self._nopen < self.size:
+                    break
+                if not self._cond.wait(self._timeout):
+                    raise TimeoutError(f"no connection available after {self._timeout}s")
+
+            if self._idle:
+                conn = self._idle.pop()
+            else:
+                # reserve the slot now, connect outside the lock
+                self._nopen += 1
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._nopen -= 1
+                    self._cond.notify()
+                raise
+
+        self._local.conn = conn
+        self._local.depth = 1
+
+        return conn
+
+    def release(self):
+        """
+        Return the calling thread's connection, once all nested checkouts are done
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            raise RuntimeError("no connection checked out by this thread")
+
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+
+        self._local.conn = None
+
+        # never hand a dangling transaction to the next user
+        if conn.in_transaction:
+            conn.rollback()
+
+        with self._cond:
+            if self._closed:
+                conn.close()
+                self._nopen -= 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Context managed checkout
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release()
+
+    def thread_connection(self) -> sqlite3.Connection:
+        """
+        Connection pinned to the calling thread until `unpin` is called
+
+        Repeated calls from the same thread return the same connection
+        """
+        if getattr(self._local, "pinned", False):
+            return self._local.conn
+
+        conn = self.acquire()
+        self._local.pinned = True
+
+        return conn
+
+    def unpin(self):
+        """
+        Release a connection pinned by `thread_connection`
+        """
+        if getattr(self._local, "pinned", False):
+            self._local.pinned = False
+            self.release()
+
+    def close(self):
+        """
+        Close all idle connections, checked out ones are closed upon release
+        """
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._nopen -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
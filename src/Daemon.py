@@ -0,0 +1,265 @@
+"""
+Long-running query server, keeping connections, caches and the learnset
+index warm between the short-lived scripts that query it (see Client.py)
+
+Listens on a unix domain socket, speaking the protocol in Protocol.py.
+Requests use the Batch vocabulary:
+
+    {"request": ["type", "fire"]}           -> {"ok": true, "result": [...]}
+    {"batch": [["find_name", "Mew"], ...]}  -> {"ok": true, "result": [[...], ...]}
+    {"request": ["nope"]}                   -> {"ok": false, "error": "ValueError", "message": "..."}
+
+python -m src.Daemon [--socket path] [--db file]
+"""
+import argparse
+import os
+import signal
+import socketserver
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+from src.Database import Database
+from src.Protocol import DEFAULT_DB, DEFAULT_SOCKET, recv_message, send_message
+from src.Search.Batch import MOVE_COLUMNS, Batch
+from src.Search.BaseSearch import BaseSearch
+from src.Search.MoveSearch import MoveSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+class Service:
+    """
+    Answers requests against one database, the daemon's worker and the
+    client's direct mode alike
+
+    Reopens the database when the file on disk changes, so a rebuild (in
+    place or swapped in) is picked up by the next request. A file that does
+    not exist yet is opened by the first request after it is built, until
+    then requests fail with FileNotFoundError
+    """
+
+    def __init__(self, dbfile=DEFAULT_DB, learnset_index: bool = True):
+        self._file = dbfile
+        self._learnset_index = learnset_index
+        self._lock = threading.Lock()
+
+        self._db = None
+        self._searches = None
+        self._signature = None
+        self._version = None
+        # requests running per Database, and the replaced ones still in use
+        self._running = {}
+        self._retired = set()
+        self.reload()
+
+    @property
+    def db(self) -> Database:
+        return self._db
+
+    @property
+    def build_version(self) -> str | None:
+        if self.db is None:
+            return None
+        return self.db.build_version
+
+    def _file_signature(self) -> tuple | None:
+        try:
+            stat = os.stat(self._file)
+        except FileNotFoundError:
+            # mid swap, keep serving the old file
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _stale(self) -> bool:
+        signature = self._file_signature()
+        return signature is not None and signature != self._signature
+
+    def reload(self) -> bool:
+        """
+        Reopen the database if it changed on disk, returns whether it did
+        """
+        with self._lock:
+            signature = self._file_signature()
+            # missing: not built yet, or mid swap (keep serving the old file)
+            if signature is None or (self._db is not None and signature == self._signature):
+                return False
+
+            db = Database(self._file)
+            version = db.build_version
+
+            searches = {"types": TypeSearch(db),
+                        "stats": StatSearch(db),
+                        "moves": MoveSearch(db, learnset_index=self._learnset_index),
+                        "base": BaseSearch(db, learnset_index=self._learnset_index)}
+
+            # warm the index now rather than on the first request, where the
+            # file has one (it may be caught mid rebuild), the other searches
+            # still answer either way
+            try:
+                searches["base"].learnset_index
+            except sqlite3.OperationalError as E:
+                print(f"learnset index not warmed: {E}")
+
+            previous, old = self._version, self._db
+            self._db, self._searches, self._signature, self._version = db, searches, signature, version
+
+            # requests already running keep using the old Database, it is
+            # closed once the last of them finishes
+            if old is not None:
+                if self._running.get(old, 0) > 0:
+                    self._retired.add(old)
+                else:
+                    old.close()
+
+        if previous is not None and previous != version:
+            print(f"reloaded {self._file}, build {previous} -> {version}")
+
+        return True
+
+    @contextmanager
+    def _current(self):
+        """
+        The current (Database, searches), kept open until the block exits
+        """
+        if self._stale():
+            self.reload()
+
+        with self._lock:
+            db, searches = self._db, self._searches
+            if db is None:
+                raise FileNotFoundError(f"{self._file} does not exist yet, build it first")
+            self._running[db] = self._running.get(db, 0) + 1
+
+        try:
+            yield db, searches
+        finally:
+            with self._lock:
+                self._running[db] -= 1
+                done = self._running[db] == 0
+                if done:
+                    del self._running[db]
+                close = done and db in self._retired
+                if close:
+                    self._retired.discard(db)
+
+            if close:
+                db.close()
+
+    def run(self, request: list):
+        with self._current() as (db, searches):
+            return self._run(db, searches, request)
+
+    def _run(self, db: Database, searches: dict, request: list):
+        kind, *args = request
+
+        match kind:
+            case "find_name":
+                return db.find_name(*args)
+            case "type":
+                return searches["types"].search(*args)
+            case "stat":
+                return searches["stats"].search(*args)
+            case "learns":
+                return searches["base"].search_by_moves(*args)
+            case "version":
+                return db.build_version
+            case _ if kind in MOVE_COLUMNS:
+                return getattr(searches["moves"], kind)(*args)
+
+        raise ValueError(f"Search {kind} not recognised!")
+
+    def run_batch(self, requests: list) -> list:
+        """
+        Results in request order, see Batch
+        """
+        with self._current() as (db, _):
+            results = Batch(db).run(requests)
+
+        return [results[Batch.key(request)] for request in requests]
+
+    def handle(self, message: dict) -> dict:
+        """
+        One protocol message in, one out
+        """
+        try:
+            if "batch" in message:
+                result = self.run_batch(message["batch"])
+            else:
+                result = self.run(message["request"])
+        except Exception as E:
+            return {"ok": False, "error": type(E).__name__, "message": str(E)}
+
+        return {"ok": True, "result": result}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+            for db in self._retired:
+                db.close()
+            self._retired.clear()
+
+
+class Handler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        # one connection may carry any number of requests
+        while True:
+            try:
+                message = recv_message(self.request)
+            except ValueError as E:
+                send_message(self.request, {"ok": False, "error": "ValueError", "message": str(E)})
+                return
+            if message is None:
+                return
+
+            send_message(self.request, self.server.service.handle(message))
+
+
+class Daemon(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Serves a Service over a unix socket, a thread per client connection
+
+    >>> with Daemon("pokedb.sock", "test.db") as daemon:
+    >>>     daemon.serve_forever()
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path=DEFAULT_SOCKET, dbfile=DEFAULT_DB):
+        self.service = Service(dbfile)
+        self.socket_path = str(socket_path)
+
+        # a daemon that died without cleaning up leaves its socket behind
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        super().__init__(self.socket_path, Handler)
+
+    def server_close(self):
+        super().server_close()
+        self.service.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="serve searches over a unix socket")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET)
+    parser.add_argument("--db", default=DEFAULT_DB)
+    args = parser.parse_args()
+
+    # exit through the context manager on `kill` too, removing the socket
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    with Daemon(args.socket, args.db) as daemon:
+        if daemon.service.db is None:
+            print(f"{args.db} does not exist yet, serving it on {args.socket} once built", flush=True)
+        else:
+            print(f"serving {args.db} on {args.socket}, build {daemon.service.build_version}", flush=True)
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -1,41 +1,270 @@
+import os
 import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
 
 from src import package_root
+from src.ConnectionPool import ConnectionPool
+from src.QueryCache import QueryCache
+
+
+# trade durability for speed while building a fresh table or file, a failed
+# build is simply rerun. Without a journal ROLLBACK is undefined, so these
+# must never be used to edit data that is already being served
+BUILD_PRAGMAS = {"journal_mode": "OFF",
+                 "synchronous": "OFF",
+                 "cache_size": -262144,
+                 "temp_store": "MEMORY"}
+
+# editing a served database in place (incremental updates, in place merges):
+# the file keeps its own rollback journal or WAL, so a failed or interrupted
+# write rolls back cleanly
+UPDATE_PRAGMAS = {"synchronous": "NORMAL",
+                  "cache_size": -262144,
+                  "temp_store": "MEMORY"}
 
 
 class Database:
     """
     Database handler class
+
+    Connections are drawn from a pool of long-lived connections, call `close`
+    (or use the Database as a context manager) to shut them down
+
+    Results read through `fetchall` are kept in an LRU cache of `cache_size`
+    queries (0 to disable), dropped whenever the database changes
+
+    Set `instrumentation` (see Instrumentation.QueryStats) to record the
+    queries that `fetchall` runs
+
+    `readonly` opens the file immutable and memory-mapped, for serving a built
+    database from many processes at once. Writes then raise PermissionError
+
+    A rebuild swapped in by renaming a new file over this one (see
+    update/Staging.py) is picked up at the next checkout: a fresh pool is
+    opened on the new file, the old pool's connections are closed as they
+    are released
     """
 
-    def __init__(self, file):
+    def __init__(self, file, pool_size: int = 8, pragmas: dict | None = None,
+                 cache_size: int = 1024, cache_ttl: float | None = None, readonly: bool = False):
         self._file = file
+        self._pool = ConnectionPool(file, size=pool_size, pragmas=pragmas, readonly=readonly)
+
+        # the file the pool's connections were opened on
+        self._inode = self._file_inode()
+        self._swap_lock = threading.Lock()
+
+        self._cache = None
+        if cache_size > 0:
+            self._cache = QueryCache(maxsize=cache_size, ttl=cache_ttl)
+
+        self.instrumentation = None
+
+        self._build_version = None
+        self._version_signature = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
     @property
     def file(self):
         return self._file
 
+    @property
+    def pool(self):
+        return self._pool
+
     @property
     def connection(self):
-        return sqlite3.connect(self.file)
+        """
+        Connection pinned to the calling thread, prefer `checkout` where possible
+        """
+        self._reopen_if_swapped()
+
+        return self.pool.thread_connection()
+
+    @property
+    def cache(self) -> QueryCache | None:
+        return self._cache
+
+    @property
+    def readonly(self) -> bool:
+        return self.pool.readonly
+
+    def _check_writable(self):
+        if self.readonly:
+            raise PermissionError(f"{self.file} is opened read-only")
+
+    def _file_inode(self) -> int | None:
+        try:
+            return os.stat(self.file).st_ino
+        except FileNotFoundError:
+            return None
+
+    def _reopen_if_swapped(self):
+        """
+        Move to a fresh pool if a new file was renamed over ours
+
+        Connections keep reading the file they were opened on, renamed away
+        or not. A thread already holding a connection stays on it, so a
+        transaction never spans two files
+        """
+        inode = self._file_inode()
+        if inode is None or inode == self._inode:
+            return
+
+        if self._inode is None:
+            # created by our own first connection
+            self._inode = inode
+            return
+
+        old = self._pool
+        if old.held():
+            return
+
+        with self._swap_lock:
+            if self._pool is not old:
+                return
+
+            self._pool = ConnectionPool(self.file, size=old.size, pragmas=old.pragmas, readonly=old.readonly)
+            self._inode = inode
+
+        old.close()
+
+    def checkout(self):
+        """
+        Check out a pooled connection for the duration of a `with` block
+        """
+        self._reopen_if_swapped()
+
+        return self.pool.connection()
+
+    @contextmanager
+    def bulk(self, pragmas: dict = BUILD_PRAGMAS):
+        """
+        Checkout for bulk writes, one transaction under `pragmas`
+
+        BUILD_PRAGMAS (the default) only suit building new tables, pass
+        UPDATE_PRAGMAS when changing rows that are already served. The
+        connection's previous PRAGMA settings are restored afterwards
+        """
+        self._check_writable()
 
-    def execute(self, cmd: str, commit: bool = False):
+        with self.checkout() as conn:
+            previous = {}
+            for pragma, value in pragmas.items():
+                previous[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                conn.execute(f"PRAGMA {pragma} = {value}")
+
+            try:
+                conn.execute("BEGIN")
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                for pragma, value in previous.items():
+                    conn.execute(f"PRAGMA {pragma} = {value}")
+
+    def close(self):
+        self.pool.close()
+
+    @property
+    def signature(self) -> tuple:
+        """
+        (inode, mtime, size) of the file, changes with any write to it
+        """
+        stat = os.stat(self.file)
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @property
+    def build_version(self) -> str:
+        """
+        Version stamped into the metadata table by the last build
+
+        Only re-read when the file changes on disk. Unstamped databases fall
+        back to the file's modification signature
+        """
+        signature = self.signature
+
+        if signature != self._version_signature:
+            with self.checkout() as conn:
+                try:
+                    row = conn.execute("SELECT value FROM metadata WHERE key = 'build_version'").fetchone()
+                except sqlite3.OperationalError:
+                    row = None
+
+            if row is None:
+                self._build_version = "-".join(str(s) for s in signature)
+            else:
+                self._build_version = row[0]
+            self._version_signature = signature
+
+        return self._build_version
+
+    def stamp_build_version(self, version: str | None = None) -> str:
+        """
+        Record a new build version, generating one if not given
+        """
+        if version is None:
+            version = uuid.uuid4().hex
+
+        self.execute("CREATE TABLE if NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)")
+        self.execute("INSERT OR REPLACE INTO metadata (key, value) VALUES ('build_version', ?)",
+                     (version,), commit=True)
+
+        return version
+
+    def fetchall(self, cmd: str, params: tuple = (), row_factory=None) -> list:
+        """
+        Run a read query, through the result cache if enabled
+
+        `row_factory(cursor, row)` builds each returned row, as sqlite3's own
+        does. The cache holds plain tuples, cached rows are built on the way out
+        """
+        def compute(factory=None):
+            with self.checkout() as conn:
+                if self.instrumentation is not None:
+                    rows = self.instrumentation.run(conn, cmd, params)
+                    if factory is not None:
+                        rows = [factory(None, row) for row in rows]
+                    return rows
+
+                cursor = conn.cursor()
+                cursor.row_factory = factory
+                return cursor.execute(cmd, params).fetchall()
+
+        if self.cache is None:
+            return compute(row_factory)
+
+        # a rebuild changes the version, any other write the signature
+        version = (self.build_version, self._version_signature)
+
+        rows = self.cache.fetch(version, cmd, params, compute)
+        if row_factory is None:
+            return list(rows)
+
+        return [row_factory(None, row) for row in rows]
+
+    def execute(self, cmd: str, params: tuple = (), commit: bool = False):
         """
         Execute one single command
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.file)
+        self._check_writable()
+
+        with self.checkout() as conn:
             cursor = conn.cursor()
-            cursor.execute(cmd)
+            cursor.execute(cmd, params)
 
             if commit:
                 conn.commit()
 
-        finally:
-            if conn is not None:
-                conn.close()
-
     def create_table(self, name: str, columns: list, types: list, force: bool = False):
         """
         Insert table into database
@@ -55,6 +284,21 @@ class Database:
         print(create)
         self.execute(create)
 
+    def create_index(self, table: str, columns: list, unique: bool = False):
+        """
+        Create an index on `columns` of `table`, named after both
+        """
+        if len(columns) == 0:
+            raise ValueError("Cannot create index without columns")
+
+        name = "_".join(["idx", table] + columns)
+        kind = "UNIQUE INDEX" if unique else "INDEX"
+
+        create = f"CREATE {kind} if NOT EXISTS {name} ON {table} (" + ", ".join(columns) + ")"
+
+        print(create)
+        self.execute(create)
+
     def find_name(self, name: str | list | None = None) -> list:
         """
         Find a pokemon by name, or list of names
@@ -81,11 +325,7 @@ class Database:
 
         cmd = f"SELECT * FROM Pokemon WHERE {'AND '.join(query)}"
 
-        cur = self.connection.cursor()
-
-        search = cur.execute(cmd)
-
-        return search.fetchall()
+        return self.fetchall(cmd)
 
 
 if __name__ == "__main__":
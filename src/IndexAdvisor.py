@@ -0,0 +1,120 @@
+import re
+
+from src import package_root
+from src.Database import Database
+from src.Instrumentation import QueryStats
+
+
+# a column compared against something in a WHERE clause
+COMPARISON = re.compile(r"(\bNOT\s+)?\b(\w+)\s*(==|=|>=|<=|<>|!=|>|<|\bIN\b|\bLIKE\b|\bIS\b)", re.IGNORECASE)
+# comparisons an index cannot narrow down
+UNSARGABLE = {"<>", "!="}
+# "SCAN pokemon", but not "SCAN pokemon USING INDEX ..."
+FULL_SCAN = re.compile(r"^SCAN (\w+)(?: AS \w+)?$")
+
+
+class IndexAdvisor:
+    """
+    Suggests indexes for the queries recorded by a QueryStats
+
+    Each recorded query shape is re-planned with EXPLAIN QUERY PLAN, and for
+    every table it still fully scans, the columns it filters that table on
+    (and which do not yet lead an index) are suggested for indexing, ranked
+    by the total time spent in those queries
+
+    >>> db.instrumentation = QueryStats()
+    >>> ...  # run the usual workload
+    >>> advisor = IndexAdvisor(db, db.instrumentation)
+    >>> advisor.suggest()
+    >>> advisor.apply()
+    """
+
+    def __init__(self, db: Database, stats: QueryStats):
+        self._db = db
+        self._stats = stats
+
+    @property
+    def db(self):
+        return self._db
+
+    def columns(self, conn, table: str) -> set:
+        return {row[1].lower() for row in conn.execute(f"PRAGMA table_info({table})")}
+
+    def indexed(self, conn, table: str) -> set:
+        """
+        Columns already leading an index on `table`
+        """
+        leading = set()
+        for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+            info = conn.execute(f"PRAGMA index_info({index[1]})").fetchall()
+            if len(info) > 0:
+                leading.add(info[0][2].lower())
+        return leading
+
+    def suggest(self) -> list:
+        """
+        Returns [{"table", "columns", "queries", "total_ms", "sql"}], most costly first
+        """
+        stats = self._stats.stats()
+
+        found = {}
+        with self.db.checkout() as conn:
+            for shape, (cmd, params) in self._stats.examples().items():
+                plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {cmd}", params)]
+
+                for step in plan:
+                    match = FULL_SCAN.match(step.strip())
+                    if match is None:
+                        continue
+
+                    table = match.group(1).lower()
+                    columns = self.columns(conn, table)
+                    indexed = self.indexed(conn, table)
+
+                    where = re.split(r"\bWHERE\b", cmd, maxsplit=1, flags=re.IGNORECASE)[-1]
+                    for negated, column, operator in COMPARISON.findall(where):
+                        column = column.lower()
+                        if negated or operator in UNSARGABLE:
+                            continue
+                        if column not in columns or column in indexed:
+                            continue
+
+                        entry = found.setdefault((table, column), {"queries": [], "total_ms": 0.0})
+                        if shape not in entry["queries"]:
+                            entry["queries"].append(shape)
+                            entry["total_ms"] += stats[shape]["total_ms"]
+
+        suggestions = []
+        for (table, column), entry in found.items():
+            suggestions.append({"table": table,
+                                "columns": [column],
+                                "queries": entry["queries"],
+                                "total_ms": entry["total_ms"],
+                                "sql": f"CREATE INDEX idx_{table}_{column} ON {table} ({column})"})
+
+        return sorted(suggestions, key=lambda s: s["total_ms"], reverse=True)
+
+    def apply(self, suggestions: list | None = None) -> list:
+        """
+        Create the suggested indexes (all of them, if not given) and re-analyze
+        """
+        if suggestions is None:
+            suggestions = self.suggest()
+
+        for suggestion in suggestions:
+            self.db.create_index(suggestion["table"], suggestion["columns"])
+
+        if len(suggestions) > 0:
+            self.db.execute("ANALYZE", commit=True)
+
+        return suggestions
+
+
+if __name__ == "__main__":
+    db = Database(package_root() / "sql/test.db", cache_size=0)
+    db.instrumentation = QueryStats()
+
+    db.fetchall("SELECT * FROM pokemon WHERE weight > 100")
+
+    for suggestion in IndexAdvisor(db, db.instrumentation).suggest():
+        print(suggestion["sql"], suggestion["queries"])
@@ -0,0 +1,148 @@
+import json
+import re
+import statistics
+import threading
+import time
+from collections import deque
+
+
+# literals and parameter lists, stripped to group queries by shape
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def query_shape(cmd: str) -> str:
+    """
+    Normalise a query so that it only differs from others by its structure
+
+    "SELECT * FROM pokemon WHERE spe >= 100" -> "SELECT * FROM pokemon WHERE spe >= ?"
+    """
+    shape = LITERALS.sub("?", cmd)
+    shape = IN_LISTS.sub("(...)", shape)
+    return " ".join(shape.split())
+
+
+class QueryStats:
+    """
+    Instrumentation for a Database, recording every query it runs
+
+    Plug it in with `db.instrumentation = QueryStats()`, a Database without
+    one runs its queries untouched. Subclasses can override `run` or `record`
+
+    For each query the wall time, rows returned and sqlite VM steps (counted
+    in units of `step_interval` by a progress handler, a proxy for the rows
+    scanned) are recorded. Queries slower than `slow_threshold` seconds go to
+    the slow query log, along with their EXPLAIN QUERY PLAN if they are also
+    over `explain_threshold`
+    """
+
+    def __init__(self, slow_threshold: float = 0.1, explain_threshold: float | None = None,
+                 slow_log_size: int = 100, samples: int = 10000, step_interval: int = 100):
+        self.slow_threshold = slow_threshold
+        self.explain_threshold = explain_threshold
+        self.step_interval = step_interval
+
+        self._slow = deque(maxlen=slow_log_size)
+        self._samples = samples
+        self._shapes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def slow_log(self) -> list:
+        return list(self._slow)
+
+    def examples(self) -> dict:
+        """
+        One concrete (sql, params) per query shape
+        """
+        with self._lock:
+            return {shape: entry["example"] for shape, entry in self._shapes.items()}
+
+    def run(self, conn, cmd: str, params: tuple = ()) -> list:
+        """
+        Execute `cmd` on `conn`, recording how it went
+        """
+        steps = 0
+
+        def tick():
+            nonlocal steps
+            steps += 1
+            return 0
+
+        conn.set_progress_handler(tick, self.step_interval)
+        t0 = time.perf_counter()
+        try:
+            rows = conn.execute(cmd, params).fetchall()
+        finally:
+            seconds = time.perf_counter() - t0
+            conn.set_progress_handler(None, 0)
+
+        plan = None
+        if self.explain_threshold is not None and seconds >= self.explain_threshold:
+            plan = [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {cmd}", params)]
+
+        self.record(cmd, params, seconds, len(rows), steps * self.step_interval, plan)
+
+        return rows
+
+    def record(self, cmd: str, params: tuple, seconds: float, rows: int, steps: int, plan: list | None = None):
+        shape = query_shape(cmd)
+
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                entry = {"count": 0, "rows": 0, "steps": 0, "seconds": 0.0,
+                         "samples": deque(maxlen=self._samples),
+                         "example": (cmd, tuple(params))}
+                self._shapes[shape] = entry
+
+            entry["count"] += 1
+            entry["rows"] += rows
+            entry["steps"] += steps
+            entry["seconds"] += seconds
+            entry["samples"].append(seconds)
+
+            if seconds >= self.slow_threshold:
+                self._slow.append({"sql": cmd,
+                                   "params": list(params),
+                                   "seconds": seconds,
+                                   "rows": rows,
+                                   "steps": steps,
+                                   "plan": plan,
+                                   "time": time.time()})
+
+    def stats(self) -> dict:
+        """
+        Aggregates per query shape: counts, totals and p50/p95/p99 latency (ms)
+        """
+        out = {}
+        with self._lock:
+            for shape, entry in self._shapes.items():
+                samples = sorted(entry["samples"])
+                if len(samples) > 1:
+                    q = statistics.quantiles(samples, n=100)
+                    p50, p95, p99 = q[49], q[94], q[98]
+                else:
+                    p50 = p95 = p99 = samples[0]
+
+                out[shape] = {"count": entry["count"],
+                              "rows": entry["rows"],
+                              "steps": entry["steps"],
+                              "total_ms": entry["seconds"] * 1e3,
+                              "p50_ms": p50 * 1e3,
+                              "p95_ms": p95 * 1e3,
+                              "p99_ms": p99 * 1e3}
+
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self._slow.clear()
+
+    def dump(self, file):
+        """
+        Write the aggregated stats and slow query log as json
+        """
+        with open(file, "w+") as o:
+            json.dump({"stats": self.stats(), "slow": self.slow_log}, o, indent=2)
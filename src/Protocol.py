@@ -0,0 +1,55 @@
+"""
+Wire format shared by the Daemon and its Client, kept apart from both so the
+client does not have to import the search stack
+
+Each message, both ways, is a 4 byte big endian length followed by that many
+bytes of utf-8 json
+"""
+import json
+import struct
+
+from src import package_root
+
+
+DEFAULT_DB = package_root() / "sql/test.db"
+DEFAULT_SOCKET = package_root() / "sql/pokedb.sock"
+
+LENGTH = struct.Struct(">I")
+# refuse anything absurd before allocating for it
+MAX_MESSAGE = 64 * 1024 * 1024
+
+
+def recv_exactly(sock, n: int) -> bytes | None:
+    chunks = []
+    while n > 0:
+        chunk = sock.recv(min(n, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        n -= len(chunk)
+
+    return b"".join(chunks)
+
+
+def send_message(sock, message):
+    body = json.dumps(message).encode()
+    sock.sendall(LENGTH.pack(len(body)) + body)
+
+
+def recv_message(sock):
+    """
+    The next message, or None if the other end closed the connection
+    """
+    head = recv_exactly(sock, LENGTH.size)
+    if head is None:
+        return None
+
+    (length,) = LENGTH.unpack(head)
+    if length > MAX_MESSAGE:
+        raise ValueError(f"message of {length} bytes is too large")
+
+    body = recv_exactly(sock, length)
+    if body is None:
+        return None
+
+    return json.loads(body)
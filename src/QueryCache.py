@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of query results, keyed on (sql, params)
+
+    Every lookup carries the database version it is made against, and the
+    whole cache is dropped as soon as that version changes. Entries older
+    than `ttl` seconds (if given) are treated as missing.
+
+    >>> cache = QueryCache(maxsize=256)
+    >>> cache.fetch(version, "SELECT ...", (), lambda: conn.execute(...).fetchall())
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        if maxsize < 1:
+            raise ValueError(f"cache size must be at least 1, got {maxsize}")
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _check_version(self, version):
+        # caller holds the lock
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, version, key) -> tuple:
+        """
+        Returns (found, value)
+        """
+        with self._lock:
+            self._check_version(version)
+
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            stamp, value = entry
+            if self.ttl is not None and time.monotonic() - stamp > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return True, value
+
+    def put(self, version, key, value):
+        with self._lock:
+            self._check_version(version)
+
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def fetch(self, version, cmd: str, params: tuple, compute) -> tuple:
+        """
+        Cached result of `cmd`, calling `compute()` to fill misses
+        """
+        key = (cmd, tuple(params))
+
+        found, value = self.get(version, key)
+        if not found:
+            value = tuple(compute())
+            self.put(version, key, value)
+
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations}
@@ -0,0 +1,100 @@
+import asyncio
+
+from src import package_root
+from src.AsyncDatabase import AsyncDatabase
+from src.Search.BaseSearch import BaseSearch
+from src.Search.MoveSearch import MoveSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+class AsyncSearch:
+    """
+    Awaitable version of a BaseSearch subclass, given as `sync_class`
+
+    Results are exactly those of the sync class, the query just runs on the
+    AsyncDatabase's worker threads. Every method takes an optional `timeout`
+
+    Given a path, the search opens (and `close` shuts down) its own
+    AsyncDatabase, use it as an async context manager. A shared AsyncDatabase
+    is left to its owner
+
+    >>> async with AsyncTypeSearch("test.db") as types:
+    >>>     await types.search("fire")
+    """
+
+    sync_class = BaseSearch
+
+    def __init__(self, dbfile, learnset_index: bool = False):
+        # share an existing AsyncDatabase (and its threads) if given one
+        self._owned = not isinstance(dbfile, AsyncDatabase)
+        if self._owned:
+            self._adb = AsyncDatabase(dbfile)
+        else:
+            self._adb = dbfile
+
+        self._sync = self.sync_class(self._adb.db, learnset_index=learnset_index)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    @property
+    def adb(self):
+        return self._adb
+
+    @property
+    def sync(self):
+        return self._sync
+
+    def close(self):
+        """
+        Shut down the AsyncDatabase, if this search opened it
+        """
+        if self._owned:
+            self._adb.close()
+
+    async def search(self, *args, timeout: float | None = None) -> list:
+        return await self.adb.run(self.sync.search, *args, timeout=timeout)
+
+    async def search_by_moves(self, names: list, match_all: bool = True, timeout: float | None = None) -> list:
+        return await self.adb.run(self.sync.search_by_moves, names, match_all, timeout=timeout)
+
+
+class AsyncTypeSearch(AsyncSearch):
+    sync_class = TypeSearch
+
+
+class AsyncStatSearch(AsyncSearch):
+    sync_class = StatSearch
+
+
+class AsyncMoveSearch(AsyncSearch):
+    sync_class = MoveSearch
+
+    async def power(self, query: str, timeout: float | None = None) -> list:
+        return await self.adb.run(self.sync.power, query, timeout=timeout)
+
+    async def pp(self, query: str, timeout: float | None = None) -> list:
+        return await self.adb.run(self.sync.pp, query, timeout=timeout)
+
+    async def priority(self, query: str, timeout: float | None = None) -> list:
+        return await self.adb.run(self.sync.priority, query, timeout=timeout)
+
+    async def crit_ratio(self, query: str, timeout: float | None = None) -> list:
+        return await self.adb.run(self.sync.crit_ratio, query, timeout=timeout)
+
+
+if __name__ == "__main__":
+
+    async def main():
+        async with AsyncDatabase(package_root() / "sql/test.db") as adb:
+            types = AsyncTypeSearch(adb)
+            stats = AsyncStatSearch(adb)
+
+            fire, fast = await asyncio.gather(types.search("fire"), stats.search("spe >= 120"))
+            print(set(fire) & set(fast))
+
+    asyncio.run(main())
@@ -2,77 +2,305 @@ import sqlite3
 
 from src import package_root
 from src.Database import Database
+from src.Search.LearnsetIndex import LearnsetIndex
+from src.Search.Records import record_class
+from src.utils.clean_sql import to_id
 
 
 class BaseSearch:
     """
     Individual searches should be extremely basic, to be later chained
+
+    Subclasses with a `where` can also be searched ranked and paginated:
+    `ranked` streams names in order, `top` returns the first k of them and
+    `page` walks through the results with keyset pagination
     """
 
-    def __init__(self, dbfile):
-        self._db = Database(dbfile)
+    # the table `where` filters, and its column holding the names
+    table = "pokemon"
+    namecol = "name"
+
+    def __init__(self, dbfile, learnset_index: bool = False, readonly: bool = False):
+        # share an existing Database (and its connection pool) if given one
+        if isinstance(dbfile, Database):
+            self._db = dbfile
+        else:
+            self._db = Database(dbfile, readonly=readonly)
+
+        self._use_index = learnset_index
+        # (column, build version) -> whether the column has NULLs, see _has_nulls
+        self._nulls = {}
 
     @property
     def db(self):
         return self._db
 
+    @property
+    def learnset_index(self) -> LearnsetIndex | None:
+        """
+        In-memory learnset index, if enabled
+        """
+        if not self._use_index:
+            return None
+        return LearnsetIndex.load(self.db)
+
     def cmd(self, *args, **kwargs) -> str:
         raise NotImplementedError
 
-    def _search(self, query) -> list:
-        conn = self.db.connection
-        cur = conn.cursor()
+    @classmethod
+    def where(cls, *args, **kwargs) -> tuple:
+        """
+        The WHERE clause of `cmd`, as a parameterised (sql, params) pair
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def parse_comparison(query: str) -> tuple:
+        """
+        Split a "column operator value" query into its parts
+
+        Operators are python syntax, or sql syntax
+        """
+        column, operator, val = query.split()
+
+        if not column.isidentifier():
+            raise ValueError(f"Column {column} is not a valid name!")
+
+        column = column.lower()
+        val = int(val)
+
+        match operator:
+            case ">":
+                # greater than
+                pass
+            case ">=":
+                # greater than or equal to
+                pass
+            case "==":
+                # equal to
+                pass
+            case "<=":
+                # less than or equal to
+                pass
+            case "<":
+                # less than
+                pass
+            case "<>":
+                # sql not equal to
+                pass
+            case "!=":
+                # python not equal to
+                operator = "<>"
+            case _:
+                raise ValueError(f"Operator {operator} not recognised!")
+
+        return column, operator, val
 
+    def _stream(self, query, params: tuple = (), row_factory=None):
+        """
+        Yield the rows of `query` one at a time, straight off the cursor
+
+        Bypasses the result cache, the connection stays checked out until
+        the generator is exhausted or closed
+        """
+        with self.db.checkout() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = row_factory
+            try:
+                cursor.execute(query, params)
+            except sqlite3.OperationalError as E:
+                print(f"error in query:\n{query}")
+                raise E
+
+            yield from cursor
+
+    def _search(self, query, params: tuple = (), row_factory=None) -> list:
         try:
-            result = cur.execute(query).fetchall()
+            result = self.db.fetchall(query, params, row_factory=row_factory)
         except sqlite3.OperationalError as E:
             print(f"error in query:\n{query}")
             raise E
 
         return result
 
-    def search(self, *args, **kwargs) -> list:
-        cmd = self.cmd(*args, **kwargs)
+    def _select_cmd(self, query, columns: list | None) -> tuple:
+        """
+        `where` as a full statement over `columns` (all of them if None), with
+        the Record class its rows are built as
 
-        table = cmd.split("FROM")[-1].split()[0]
+        Rows come in table order, whichever index answers the WHERE
+        """
+        record = record_class(self.table, columns)
+        where, params = self.where(query)
 
-        match table:
-            case "moves":
-                namecol = 6
-            case "pokemon":
-                namecol = 1
-            case _:
-                raise ValueError(f"Table {table} not recognised!")
+        # `+rowid` sorts the matches, a bare rowid has sqlite scan the whole
+        # table in order rather than search the WHERE's index
+        cmd = f"SELECT {', '.join(record.fields)} FROM {self.table} WHERE {where} ORDER BY +rowid"
+
+        return cmd, tuple(params), record
+
+    def search(self, query) -> list:
+        """
+        Names of the matching pokemon (or moves)
+        """
+        cmd, params, _ = self._select_cmd(query, [self.namecol])
 
-        result = self._search(cmd)
+        return [row[0] for row in self._search(cmd, params)]
 
-        return [p[namecol] for p in result]
+    def rows(self, query, columns: list | None = None) -> list:
+        """
+        The matching rows as Records, holding only `columns` if given
 
-    def search_by_moves(self, names: list) -> list:
+        >>> [(p.name, p.spe) for p in StatSearch(db).rows("spe >= 120", ["name", "spe"])]
         """
-        Get a list of pokemon that know all the moves in `names`
+        cmd, params, record = self._select_cmd(query, columns)
+
+        return self._search(cmd, params, row_factory=record.row_factory)
+
+    def _order_column(self, column: str) -> str:
+        columns = {row[1].lower(): row[1] for row in self._search(f"PRAGMA table_info({self.table})")}
+
+        if column.lower() not in columns:
+            raise ValueError(f"Column {column} not in table {self.table}!")
+
+        return columns[column.lower()]
+
+    def _has_nulls(self, column: str) -> bool:
+        """
+        Whether `column` holds any NULLs in this build, remembered per build
+        """
+        key = (column, self.db.build_version)
+        if key not in self._nulls:
+            found = self._search(f"SELECT 1 FROM {self.table} WHERE {column} IS NULL LIMIT 1")
+            self._nulls[key] = len(found) > 0
+
+        return self._nulls[key]
+
+    def _ranked_cmd(self, query, order_by: str | None, descending: bool, after: tuple | None = None,
+                    select: tuple | None = None) -> tuple:
+        where, params = self.where(query)
+        column = "rowid" if order_by is None else self._order_column(order_by)
+
+        if select is None:
+            # the name, then the cursor `page` continues from
+            select = (self.namecol, f"{column} IS NULL", column, "rowid")
+        direction = "DESC" if descending else "ASC"
+        beyond = "<" if descending else ">"
+
+        if after is not None:
+            # NULLs sort last either way, rowid breaks ties so every row has
+            # a unique position
+            null, value, rowid = after
+            if null:
+                where = f"({where}) AND {column} IS NULL AND rowid {beyond} ?"
+                params = tuple(params) + (rowid,)
+            else:
+                where = (f"({where}) AND ({column} IS NULL "
+                         f"OR ({column}, rowid) {beyond} (?, ?))")
+                params = tuple(params) + (value, rowid)
+
+        # sorting on `IS NULL` first keeps the column's index from serving
+        # the ORDER BY, so only do it where there are NULLs to place
+        nulls = f"{column} IS NULL, " if order_by is not None and self._has_nulls(column) else ""
+
+        cmd = (f"SELECT {', '.join(select)} FROM {self.table} "
+               f"WHERE {where} "
+               f"ORDER BY {nulls}{column} {direction}, rowid {direction}")
+
+        return cmd, tuple(params)
+
+    def ranked(self, query, order_by: str | None = None, descending: bool = False,
+               limit: int | None = None, offset: int = 0, columns: list | None = None):
+        """
+        Yield the names `search(query)` would return, sorted by the `order_by`
+        column (table order if None), with ORDER BY and LIMIT/OFFSET run by sqlite
+
+        Given `columns`, Records of those columns are yielded instead of names
+
+        >>> list(TypeSearch(db).ranked("water", order_by="spe", descending=True, limit=10))
+        >>> # > the 10 fastest water types
         """
-        tables = self._search("SELECT name FROM sqlite_master WHERE type='table';")
-        learnsets = [t[0] for t in tables if "learnset" in t[0]]
+        record = None
+        select = (self.namecol,)
+        if columns is not None:
+            record = record_class(self.table, columns)
+            select = record.fields
 
-        cmd = [f"SELECT {learnsets[0]}.pokemon FROM {learnsets[0]}"]
+        cmd, params = self._ranked_cmd(query, order_by, descending, select=select)
 
-        for table in learnsets[1:]:
-            cmd.append(f"LEFT JOIN {table} on {learnsets[0]}.pokemon={table}.pokemon")
+        if limit is not None or offset > 0:
+            cmd += " LIMIT ? OFFSET ?"
+            params += (-1 if limit is None else limit, offset)
 
+        if record is not None:
+            yield from self._stream(cmd, params, row_factory=record.row_factory)
+            return
+
+        for row in self._stream(cmd, params):
+            yield row[0]
+
+    def top(self, query, order_by: str, k: int = 10, descending: bool = True) -> list:
+        """
+        The `k` highest (or lowest, with `descending=False`) ranked results
+        """
+        return list(self.ranked(query, order_by, descending=descending, limit=k))
+
+    def page(self, query, order_by: str | None = None, size: int = 20, after: tuple | None = None,
+             descending: bool = False) -> tuple:
+        """
+        One page of ranked results, as (names, cursor)
+
+        Pass the cursor back as `after` for the next page, it is None once
+        the results run out. Unlike an OFFSET, each page costs the same
+        however deep into the results it is. Rows with a NULL `order_by`
+        come last, in either direction
+
+        >>> names, cursor = s.page("fire", order_by="atk")
+        >>> while cursor is not None:
+        >>>     names, cursor = s.page("fire", order_by="atk", after=cursor)
+        """
+        cmd, params = self._ranked_cmd(query, order_by, descending, after)
+
+        rows = self._search(cmd + " LIMIT ?", params + (size + 1,))
+
+        cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            # (is NULL, value, rowid) of the last row shown
+            cursor = tuple(rows[-1][1:])
+
+        return [row[0] for row in rows], cursor
+
+    def search_by_moves(self, names: list, match_all: bool = True) -> list:
+        """
+        Get a list of pokemon that know all the moves in `names`
+
+        With `match_all=False`, pokemon that know any of the moves are returned
+        """
         if len(names) == 0:
             print("names is len 0")
             return []
 
-        tmp = []
-        for move in names:
-            tmp.append(f"{move} IS NOT NULL")
+        index = self.learnset_index
+        if index is not None:
+            if match_all:
+                return index.query(all_of=names)
+            return index.query(any_of=names)
 
-        cmd.append("WHERE " + " OR ".join(tmp))
+        moves = sorted({to_id(name) for name in names})
+        marks = ", ".join(["?"] * len(moves))
 
-        cmd = " ".join(cmd) + ";"
+        if match_all:
+            cmd = (f"SELECT pokemon FROM learnset "
+                   f"WHERE move IN ({marks}) "
+                   f"GROUP BY pokemon "
+                   f"HAVING COUNT(DISTINCT move) = {len(moves)};")
+        else:
+            cmd = (f"SELECT DISTINCT pokemon FROM learnset "
+                   f"WHERE move IN ({marks}) "
+                   f"ORDER BY pokemon;")
 
-        result = self._search(cmd)
+        result = self._search(cmd, tuple(moves))
 
         return [p[0] for p in result]
 
@@ -0,0 +1,188 @@
+from src import package_root
+from src.Database import Database
+from src.Search.MoveSearch import MoveSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+from src.utils.clean_sql import to_id
+
+
+# MoveSearch methods -> the moves column they compare
+MOVE_COLUMNS = {"power": "power",
+                "pp": "pp",
+                "priority": "priority",
+                "crit_ratio": "critRatio"}
+
+# keep well under sqlite's host parameter limit
+CHUNKSIZE = 500
+
+
+class Batch:
+    """
+    Run many independent searches over one connection, in one read transaction
+
+    Requests are tuples of a search name and its arguments:
+
+        ("find_name", "Bulbasaur")          Database.find_name
+        ("type", "fire")                    TypeSearch.search
+        ("stat", "spe >= 100")              StatSearch.search
+        ("learns", ["tackle"], False)       BaseSearch.search_by_moves
+        ("power", "> 100")                  MoveSearch.power, also pp, priority, crit_ratio
+
+    Identical requests run once, all name lookups are merged into one query,
+    all type/stat predicates are evaluated in a single pass over pokemon (as
+    are the move predicates over moves), and all learnset checks share one
+    learnset query. Results match the individual calls, keyed by `Batch.key`
+
+    >>> results = Batch(db).run([("find_name", "Mew"), ("stat", "spe >= 100")])
+    >>> results[("stat", "spe >= 100")]
+    """
+
+    def __init__(self, dbfile):
+        if isinstance(dbfile, Database):
+            self._db = dbfile
+        else:
+            self._db = Database(dbfile)
+
+    @property
+    def db(self):
+        return self._db
+
+    @staticmethod
+    def key(request) -> tuple:
+        """
+        Hashable form of a request, lists become tuples
+        """
+        return tuple(tuple(arg) if isinstance(arg, list) else arg for arg in request)
+
+    def run(self, requests: list) -> dict:
+        # dict rather than set, to keep the order
+        keys = list(dict.fromkeys(self.key(r) for r in requests))
+
+        groups = {"find_name": [], "type": [], "stat": [], "learns": [], "moves": []}
+        for key in keys:
+            kind = key[0]
+            if kind in MOVE_COLUMNS:
+                groups["moves"].append(key)
+            elif kind in groups:
+                groups[kind].append(key)
+            else:
+                raise ValueError(f"Search {kind} not recognised!")
+
+        results = {}
+        with self.db.checkout() as conn:
+            # one consistent snapshot for everything
+            conn.execute("BEGIN")
+            try:
+                self._find_names(conn, groups["find_name"], results)
+
+                clauses = {}
+                for key in groups["type"]:
+                    clauses[key] = TypeSearch.where(key[1])
+                for key in groups["stat"]:
+                    clauses[key] = StatSearch.where(key[1])
+                results.update(self._scan(conn, "pokemon", clauses))
+
+                clauses = {key: MoveSearch.where(f"{MOVE_COLUMNS[key[0]]} {key[1]}") for key in groups["moves"]}
+                # the learnset refers to moves by id, take those as they are
+                moves = self._scan(conn, "moves", clauses, column="id")
+
+                # move searches are "learns any of the matching moves"
+                learns = {key: ({to_id(n) for n in key[1]}, key[2] if len(key) > 2 else True)
+                          for key in groups["learns"]}
+                for key, ids in moves.items():
+                    learns[key] = (set(ids), False)
+                self._learns(conn, learns, results)
+            finally:
+                conn.rollback()
+
+        return results
+
+    def _find_names(self, conn, keys: list, results: dict):
+        if len(keys) == 0:
+            return
+
+        wanted = {}
+        for key in keys:
+            names = key[1] if isinstance(key[1], tuple) else (key[1],)
+            wanted[key] = {n.title() for n in names}
+
+        allnames = sorted(set().union(*wanted.values()))
+
+        rows = []
+        for i in range(0, len(allnames), CHUNKSIZE):
+            chunk = allnames[i:i + CHUNKSIZE]
+            marks = ", ".join(["?"] * len(chunk))
+            rows += conn.execute(f"SELECT rowid, * FROM pokemon WHERE name IN ({marks})", chunk).fetchall()
+
+        # name then table order, as a single find_name reads them off the name index
+        rows = [row[1:] for row in sorted(rows, key=lambda row: (row[2], row[0]))]
+
+        for key, names in wanted.items():
+            results[key] = [row for row in rows if row[1] in names]
+
+    def _scan(self, conn, table: str, clauses: dict, column: str = "name") -> dict:
+        """
+        Evaluate every (sql, params) clause in one pass over `table`, returning
+        `column` (the names by default) per clause
+        """
+        if len(clauses) == 0:
+            return {}
+
+        keys = list(clauses)
+        columns = ", ".join(f"({clauses[k][0]})" for k in keys)
+        where = " OR ".join(f"({clauses[k][0]})" for k in keys)
+
+        params = ()
+        for k in keys:
+            params += clauses[k][1]
+
+        # table order, as the individual searches return it (see BaseSearch._select_cmd)
+        cmd = f"SELECT {column}, {columns} FROM {table} WHERE {where} ORDER BY +rowid"
+
+        out = {k: [] for k in keys}
+        for row in conn.execute(cmd, params * 2):
+            for k, hit in zip(keys, row[1:]):
+                if hit:
+                    out[k].append(row[0])
+
+        return out
+
+    def _learns(self, conn, requests: dict, results: dict):
+        """
+        `requests` maps key -> (set of move ids, match_all)
+        """
+        wanted = requests
+        for key, (moves, _) in wanted.items():
+            if len(moves) == 0:
+                results[key] = []
+
+        allmoves = sorted(set().union(*[moves for moves, _ in wanted.values()]))
+
+        learnsets = {}
+        for i in range(0, len(allmoves), CHUNKSIZE):
+            chunk = allmoves[i:i + CHUNKSIZE]
+            marks = ", ".join(["?"] * len(chunk))
+            for poke, move in conn.execute(f"SELECT pokemon, move FROM learnset WHERE move IN ({marks})", chunk):
+                learnsets.setdefault(poke, set()).add(move)
+
+        ordered = sorted(learnsets)
+        for key, (moves, match_all) in wanted.items():
+            if len(moves) == 0:
+                continue
+            if match_all:
+                results[key] = [p for p in ordered if moves <= learnsets[p]]
+            else:
+                results[key] = [p for p in ordered if not moves.isdisjoint(learnsets[p])]
+
+
+if __name__ == "__main__":
+    db = package_root() / "sql/test.db"
+
+    batch = Batch(db)
+
+    print(batch.run([("find_name", "Bulbasaur"),
+                     ("find_name", ["Charizard", "Darkrai"]),
+                     ("type", "fire"),
+                     ("stat", "spe >= 120"),
+                     ("learns", ["blizzard", "watergun"]),
+                     ("crit_ratio", ">= 2")]))
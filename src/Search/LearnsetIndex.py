@@ -0,0 +1,125 @@
+import threading
+
+from src import package_root
+from src.Database import Database
+from src.utils.clean_sql import to_id
+
+
+class LearnsetIndex:
+    """
+    In-memory pokemon x move bit matrix, built from the learnset table
+
+    Each move maps to a python int with bit `i` set if the `i`th pokemon
+    (sorted by id) learns it, so any/all/none of a set of moves reduce to
+    OR/AND over a handful of ints rather than a trip to sqlite.
+
+    >>> index = LearnsetIndex.load(Database("test.db"))
+    >>> index.query(all_of=["swordsdance", "earthquake", "extremespeed"])
+    """
+
+    # one index per database file, rebuilt when the build version changes
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, pokemon: list, masks: dict, version: str | None = None):
+        self._pokemon = pokemon
+        self._masks = masks
+        self._version = version
+        self._universe = (1 << len(pokemon)) - 1
+
+    @property
+    def pokemon(self) -> list:
+        return self._pokemon
+
+    @property
+    def moves(self) -> list:
+        return list(self._masks)
+
+    @property
+    def version(self):
+        return self._version
+
+    @classmethod
+    def build(cls, db: Database) -> "LearnsetIndex":
+        """
+        Read the whole learnset table into a fresh index
+        """
+        version = db.build_version
+
+        with db.checkout() as conn:
+            rows = conn.execute("SELECT pokemon, move FROM learnset").fetchall()
+
+        pokemon = sorted({p for p, _ in rows})
+        bits = {p: 1 << i for i, p in enumerate(pokemon)}
+
+        masks = {}
+        for poke, move in rows:
+            masks[move] = masks.get(move, 0) | bits[poke]
+
+        return cls(pokemon, masks, version)
+
+    @classmethod
+    def load(cls, db: Database) -> "LearnsetIndex":
+        """
+        Cached index for `db`, rebuilt if the database has been rebuilt since
+        """
+        key = str(db.file)
+        version = db.build_version
+
+        with cls._lock:
+            index = cls._cache.get(key)
+            if index is None or index.version != version:
+                index = cls.build(db)
+                cls._cache[key] = index
+
+        return index
+
+    def mask(self, move: str) -> int:
+        """
+        Bitset of the pokemon that learn `move`
+        """
+        return self._masks.get(to_id(move), 0)
+
+    def names(self, mask: int) -> list:
+        """
+        Unpack a bitset into pokemon ids, in sorted order
+        """
+        out = []
+        while mask:
+            low = mask & -mask
+            out.append(self._pokemon[low.bit_length() - 1])
+            mask ^= low
+
+        return out
+
+    def query_mask(self, all_of: list = (), any_of: list = (), none_of: list = ()) -> int:
+        """
+        Bitset of pokemon learning every move in `all_of`, at least one in
+        `any_of` and none of `none_of`. Empty lists place no constraint
+        """
+        mask = self._universe
+
+        for move in all_of:
+            mask &= self.mask(move)
+
+        if len(any_of) != 0:
+            either = 0
+            for move in any_of:
+                either |= self.mask(move)
+            mask &= either
+
+        for move in none_of:
+            mask &= ~self.mask(move)
+
+        return mask
+
+    def query(self, all_of: list = (), any_of: list = (), none_of: list = ()) -> list:
+        return self.names(self.query_mask(all_of, any_of, none_of))
+
+
+if __name__ == "__main__":
+    db = Database(package_root() / "sql/test.db")
+
+    index = LearnsetIndex.load(db)
+
+    print(index.query(all_of=["swordsdance", "earthquake", "extremespeed"]))
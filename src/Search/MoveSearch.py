@@ -1,52 +1,165 @@
-from BaseSearch import BaseSearch
+from src.Search.BaseSearch import BaseSearch
+from src.update.CreateDatabase import Move
 from src import package_root
 
 
+# moves column (lower case, as sqlite matches them) -> (column, datatype)
+COLUMNS = {c.fieldname.lower(): (c.fieldname, c.datatype) for c in Move.convert}
+
+# the max, z and hidden power variants are never what a move search means,
+# flagged at build time (see Move.prepare) and covered by one index
+REGULAR = "moves.isMax = 0 AND moves.isZ = 0 AND moves.hiddenPower = 0"
+
+# learners modes
+MODES = ("all", "any", "count")
+
+# fraction of the moves past which a learners search scans the learnset
+BROAD = 0.15
+
+# learners plans remembered per MoveSearch, see _plan
+MAX_PLANS = 1024
+
+
 class MoveSearch(BaseSearch):
+    """
+    Searches over move attributes, and the pokemon learning those moves
+
+    Predicates compare any moves column, "power > 80", "type == Fire",
+    "category != Status", or name a BOOL column on its own, "contact"
+
+    >>> s = MoveSearch(db)
+    >>> s.learners(["type == Fire", "category == Physical", "contact"])
+    >>> # > pokemon learning a physical fire contact move
+    """
+
+    table = "moves"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
 
-    def cmd(self, query: str) -> str:
+        # (where, params, build version) -> learnset column to match on
+        self._plans = {}
+
+    def _plan(self, where: str, params: tuple) -> str:
         """
-        Search for a pokemon by single stat
+        How learners matches the moves selected by `where`
 
-        Operators are python syntax, or sql syntax
+        sqlite cannot tell how many moves the subquery matches. A few are
+        best found through the move index, but past BROAD of the table one
+        ordered pass over the learnset is faster, which `+move` forces.
+        Counted once per predicate and build, so repeated searches run a
+        single statement
         """
-        stat, operator, val = query.split()
-
-        stat = stat.lower()
-        val = int(val)
-
-        match operator:
-            case ">":
-                # greater than
-                pass
-            case ">=":
-                # greater than or equal to
-                pass
-            case "==":
-                # equal to
-                pass
-            case "<=":
-                # less than or equal to
-                pass
-            case "<":
-                # less than
-                pass
-            case "<>":
-                # sql not equal to
-                pass
-            case "!=":
-                # python not equal to
-                operator = "<>"
-            case _:
-                raise ValueError(f"Operator {operator} not recognised!")
-
-        cmd = f"SELECT * FROM moves WHERE {stat} {operator} {val} AND pp <> 1 AND NOT name LIKE 'Max%' AND NOT name LIKE 'HiddenPower%'"
-
-        return cmd
+        key = (where, params, self.db.build_version)
+
+        column = self._plans.get(key)
+        if column is None:
+            matched, total = self._search(f"SELECT COUNT(*), (SELECT COUNT(*) FROM moves) FROM moves WHERE {where}",
+                                          params)[0]
+            column = "+move" if matched > BROAD * total else "move"
+
+            if len(self._plans) >= MAX_PLANS:
+                self._plans.clear()
+            self._plans[key] = column
+
+        return column
+
+    @staticmethod
+    def column(name: str) -> tuple:
+        """
+        (column, datatype) of a moves column, matched case insensitively
+        """
+        column = COLUMNS.get(name.lower())
+        if column is None:
+            raise ValueError(f"Column {name} not in table moves!")
+
+        return column
+
+    @classmethod
+    def predicate(cls, query: str) -> tuple:
+        """
+        A single move predicate as a parameterised (sql, params) pair
+        """
+        parts = query.split()
+
+        if len(parts) == 1:
+            column, datatype = cls.column(parts[0])
+            if datatype != "BOOL":
+                raise ValueError(f"Column {column} is not a flag, compare it to a value!")
+            return f"moves.{column} = 1", ()
+
+        if len(parts) == 3 and cls.column(parts[0])[1] == "TEXT":
+            column, operator, val = parts
+            match operator:
+                case "==" | "=":
+                    operator = "="
+                case "!=" | "<>":
+                    operator = "<>"
+                case _:
+                    raise ValueError(f"Operator {operator} not recognised for text!")
+            return f"moves.{cls.column(column)[0]} {operator} ? COLLATE NOCASE", (val,)
+
+        column, operator, val = cls.parse_comparison(query)
+
+        return f"moves.{cls.column(column)[0]} {operator} ?", (val,)
+
+    @classmethod
+    def where(cls, query: str | list) -> tuple:
+        """
+        Moves passing every predicate in `query` (or the single one given)
+        """
+        predicates = [query] if isinstance(query, str) else query
+
+        clauses, params = [], ()
+        for predicate in predicates:
+            clause, values = cls.predicate(predicate)
+            clauses.append(clause)
+            params += values
+
+        return " AND ".join(clauses + [REGULAR]), params
+
+    def learners(self, queries: str | list, mode: str = "all", count: int = 1) -> list:
+        """
+        Ids of the pokemon learning moves that pass `queries`, the moves
+        being selected within the learnset statement
+
+        mode "all"      learns a move passing every predicate
+             "any"      learns a move passing any of the predicates
+             "count"    learns at least `count` moves passing every predicate
+
+        >>> s.learners(["power >= 100", "priority > 0"], mode="any")
+        >>> s.learners(["type == Water", "category != Status"], mode="count", count=10)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Mode {mode} not recognised!")
+
+        predicates = [queries] if isinstance(queries, str) else queries
+
+        if mode == "any":
+            clauses = [self.predicate(predicate) for predicate in predicates]
+            where = f"({' OR '.join(c for c, _ in clauses)}) AND {REGULAR}"
+            params = sum((p for _, p in clauses), ())
+        else:
+            where, params = self.where(predicates)
+
+        moves = f"SELECT id FROM moves WHERE {where}"
+
+        if mode == "count":
+            cmd = (f"SELECT pokemon FROM learnset WHERE move IN ({moves}) "
+                   "GROUP BY pokemon "
+                   "HAVING COUNT(DISTINCT move) >= ?;")
+            result = self._search(cmd, params + (count,))
+            return [p[0] for p in result]
+
+        column = self._plan(where, params)
+
+        cmd = (f"SELECT DISTINCT pokemon FROM learnset WHERE {column} IN ({moves}) "
+               "ORDER BY pokemon;")
+
+        return [p[0] for p in self._search(cmd, params)]
 
     def _query_search(self, column, query):
-        moves = self.search(f"{column} {query}")
-        return self.search_by_moves(moves)
+        return self.learners(f"{column} {query}")
 
     def power(self, query: str) -> list:
         return self._query_search("power", query)
@@ -67,3 +180,4 @@ if __name__ == "__main__":
     test = MoveSearch(db)
 
     print(test.crit_ratio(">= 1"))
+    print(test.learners(["type == Fire", "category == Physical", "contact"]))
@@ -0,0 +1,273 @@
+import collections
+import concurrent.futures
+import itertools
+import threading
+
+from src import package_root
+from src.Database import Database
+from src.Search.StatSearch import StatSearch
+
+
+class _Job:
+    """
+    Results of one `imap` call, filled in by the workers chunk by chunk
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._done = {}
+        self.cancelled = False
+
+    def finish(self, index: int, results: list | None, error: Exception | None = None):
+        with self._cond:
+            self._done[index] = (results, error)
+            self._cond.notify_all()
+
+    def wait(self, index: int) -> list:
+        with self._cond:
+            while index not in self._done:
+                self._cond.wait()
+            results, error = self._done.pop(index)
+
+        if error is not None:
+            raise error
+        return results
+
+    def cancel(self):
+        self.cancelled = True
+
+
+# each worker process holds one search, built by the pool's initializer
+_process_search = None
+
+
+def _init_process(search_class, file, options: dict):
+    global _process_search
+    _process_search = search_class(Database(file, pool_size=1, readonly=True), **options)
+
+
+def _run_chunk(method: str, chunk: list) -> list:
+    call = getattr(_process_search, method)
+    return [call(item) for item in chunk]
+
+
+class ParallelSearch:
+    """
+    Runs large batches of one search method over workers, each holding its
+    own read-only connection
+
+    sqlite releases the GIL while a statement runs, so worker threads overlap
+    their queries. With `processes`, each worker is a separate process
+    instead, which also parallelises the python side of each search
+
+    Queries are split into chunks of `chunksize`, dealt out to per-worker
+    queues. A worker that runs out steals from the back of the longest
+    queue. Results come back in input order, and at most `max_pending`
+    chunks are read ahead of the consumer, so an iterator of any length can
+    be streamed through `imap` in bounded memory
+
+    The database must not be modified while the workers are running
+
+    >>> with ParallelSearch(StatSearch, "test.db", workers=4) as pool:
+    >>>     results = pool.map("search", ["spe >= 100", "atk < 60", ...])
+    """
+
+    def __init__(self, search_class, dbfile, workers: int = 4, processes: bool = False,
+                 chunksize: int = 16, max_pending: int | None = None, cache_size: int = 1024, **options):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+
+        # workers open their own connections, rather than share a pool
+        if isinstance(dbfile, Database):
+            dbfile = dbfile.file
+
+        self._search_class = search_class
+        self._file = dbfile
+        self._workers = workers
+        self._processes = processes
+        self._chunksize = chunksize
+        self._max_pending = 4 * workers if max_pending is None else max_pending
+        self._options = options
+
+        self._closed = False
+        self.stolen = 0
+
+        self._db = None
+        self._executor = None
+        self._threads = []
+
+        if processes:
+            self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+                                                                    initializer=_init_process,
+                                                                    initargs=(search_class, dbfile, options))
+            return
+
+        # one pinned connection per worker thread
+        self._db = Database(dbfile, pool_size=workers, readonly=True, cache_size=cache_size)
+
+        self._cond = threading.Condition()
+        self._queues = [collections.deque() for _ in range(workers)]
+        self._next = 0
+
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, args=(i,), name=f"pokedb-parallel-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    @property
+    def processes(self) -> bool:
+        return self._processes
+
+    @property
+    def max_pending(self) -> int:
+        return self._max_pending
+
+    def _take(self, worker: int):
+        with self._cond:
+            while True:
+                own = self._queues[worker]
+                if own:
+                    return own.popleft()
+
+                # the longest queue has the most work left to share
+                victim = max(self._queues, key=len)
+                if victim:
+                    self.stolen += 1
+                    return victim.pop()
+
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _work(self, worker: int):
+        search = self._search_class(self._db, **self._options)
+        # a swap may give the Database a new pool, unpin from this one
+        pool = self._db.pool
+        pool.thread_connection()
+
+        try:
+            while True:
+                task = self._take(worker)
+                if task is None:
+                    return
+
+                job, index, method, chunk = task
+                if job.cancelled:
+                    continue
+
+                try:
+                    call = getattr(search, method)
+                    job.finish(index, [call(item) for item in chunk])
+                except Exception as E:
+                    job.finish(index, None, E)
+        finally:
+            pool.unpin()
+
+    def _submit(self, task: tuple):
+        with self._cond:
+            self._queues[self._next % self.workers].append(task)
+            self._next += 1
+            self._cond.notify()
+
+    def _chunks(self, items, chunksize: int):
+        it = iter(items)
+        while True:
+            chunk = list(itertools.islice(it, chunksize))
+            if len(chunk) == 0:
+                return
+            yield chunk
+
+    def imap(self, method: str, items, chunksize: int | None = None):
+        """
+        Yield `getattr(search, method)(item)` for each of `items`, in order
+        """
+        if self._closed:
+            raise RuntimeError("parallel search is closed")
+        if not callable(getattr(self._search_class, method, None)):
+            raise ValueError(f"Search {method} not recognised!")
+
+        chunks = self._chunks(items, self._chunksize if chunksize is None else chunksize)
+
+        if self.processes:
+            yield from self._imap_processes(method, chunks)
+            return
+
+        job = _Job()
+        submitted = 0
+        exhausted = False
+        try:
+            for index in itertools.count():
+                # backpressure, stop reading input while the consumer lags
+                while not exhausted and submitted - index < self.max_pending:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        exhausted = True
+                        break
+                    self._submit((job, submitted, method, chunk))
+                    submitted += 1
+
+                if index == submitted:
+                    return
+
+                yield from job.wait(index)
+        finally:
+            # chunks still queued are skipped by the workers
+            job.cancel()
+
+    def _imap_processes(self, method: str, chunks):
+        pending = collections.deque()
+        try:
+            for chunk in chunks:
+                pending.append(self._executor.submit(_run_chunk, method, chunk))
+                if len(pending) >= self.max_pending:
+                    yield from pending.popleft().result()
+
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def map(self, method: str, items, chunksize: int | None = None) -> list:
+        """
+        Results of `imap`, as a list
+        """
+        return list(self.imap(method, items, chunksize))
+
+    def close(self):
+        if self._closed:
+            return
+
+        if self.processes:
+            self._closed = True
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            return
+
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+
+        self._db.close()
+
+
+if __name__ == "__main__":
+    db = package_root() / "sql/test.db"
+
+    queries = [f"spe >= {speed}" for speed in range(0, 200, 5)]
+
+    with ParallelSearch(StatSearch, db, workers=4) as pool:
+        for query, names in zip(queries, pool.imap("search", queries)):
+            print(query, len(names))
@@ -0,0 +1,327 @@
+"""
+Columnar, in-memory copy of the pokemon table for vectorized filtering
+
+Requires numpy, which is optional: everything else in the package works
+without it, only loading a snapshot raises ImportError
+"""
+import ast
+import operator
+import re
+import threading
+
+from src import package_root
+from src.Database import Database
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+STATS = ["hp", "atk", "def", "spa", "spd", "spe"]
+
+# string literals are passed through untouched, everything else is a word or symbol
+WORD = re.compile(r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|([A-Za-z_]\w*)|(<>|!=|==|>=|<=|=)""")
+
+BINARY = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+          ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+          ast.Pow: operator.pow, ast.BitAnd: operator.and_, ast.BitOr: operator.or_}
+
+COMPARE = {ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt,
+           ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge}
+
+
+def either(*masks):
+    """
+    OR of the NULL masks given, None standing for no NULLs
+    """
+    masks = [m for m in masks if m is not None]
+    if not masks:
+        return None
+    return np.logical_or.reduce(masks)
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("PokemonSnapshot requires numpy, install it with `pip install numpy`")
+
+
+class PokemonSnapshot:
+    """
+    One numpy array per column of the pokemon table, plus `bst` (the sum of
+    the six base stats)
+
+    Expressions are python or sql flavoured, over column names, numbers and
+    strings: arithmetic, comparisons, `in`, `and`/`or`/`not` and abs/min/max
+
+    >>> snapshot = PokemonSnapshot.load(Database("test.db"))
+    >>> snapshot.names("atk + spa >= 250 and spe > 100", order_by="bst", descending=True)
+    >>> snapshot.names("type1 in ('Fire', 'Water') AND bst >= 600", limit=10)
+    """
+
+    # one snapshot per database file, rebuilt when the build version changes
+    _cache = {}
+    _lock = threading.Lock()
+
+    def __init__(self, columns: dict, version: str | None = None, nulls: dict | None = None):
+        self._columns = columns
+        self._version = version
+        self._size = len(columns["rowid"])
+
+        # column -> mask of its NULL rows, for the columns holding any
+        self._nulls = {} if nulls is None else nulls
+
+        self._functions = {"abs": np.abs, "min": np.minimum, "max": np.maximum}
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def columns(self) -> list:
+        return list(self._columns)
+
+    @property
+    def version(self):
+        return self._version
+
+    def column(self, name: str):
+        return self._columns[name.lower()]
+
+    @classmethod
+    def build(cls, db: Database) -> "PokemonSnapshot":
+        """
+        Read the whole pokemon table into a fresh snapshot
+        """
+        require_numpy()
+
+        version = db.build_version
+
+        with db.checkout() as conn:
+            info = conn.execute("PRAGMA table_info(pokemon)").fetchall()
+            rows = conn.execute("SELECT rowid, * FROM pokemon ORDER BY rowid").fetchall()
+
+        names = ["rowid"] + [row[1].lower() for row in info]
+        types = ["INT"] + [row[2].upper() for row in info]
+
+        columns = {}
+        nulls = {}
+        for i, (name, datatype) in enumerate(zip(names, types)):
+            values = [row[i] for row in rows]
+
+            # the placeholders below still compare (NaN != x is true), every
+            # condition is masked with these instead, see _condition
+            if None in values:
+                nulls[name] = np.array([v is None for v in values], dtype=bool)
+
+            if datatype == "TEXT":
+                columns[name] = np.array(["" if v is None else v for v in values], dtype=str)
+            elif None in values or datatype != "INT":
+                columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                columns[name] = np.array(values, dtype=np.int64)
+
+        columns["bst"] = sum(columns[stat] for stat in STATS)
+        unknown = either(*[nulls.get(stat) for stat in STATS])
+        if unknown is not None:
+            nulls["bst"] = unknown
+
+        return cls(columns, version, nulls)
+
+    @classmethod
+    def load(cls, db: Database) -> "PokemonSnapshot":
+        """
+        Cached snapshot for `db`, rebuilt if the database has been rebuilt since
+        """
+        key = str(db.file)
+        version = db.build_version
+
+        with cls._lock:
+            snapshot = cls._cache.get(key)
+            if snapshot is None or snapshot.version != version:
+                snapshot = cls.build(db)
+                cls._cache[key] = snapshot
+
+        return snapshot
+
+    def parse(self, expression: str) -> ast.expr:
+        """
+        Parse an expression, after renaming the columns out of python's way
+        (`def` is a keyword) and translating the sql operators and keywords
+        """
+        def replace(match):
+            string, word, symbol = match.groups()
+            if string is not None:
+                return string
+            if symbol is not None:
+                return {"=": "==", "<>": "!="}.get(symbol, symbol)
+
+            lower = word.lower()
+            if lower in self._columns:
+                return f"_{lower}"
+            if lower in ("and", "or", "not", "in"):
+                return lower
+            return word
+
+        try:
+            return ast.parse(WORD.sub(replace, expression).strip(), mode="eval").body
+        except SyntaxError:
+            raise ValueError(f"Expression {expression!r} could not be parsed!") from None
+
+    def _eval(self, node: ast.expr):
+        match node:
+            case ast.Constant(value=value) if isinstance(value, (int, float, str)):
+                return value
+            case ast.Name(id=name) if name.startswith("_") and name[1:] in self._columns:
+                return self._columns[name[1:]]
+            case ast.Tuple(elts=elts) | ast.List(elts=elts):
+                return [self._eval(e) for e in elts]
+            case ast.BinOp(left=left, op=op, right=right) if type(op) in BINARY:
+                return BINARY[type(op)](self._eval(left), self._eval(right))
+            case ast.UnaryOp(op=ast.USub(), operand=operand):
+                return -self._eval(operand)
+            case ast.UnaryOp(op=ast.Not()) | ast.BoolOp() | ast.Compare():
+                return self._condition(node)[0]
+            case ast.Call(func=ast.Name(id=name), args=args) if name in self._functions:
+                return self._functions[name](*[self._eval(a) for a in args])
+            case ast.Name(id=name):
+                raise ValueError(f"Column {name.lstrip('_')} not recognised!")
+
+        raise ValueError(f"Expression {ast.unparse(node)!r} not supported!")
+
+    def _null(self, node: ast.expr):
+        """
+        Mask of the rows where the value of `node` is NULL (as in sql, any
+        arithmetic on a NULL is NULL), None where no row is
+        """
+        match node:
+            case ast.Name(id=name) if name.startswith("_"):
+                return self._nulls.get(name[1:])
+            case ast.BinOp(left=left, right=right):
+                return either(self._null(left), self._null(right))
+            case ast.UnaryOp(op=ast.USub(), operand=operand):
+                return self._null(operand)
+            case ast.Call(args=args):
+                return either(*[self._null(a) for a in args])
+            case ast.UnaryOp(op=ast.Not()) | ast.BoolOp() | ast.Compare():
+                return self._condition(node)[1]
+
+        return None
+
+    def _condition(self, node: ast.expr) -> tuple:
+        """
+        (true, unknown) masks of a condition, in sql's three valued logic: a
+        comparison with a NULL is unknown, and so is NOT unknown, so neither
+        matches. TRUE OR unknown and FALSE AND unknown are still decided.
+        `unknown` is None where no row is
+        """
+        match node:
+            case ast.UnaryOp(op=ast.Not(), operand=operand):
+                true, unknown = self._condition(operand)
+                if unknown is None:
+                    return ~true, None
+                return ~true & ~unknown, unknown
+            case ast.BoolOp(op=op, values=values):
+                return self._combine(isinstance(op, ast.And), [self._condition(v) for v in values])
+            case ast.Compare(left=left, ops=ops, comparators=comparators):
+                # chained, `50 < spe <= 100`, ANDs each comparison
+                parts = []
+                lhs, lhs_null = self._eval(left), self._null(left)
+                for op, comparator in zip(ops, comparators):
+                    rhs, rhs_null = self._eval(comparator), self._null(comparator)
+                    if isinstance(op, (ast.In, ast.NotIn)):
+                        result = np.isin(lhs, rhs)
+                        if isinstance(op, ast.NotIn):
+                            result = ~result
+                    elif type(op) in COMPARE:
+                        result = COMPARE[type(op)](lhs, rhs)
+                    else:
+                        raise ValueError(f"Comparison {type(op).__name__} not supported!")
+
+                    # the NULL placeholders still compare, NaN != x is true
+                    unknown = either(lhs_null, rhs_null)
+                    result = self._mask(result)
+                    parts.append((result, None) if unknown is None else (result & ~unknown, unknown))
+                    lhs, lhs_null = rhs, rhs_null
+
+                return self._combine(True, parts)
+
+        return self._mask(self._eval(node)), self._null(node)
+
+    @staticmethod
+    def _combine(conjunction: bool, conditions: list) -> tuple:
+        """
+        AND (or OR) of (true, unknown) conditions, see _condition
+        """
+        trues = [c[0] for c in conditions]
+        unknowns = [c[1] for c in conditions if c[1] is not None]
+
+        if conjunction:
+            true = np.logical_and.reduce(trues)
+            if not unknowns:
+                return true, None
+            # unknown unless some part is false
+            false = np.logical_or.reduce([~t & ~u if u is not None else ~t for t, u in conditions])
+            return true, ~true & ~false
+
+        true = np.logical_or.reduce(trues)
+        if not unknowns:
+            return true, None
+        return true, ~true & np.logical_or.reduce(unknowns)
+
+    def _mask(self, value):
+        mask = np.asarray(value)
+        if mask.dtype != bool:
+            raise ValueError("Expression does not evaluate to a condition")
+        return np.broadcast_to(mask, (self._size,))
+
+    def evaluate(self, expression: str):
+        """
+        Array of the expression's value for every pokemon
+        """
+        return np.broadcast_to(self._eval(self.parse(expression)), (self._size,))
+
+    def select(self, where: str | None = None, order_by: str | None = None,
+               descending: bool = False, limit: int | None = None):
+        """
+        Positions (in table order) of the pokemon matching `where`, sorted by
+        the `order_by` expression if given
+        """
+        if where is None:
+            positions = np.arange(self._size)
+        else:
+            positions = np.flatnonzero(self._mask(self._eval(self.parse(where))))
+
+        if order_by is not None:
+            keys = self.evaluate(order_by)[positions]
+            if descending and keys.dtype.kind in "iuf":
+                order = np.argsort(-keys, kind="stable")
+            else:
+                order = np.argsort(keys, kind="stable")
+                if descending:
+                    order = order[::-1]
+            positions = positions[order]
+
+        if limit is not None:
+            positions = positions[:limit]
+
+        return positions
+
+    def names(self, *args, **kwargs) -> list:
+        """
+        Names of the pokemon `select` picks, see `select`
+        """
+        return self._columns["name"][self.select(*args, **kwargs)].tolist()
+
+    def rowids(self, *args, **kwargs) -> list:
+        """
+        Rowids in the pokemon table of the pokemon `select` picks, see `select`
+        """
+        return self._columns["rowid"][self.select(*args, **kwargs)].tolist()
+
+
+if __name__ == "__main__":
+    db = Database(package_root() / "sql/test.db")
+
+    snapshot = PokemonSnapshot.load(db)
+
+    print(snapshot.names("atk + spa >= 250 and spe > 100", order_by="bst", descending=True, limit=10))
@@ -0,0 +1,152 @@
+import sqlite3
+
+from src import package_root
+from src.Database import Database
+from src.Search.MoveSearch import MoveSearch
+from src.Search.SourceSearch import SourceSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+from src.utils.clean_sql import to_id
+
+
+class Query:
+    """
+    Lazy, composable pokemon search
+
+    Each call adds a predicate (ANDed with the existing ones) and returns a
+    new Query, nothing touches the database until the results are iterated,
+    at which point the whole thing is compiled to one SQL statement
+
+    >>> q = Query(db).type("fire").stat("spe >= 100").learns(["flareblitz"])
+    >>> list(q)
+    >>> # > names of fast fire types with flare blitz
+
+    >>> list(Query(db).type("water") | ~Query(db).stat("hp < 100"))
+    """
+
+    def __init__(self, dbfile=None, where: str | None = None, params: tuple = ()):
+        if dbfile is None or isinstance(dbfile, Database):
+            self._db = dbfile
+        else:
+            self._db = Database(dbfile)
+
+        self._where = where
+        self._params = params
+
+    @property
+    def db(self):
+        return self._db
+
+    def _derive(self, where: str | None, params: tuple, other: "Query | None" = None) -> "Query":
+        db = self.db
+        if db is None and other is not None:
+            db = other.db
+        return Query(db, where, params)
+
+    def _and(self, where: str, params: tuple, other: "Query | None" = None) -> "Query":
+        if self._where is None:
+            return self._derive(where, params, other)
+        return self._derive(f"({self._where}) AND ({where})", self._params + params, other)
+
+    def type(self, query: str | list) -> "Query":
+        """
+        Pokemon with any of the types in `query`, see TypeSearch
+        """
+        return self._and(*TypeSearch.where(query))
+
+    def stat(self, query: str) -> "Query":
+        """
+        Pokemon passing a single stat comparison, see StatSearch
+        """
+        return self._and(*StatSearch.where(query))
+
+    def learns(self, names: list, match_all: bool = True) -> "Query":
+        """
+        Pokemon that learn all (or any) of the moves in `names`
+        """
+        moves = tuple(sorted({to_id(name) for name in names}))
+        marks = ", ".join(["?"] * len(moves))
+
+        where = f"id IN (SELECT pokemon FROM learnset WHERE move IN ({marks})"
+        if match_all:
+            where += f" GROUP BY pokemon HAVING COUNT(DISTINCT move) = {len(moves)}"
+        where += ")"
+
+        return self._and(where, moves)
+
+    def move(self, query: str | list) -> "Query":
+        """
+        Pokemon that learn a move passing the comparison (or all of a list of
+        them), see MoveSearch
+        """
+        clause, params = MoveSearch.where(query)
+
+        where = ("id IN (SELECT learnset.pokemon FROM learnset "
+                 "JOIN moves ON moves.id = learnset.move "
+                 f"WHERE {clause})")
+
+        return self._and(where, params)
+
+    def source(self, query: dict) -> "Query":
+        """
+        Pokemon with a learnset source passing the filters in `query`, see SourceSearch
+        """
+        clause, params = SourceSearch.where(query)
+
+        return self._and(f"id IN (SELECT pokemon FROM learnset_source WHERE {clause})", params)
+
+    def __and__(self, other: "Query") -> "Query":
+        if other._where is None:
+            return self._derive(self._where, self._params, other)
+        return self._and(other._where, other._params, other)
+
+    def __or__(self, other: "Query") -> "Query":
+        # an empty query matches everything
+        if self._where is None or other._where is None:
+            return self._derive(None, (), other)
+        return self._derive(f"({self._where}) OR ({other._where})", self._params + other._params, other)
+
+    def __invert__(self) -> "Query":
+        if self._where is None:
+            return self._derive("0", ())
+        # a predicate over a NULL column (type2 of a single typed pokemon) is
+        # NULL rather than false, and NOT NULL would drop the row as well
+        return self._derive(f"NOT COALESCE(({self._where}), 0)", self._params)
+
+    def compile(self) -> tuple:
+        """
+        The single statement this query runs, as a (sql, params) pair
+        """
+        cmd = "SELECT name FROM pokemon"
+        if self._where is not None:
+            cmd += f" WHERE {self._where}"
+
+        return cmd + ";", self._params
+
+    def __iter__(self):
+        if self.db is None:
+            raise ValueError("Query has no database to run against")
+
+        cmd, params = self.compile()
+
+        # through fetchall, for its result cache and instrumentation
+        try:
+            rows = self.db.fetchall(cmd, params)
+        except sqlite3.OperationalError as E:
+            print(f"error in query:\n{cmd}")
+            raise E
+
+        for row in rows:
+            yield row[0]
+
+    def search(self) -> list:
+        return list(self)
+
+
+if __name__ == "__main__":
+    db = package_root() / "sql/test.db"
+
+    query = Query(db).type("fire").stat("spe >= 100").learns(["flareblitz"])
+
+    print(query.compile())
+    print(query.search())
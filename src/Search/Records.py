@@ -0,0 +1,129 @@
+import keyword
+import threading
+
+from src import package_root
+from src.Database import Database
+from src.update.CreateDatabase import Learnset, LearnsetSource, Move, Pokemon
+
+
+class Record(tuple):
+    """
+    Typed, read-only row, no bigger than the plain tuple sqlite returns
+
+    Columns are read by attribute (python keywords get a trailing
+    underscore, `row.def_`), by index, or by name with `row["def"]`.
+    Values are kept as sqlite returned them and decoded on access, so BOOL
+    columns only become bools when read
+
+    >>> PokemonRecord = record_class("pokemon", ["name", "spe"])
+    >>> row = PokemonRecord(("Pikachu", 90))
+    >>> row.name, row.spe
+    """
+
+    __slots__ = ()
+
+    table = None
+    fields = ()
+    types = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return getattr(self, attribute_name(key))
+        return tuple.__getitem__(self, key)
+
+    def __repr__(self):
+        values = ", ".join(f"{f}={getattr(self, attribute_name(f))!r}" for f in self.fields)
+        return f"{type(self).__name__}({values})"
+
+    def as_dict(self) -> dict:
+        return {field: getattr(self, attribute_name(field)) for field in self.fields}
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        """
+        For `Connection.row_factory` / `Cursor.row_factory`, the cursor is ignored
+        """
+        return tuple.__new__(cls, row)
+
+
+# the Injectors whose Conversions define each table's columns
+INJECTORS = {"pokemon": Pokemon, "moves": Move, "learnset": Learnset, "learnset_source": LearnsetSource}
+
+_classes = {}
+_lock = threading.Lock()
+
+
+def attribute_name(field: str) -> str:
+    return field + "_" if keyword.iskeyword(field) else field
+
+
+def schema(table: str) -> list:
+    """
+    (column, datatype) pairs of `table`, in table order
+    """
+    injector = INJECTORS.get(table)
+    if injector is None:
+        raise ValueError(f"Table {table} not recognised!")
+
+    if len(injector.convert) == 0:
+        types = getattr(injector, "types", ["TEXT"] * len(injector.columns))
+        return list(zip(injector.columns, types))
+
+    return [(c.fieldname, c.datatype) for c in injector.convert]
+
+
+def _accessor(i: int, datatype: str) -> property:
+    if datatype == "BOOL":
+        def get(self):
+            value = tuple.__getitem__(self, i)
+            return None if value is None else bool(value)
+    else:
+        def get(self):
+            return tuple.__getitem__(self, i)
+
+    return property(get)
+
+
+def record_class(table: str, columns: list | None = None) -> type:
+    """
+    Record subclass for the given `columns` of `table` (all of them if None)
+
+    Classes are generated once per projection and reused
+    """
+    types = dict(schema(table))
+    if columns is None:
+        columns = list(types)
+    else:
+        # sqlite's column names are case insensitive, match it
+        exact = {column.lower(): column for column in types}
+        columns = [exact.get(column.lower(), column) for column in columns]
+
+    key = (table, tuple(columns))
+
+    with _lock:
+        cls = _classes.get(key)
+        if cls is not None:
+            return cls
+
+        namespace = {"__slots__": (), "table": table, "fields": tuple(columns)}
+        namespace["types"] = tuple(types.get(c, "TEXT") for c in columns)
+
+        for i, (column, datatype) in enumerate(zip(columns, namespace["types"])):
+            if column not in types:
+                raise ValueError(f"Column {column} not in table {table}!")
+            namespace[attribute_name(column)] = _accessor(i, datatype)
+
+        name = "".join(part.title() for part in table.split("_")).rstrip("s")
+        cls = type(name + "Record", (Record,), namespace)
+        _classes[key] = cls
+
+    return cls
+
+
+if __name__ == "__main__":
+    db = Database(package_root() / "sql/test.db")
+
+    PokemonRecord = record_class("pokemon")
+
+    for row in db.fetchall("SELECT * FROM pokemon LIMIT 3", row_factory=PokemonRecord.row_factory):
+        print(row)
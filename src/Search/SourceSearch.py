@@ -0,0 +1,145 @@
+from src import package_root
+from src.Search.BaseSearch import BaseSearch
+from src.update.CreateDatabase import SOURCE_METHODS
+from src.utils.clean_sql import to_id
+
+
+class SourceSearch(BaseSearch):
+    """
+    Searches over how moves are learnt, the learnset_source table
+
+    Queries are dicts of any of:
+
+        move        a move, or list of moves
+        gen         a generation, or list of generations
+        method      "L", "level up", ..., or a list of them (see SOURCE_METHODS)
+        max_level   learnt by level up at or below this level
+
+    >>> s = SourceSearch(db)
+    >>> s.search({"move": "swordsdance", "gen": 9, "max_level": 30})
+    >>> # > pokemon learning swords dance by level 30 in gen 9
+    """
+
+    table = "learnset_source"
+    namecol = "pokemon"
+
+    @staticmethod
+    def method_code(method: str) -> str:
+        """
+        Showdown's letter for a method, given the letter or its name
+        """
+        if method.upper() in SOURCE_METHODS:
+            return method.upper()
+
+        names = {to_id(name): code for code, name in SOURCE_METHODS.items()}
+        code = names.get(to_id(method))
+        if code is None:
+            raise ValueError(f"Method {method} not recognised!")
+
+        return code
+
+    @staticmethod
+    def _match(column: str, value, params: list) -> str:
+        if isinstance(value, (list, tuple, set)):
+            value = list(value)
+            params.extend(value)
+            return f"{column} IN ({', '.join(['?'] * len(value))})"
+
+        params.append(value)
+        return f"{column} = ?"
+
+    @classmethod
+    def where(cls, query: dict) -> tuple:
+        unknown = set(query) - {"move", "gen", "method", "max_level", "pokemon"}
+        if unknown:
+            raise ValueError(f"Filters {sorted(unknown)} not recognised!")
+
+        clauses, params = [], []
+
+        if query.get("pokemon") is not None:
+            pokemon = query["pokemon"]
+            pokemon = [to_id(p) for p in pokemon] if isinstance(pokemon, (list, tuple)) else to_id(pokemon)
+            clauses.append(cls._match("pokemon", pokemon, params))
+
+        if query.get("move") is not None:
+            move = query["move"]
+            move = [to_id(m) for m in move] if isinstance(move, (list, tuple)) else to_id(move)
+            clauses.append(cls._match("move", move, params))
+
+        if query.get("gen") is not None:
+            clauses.append(cls._match("gen", query["gen"], params))
+
+        if query.get("method") is not None:
+            method = query["method"]
+            method = [cls.method_code(m) for m in method] if isinstance(method, (list, tuple)) else cls.method_code(method)
+            clauses.append(cls._match("method", method, params))
+
+        if query.get("max_level") is not None:
+            clauses.append("level <= ?")
+            params.append(int(query["max_level"]))
+
+        if len(clauses) == 0:
+            return "1", ()
+
+        return " AND ".join(clauses), tuple(params)
+
+    def search(self, query: dict) -> list:
+        """
+        Ids of the pokemon with a source passing every filter in `query`
+        """
+        where, params = self.where(query)
+
+        result = self._search(f"SELECT DISTINCT pokemon FROM {self.table} WHERE {where} ORDER BY pokemon;", params)
+
+        return [p[0] for p in result]
+
+    def moves(self, pokemon: str, **filters) -> list:
+        """
+        Moves `pokemon` can learn through a source passing `filters`
+
+        >>> s.moves("pikachu", gen=9, method="level up", max_level=20)
+        """
+        where, params = self.where({"pokemon": pokemon, **filters})
+
+        result = self._search(f"SELECT DISTINCT move FROM {self.table} WHERE {where} ORDER BY move;", params)
+
+        return [m[0] for m in result]
+
+    def sources(self, pokemon: str, move: str) -> list:
+        """
+        Every way `pokemon` learns `move`, as Records of (gen, method, level, extra)
+        """
+        return self.rows({"pokemon": pokemon, "move": move}, ["gen", "method", "level", "extra"])
+
+    def search_by_moves(self, names: list, match_all: bool = True, **filters) -> list:
+        """
+        BaseSearch.search_by_moves, counting only sources passing `filters`
+        """
+        if len(filters) == 0:
+            return super().search_by_moves(names, match_all)
+
+        if len(names) == 0:
+            return []
+
+        moves = sorted({to_id(name) for name in names})
+        where, params = self.where({"move": moves, **filters})
+
+        if match_all:
+            cmd = (f"SELECT pokemon FROM {self.table} "
+                   f"WHERE {where} "
+                   f"GROUP BY pokemon "
+                   f"HAVING COUNT(DISTINCT move) = {len(moves)};")
+        else:
+            cmd = (f"SELECT DISTINCT pokemon FROM {self.table} "
+                   f"WHERE {where} "
+                   f"ORDER BY pokemon;")
+
+        return [p[0] for p in self._search(cmd, params)]
+
+
+if __name__ == "__main__":
+    db = package_root() / "sql/test.db"
+
+    test = SourceSearch(db)
+
+    print(test.search({"move": "swordsdance", "gen": 9, "method": "level up", "max_level": 30}))
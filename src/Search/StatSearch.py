@@ -1,8 +1,27 @@
-from BaseSearch import BaseSearch
+from src.Search.BaseSearch import BaseSearch
+from src.Search.PokemonSnapshot import PokemonSnapshot
 from src import package_root
 
 
 class StatSearch(BaseSearch):
+    """
+    With `snapshot=True`, searches are answered from a PokemonSnapshot
+    (requires numpy) rather than by sqlite
+    """
+
+    def __init__(self, *args, snapshot: bool = False, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self._use_snapshot = snapshot
+
+    @property
+    def snapshot(self) -> PokemonSnapshot | None:
+        """
+        Columnar snapshot of the pokemon table, if enabled
+        """
+        if not self._use_snapshot:
+            return None
+        return PokemonSnapshot.load(self.db)
 
     def cmd(self, query: str) -> str:
         """
@@ -10,40 +29,37 @@ class StatSearch(BaseSearch):
 
         Operators are python syntax, or sql syntax
         """
-        stat, operator, val = query.split()
-
-        stat = stat.lower()
-        val = int(val)
-
-        match operator:
-            case ">":
-                # greater than
-                pass
-            case ">=":
-                # greater than or equal to
-                pass
-            case "==":
-                # equal to
-                pass
-            case "<=":
-                # less than or equal to
-                pass
-            case "<":
-                # less than
-                pass
-            case "<>":
-                # sql not equal to
-                pass
-            case "!=":
-                # python not equal to
-                operator = "<>"
-            case _:
-                raise ValueError(f"Operator {operator} not recognised!")
+        stat, operator, val = self.parse_comparison(query)
 
         cmd = f"SELECT * FROM pokemon WHERE {stat} {operator} {val}"
 
         return cmd
 
+    @classmethod
+    def where(cls, query: str) -> tuple:
+        stat, operator, val = cls.parse_comparison(query)
+
+        return f"{stat} {operator} ?", (val,)
+
+    def search(self, query: str) -> list:
+        snapshot = self.snapshot
+        if snapshot is None:
+            return super().search(query)
+
+        stat, operator, val = self.parse_comparison(query)
+
+        return snapshot.names(f"{stat} {operator} {val}")
+
+    def expression(self, where: str, order_by: str | None = None,
+                   descending: bool = False, limit: int | None = None) -> list:
+        """
+        Search by any expression over the pokemon columns, always through a
+        snapshot (requires numpy)
+
+        >>> s.expression("atk + spa >= 250 and spe > 100", order_by="bst", descending=True)
+        """
+        return PokemonSnapshot.load(self.db).names(where, order_by=order_by, descending=descending, limit=limit)
+
 
 if __name__ == "__main__":
     db = package_root() / "sql/test.db"
@@ -1,4 +1,4 @@
-from BaseSearch import BaseSearch
+from src.Search.BaseSearch import BaseSearch
 from src import package_root
 
 
@@ -27,6 +27,15 @@ class TypeSearch(BaseSearch):
                     f"WHERE type1 in {clean} "
                     f"OR type2 in {clean};")
 
+    @classmethod
+    def where(cls, query: str | list) -> tuple:
+        types = [query] if isinstance(query, str) else list(query)
+        types = tuple(t.title() for t in types)
+
+        marks = ", ".join(["?"] * len(types))
+
+        return f"(type1 IN ({marks}) OR type2 IN ({marks}))", types * 2
+
 
 if __name__ == "__main__":
     db = package_root() / "sql/test.db"
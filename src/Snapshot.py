@@ -0,0 +1,468 @@
+"""
+Prebuilt, memory-mapped binary snapshot of a built database
+
+For short-lived processes that want an answer without paying for sqlite:
+opening a snapshot maps the file and parses a small header, columns
+are only touched when a query reads them. Only the standard library is
+imported, sqlite3 included only when writing or checking for staleness
+
+Layout, all integers in the byte order recorded in the header:
+
+    magic (8 bytes) | format version (u32) | header length (u32) | header
+
+The header is a marshalled dict (marshal format 4, readable by any python
+since 3.4), cheaper to load than json, which would drag in `re`
+    sections, each 8 byte aligned, located by (offset, length, typecode)
+
+Columns are int64 ('q', NULL stored as INT_NULL), float64 ('d', NULL as NaN)
+or int32 indices into one shared string table ('i', NULL as -1). The
+learnset is stored per move, as the sorted string ids of the pokemon
+learning it
+"""
+import array
+import bisect
+import marshal
+import math
+import mmap
+import os
+import struct
+import sys
+
+from src import package_root
+
+
+MAGIC = b"PKSNAP\x00\x00"
+FORMAT_VERSION = 1
+PREAMBLE = struct.Struct("<8sII")
+
+INT_NULL = -(1 << 63)
+
+# utils.clean_sql.to_id, without paying for importing re
+ID_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+
+TABLES = ("pokemon", "moves")
+
+# the operators `StatSearch` accepts, see BaseSearch.parse_comparison
+OPERATORS = {">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+             "<": lambda a, b: a < b, "<=": lambda a, b: a <= b,
+             "==": lambda a, b: a == b, "<>": lambda a, b: a != b, "!=": lambda a, b: a != b}
+
+
+def default_path(dbfile) -> str:
+    """
+    Where the snapshot of `dbfile` is written alongside it
+    """
+    return os.path.splitext(os.fspath(dbfile))[0] + ".snapshot"
+
+
+def read_only_uri(dbfile) -> str:
+    """
+    `dbfile` as a read-only sqlite URI, which (unlike a plain connect) never
+    creates the file. Escaped by hand, urllib would pull in `re`
+    """
+    path = os.path.abspath(os.fspath(dbfile))
+    for char, escaped in (("%", "%25"), ("?", "%3f"), ("#", "%23")):
+        path = path.replace(char, escaped)
+
+    return f"file:{path}?mode=ro"
+
+
+def read_build_version(dbfile) -> str | None:
+    """
+    The build version stamped in `dbfile`, raises FileNotFoundError if missing
+    """
+    import sqlite3
+
+    try:
+        conn = sqlite3.connect(read_only_uri(dbfile), uri=True)
+    except sqlite3.OperationalError:
+        if not os.path.exists(dbfile):
+            raise FileNotFoundError(f"no database at {dbfile}") from None
+        raise
+
+    try:
+        row = conn.execute("SELECT value FROM metadata WHERE key = 'build_version'").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    finally:
+        conn.close()
+
+    return None if row is None else row[0]
+
+
+class StringTable:
+    """
+    Deduplicated strings, stored as one utf-8 blob plus an offset array
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._strings = []
+
+    def add(self, value: str | None) -> int:
+        if value is None:
+            return -1
+
+        found = self._ids.get(value)
+        if found is None:
+            found = self._ids[value] = len(self._strings)
+            self._strings.append(value)
+
+        return found
+
+    def string(self, i: int) -> str:
+        return self._strings[i]
+
+    def encode(self) -> tuple:
+        """
+        (offsets, blob, order), `order` being the ids sorted by their string
+        """
+        offsets = array.array("q", [0])
+        blob = bytearray()
+        for value in self._strings:
+            blob += value.encode()
+            offsets.append(len(blob))
+
+        order = array.array("i", sorted(range(len(self._strings)), key=self.string))
+
+        return offsets, bytes(blob), order
+
+
+class SnapshotWriter:
+
+    def __init__(self):
+        self._sections = []
+        self._size = 0
+        self.strings = StringTable()
+
+    def section(self, data: array.array | bytes) -> dict:
+        """
+        Queue `data` for writing, returning its location for the header
+        """
+        typecode = data.typecode if isinstance(data, array.array) else "B"
+        raw = data.tobytes() if isinstance(data, array.array) else data
+
+        padding = -self._size % 8
+        self._sections.append(b"\x00" * padding + raw)
+
+        location = {"offset": self._size + padding, "length": len(raw), "typecode": typecode}
+        self._size += padding + len(raw)
+
+        return location
+
+    def column(self, values: list) -> dict:
+        if all(v is None or (isinstance(v, int) and -(1 << 63) < v < (1 << 63)) for v in values):
+            return self.section(array.array("q", [INT_NULL if v is None else v for v in values]))
+        if all(v is None or isinstance(v, (int, float)) for v in values):
+            return self.section(array.array("d", [math.nan if v is None else v for v in values]))
+        return self.section(array.array("i", [self.strings.add(None if v is None else str(v)) for v in values]))
+
+    def write(self, path, header: dict):
+        offsets, blob, order = self.strings.encode()
+        header["strings"] = {"offsets": self.section(offsets),
+                             "blob": self.section(blob),
+                             "order": self.section(order)}
+
+        encoded = marshal.dumps(header, 4)
+        # sections are aligned relative to the end of the header, pad it to 8
+        encoded += b"\x00" * (-(PREAMBLE.size + len(encoded)) % 8)
+
+        partial = os.fspath(path) + ".partial"
+        with open(partial, "wb") as o:
+            o.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+            o.write(encoded)
+            for section in self._sections:
+                o.write(section)
+
+        # never leave a half written snapshot where readers look for one
+        os.replace(partial, path)
+
+
+def write(dbfile, path=None) -> str:
+    """
+    Snapshot the pokemon, moves and learnset tables of `dbfile`
+    """
+    import sqlite3
+
+    path = default_path(dbfile) if path is None else os.fspath(path)
+    writer = SnapshotWriter()
+
+    header = {"build_version": read_build_version(dbfile),
+              "byteorder": sys.byteorder,
+              "tables": {}}
+
+    conn = sqlite3.connect(dbfile)
+    try:
+        existing = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+        for table in TABLES:
+            if table not in existing:
+                continue
+
+            cursor = conn.execute(f"SELECT * FROM {table} ORDER BY rowid")
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+
+            entry = {"rows": len(rows), "columns": columns, "data": {}}
+            for i, column in enumerate(columns):
+                entry["data"][column] = writer.column([row[i] for row in rows])
+
+            if "name" in columns:
+                names = [row[columns.index("name")] for row in rows]
+                order = sorted(range(len(rows)), key=lambda r: names[r])
+                entry["name_order"] = writer.section(array.array("q", order))
+
+            header["tables"][table] = entry
+
+        if "learnset" in existing:
+            learners = {}
+            for pokemon, move in conn.execute("SELECT pokemon, move FROM learnset"):
+                learners.setdefault(move, []).append(writer.strings.add(pokemon))
+
+            moves = sorted(learners)
+            offsets = array.array("q", [0])
+            pokemon = array.array("i")
+            for move in moves:
+                # sorted by the pokemon id itself, as sqlite would order them
+                pokemon.extend(sorted(set(learners[move]), key=writer.strings.string))
+                offsets.append(len(pokemon))
+
+            header["learnset"] = {"moves": moves,
+                                  "offsets": writer.section(offsets),
+                                  "pokemon": writer.section(pokemon)}
+    finally:
+        conn.close()
+
+    writer.write(path, header)
+
+    return path
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file, answering the basic searches without
+    sqlite. Results equal those of Database.find_name, TypeSearch, StatSearch
+    and BaseSearch.search_by_moves list for list, in the same order: names
+    then table order for find_name, table order for type and stat (which the
+    searches sort on rowid) and sorted ids for learns
+
+    >>> snapshot = Snapshot(default_path("test.db"))
+    >>> snapshot.find_name("pikachu")
+    >>> snapshot.stat("spe >= 120")
+    >>> snapshot.stale("test.db")
+    """
+
+    def __init__(self, path):
+        self._path = os.fspath(path)
+
+        with open(self._path, "rb") as o:
+            self._mmap = mmap.mmap(o.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, length = PREAMBLE.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{self._path} is not a snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{self._path} has snapshot format {version}, expected {FORMAT_VERSION}")
+
+        self._header = marshal.loads(self._mmap[PREAMBLE.size:PREAMBLE.size + length])
+        self._base = PREAMBLE.size + length
+
+        if self._header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self._path} was written on a {self._header['byteorder']} endian machine")
+
+        self._view = memoryview(self._mmap)
+        self._arrays = {}
+
+        strings = self._header["strings"]
+        self._string_offsets = self._array(strings["offsets"])
+        self._blob = self._array(strings["blob"])
+        self._string_order = self._array(strings["order"])
+
+        learnset = self._header.get("learnset")
+        self._moves = {} if learnset is None else {m: i for i, m in enumerate(learnset["moves"])}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def build_version(self) -> str | None:
+        return self._header["build_version"]
+
+    @classmethod
+    def load(cls, dbfile) -> "Snapshot":
+        """
+        The snapshot written alongside `dbfile`, refusing one left over from
+        an earlier build
+        """
+        snapshot = cls(default_path(dbfile))
+        if snapshot.stale(dbfile):
+            snapshot.close()
+            raise ValueError(f"{snapshot.path} is stale, rebuild it with Snapshot.write({str(dbfile)!r})")
+
+        return snapshot
+
+    def stale(self, dbfile) -> bool:
+        """
+        Whether `dbfile` has been rebuilt since this snapshot was written, or
+        is missing (mid swap, or removed)
+        """
+        try:
+            return read_build_version(dbfile) != self.build_version
+        except FileNotFoundError:
+            return True
+
+    def close(self):
+        self._arrays.clear()
+        self._string_offsets = self._blob = self._string_order = None
+        self._view.release()
+        self._mmap.close()
+
+    def _array(self, location: dict) -> memoryview:
+        key = location["offset"]
+        found = self._arrays.get(key)
+        if found is None:
+            start = self._base + location["offset"]
+            found = self._view[start:start + location["length"]].cast(location["typecode"])
+            self._arrays[key] = found
+
+        return found
+
+    def string(self, i: int) -> str | None:
+        if i < 0:
+            return None
+        return bytes(self._blob[self._string_offsets[i]:self._string_offsets[i + 1]]).decode()
+
+    def _table(self, table: str) -> dict:
+        found = self._header["tables"].get(table)
+        if found is None:
+            raise ValueError(f"Table {table} not in snapshot!")
+        return found
+
+    def _column(self, table: str, column: str) -> tuple:
+        data = self._table(table)["data"]
+        if column not in data:
+            raise ValueError(f"Column {column} not in table {table}!")
+
+        location = data[column]
+        return self._array(location), location["typecode"]
+
+    def value(self, table: str, column: str, row: int):
+        values, typecode = self._column(table, column)
+        value = values[row]
+
+        if typecode == "i":
+            return self.string(value)
+        if typecode == "q":
+            return None if value == INT_NULL else value
+        return None if math.isnan(value) else value
+
+    def row(self, table: str, row: int) -> tuple:
+        return tuple(self.value(table, column, row) for column in self._table(table)["columns"])
+
+    def names(self, table: str, rows) -> list:
+        return [self.value(table, "name", row) for row in rows]
+
+    def find_name(self, name: str | list) -> list:
+        """
+        Full pokemon rows by name, or list of names, as Database.find_name
+        """
+        wanted = {name.title()} if isinstance(name, str) else {n.title() for n in name}
+
+        order = self._array(self._table("pokemon")["name_order"])
+        key = lambda r: self.value("pokemon", "name", r)
+
+        found = []
+        for target in wanted:
+            i = bisect.bisect_left(order, target, key=key)
+            while i < len(order) and key(order[i]) == target:
+                found.append(order[i])
+                i += 1
+
+        # name then row order, as sqlite reads them off its name index
+        return [self.row("pokemon", r) for r in sorted(found, key=lambda r: (key(r), r))]
+
+    def string_id(self, value: str) -> int:
+        """
+        Id of `value` in the string table, -1 if absent
+        """
+        order = self._string_order
+        i = bisect.bisect_left(order, value, key=self.string)
+        if i < len(order) and self.string(order[i]) == value:
+            return order[i]
+        return -1
+
+    def type(self, query: str | list) -> list:
+        """
+        Pokemon with any of the types in `query`, as TypeSearch.search, in
+        table order
+        """
+        types = [query] if isinstance(query, str) else list(query)
+        ids = {self.string_id(t.title()) for t in types} - {-1}
+
+        type1, _ = self._column("pokemon", "type1")
+        type2, _ = self._column("pokemon", "type2")
+
+        return self.names("pokemon", (r for r in range(len(type1)) if type1[r] in ids or type2[r] in ids))
+
+    def stat(self, query: str) -> list:
+        """
+        Pokemon passing a single stat comparison, as StatSearch.search, in
+        table order
+        """
+        column, operator, val = query.split()
+        if operator not in OPERATORS:
+            raise ValueError(f"Operator {operator} not recognised!")
+
+        values, typecode = self._column("pokemon", column.lower())
+        if typecode == "i":
+            raise ValueError(f"Column {column} is not numeric!")
+
+        compare, val = OPERATORS[operator], int(val)
+        null = INT_NULL if typecode == "q" else None
+
+        return self.names("pokemon", (r for r, v in enumerate(values)
+                                      if v != null and v == v and compare(v, val)))
+
+    def learners(self, move: str) -> set:
+        """
+        String ids of the pokemon that learn `move`
+        """
+        i = self._moves.get("".join(c for c in move.lower() if c in ID_CHARS))
+        if i is None:
+            return set()
+
+        learnset = self._header["learnset"]
+        offsets = self._array(learnset["offsets"])
+
+        return set(self._array(learnset["pokemon"])[offsets[i]:offsets[i + 1]])
+
+    def learns(self, names: list, match_all: bool = True) -> list:
+        """
+        Pokemon ids that learn all (or any) of the moves in `names`, as
+        BaseSearch.search_by_moves
+        """
+        if len(names) == 0:
+            return []
+
+        sets = [self.learners(name) for name in names]
+        found = set.intersection(*sets) if match_all else set.union(*sets)
+
+        return sorted(self.string(i) for i in found)
+
+
+if __name__ == "__main__":
+    db = package_root() / "sql/test.db"
+
+    path = write(db)
+
+    with Snapshot(path) as snapshot:
+        print(snapshot.find_name("pikachu"))
+        print(snapshot.learns(["swordsdance", "earthquake", "extremespeed"]))
+        print("stale:", snapshot.stale(db))
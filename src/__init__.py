@@ -1,7 +1,6 @@
-import pathlib
-
-
 def package_root():
+    # imported here, pathlib is a noticeable share of a cold start
+    import pathlib
 
     return pathlib.Path(__file__).parents[1]
 
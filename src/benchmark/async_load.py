@@ -0,0 +1,65 @@
+"""
+Concurrent throughput of the async search API against the blocking one,
+both called from inside an event loop
+
+python -m src.benchmark.async_load [dbfile] [n] [workers]
+"""
+import asyncio
+import sys
+import time
+
+from src.AsyncDatabase import AsyncDatabase
+from src.benchmark.common import DEFAULT_DB, ensure_database, uncached
+from src.Database import Database
+from src.Search.AsyncSearch import AsyncStatSearch, AsyncTypeSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+QUERIES = [(TypeSearch, AsyncTypeSearch, "fire"),
+           (TypeSearch, AsyncTypeSearch, ["water", "grass"]),
+           (StatSearch, AsyncStatSearch, "spe >= 100"),
+           (StatSearch, AsyncStatSearch, "atk < 60")]
+
+
+async def blocking(db: Database, n: int) -> float:
+    searches = [(sync(db), query) for sync, _, query in QUERIES]
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        search, query = searches[i % len(searches)]
+        search.search(query)
+
+    return n / (time.perf_counter() - t0)
+
+
+async def concurrent(adb: AsyncDatabase, n: int) -> float:
+    searches = [(asyn(adb), query) for _, asyn, query in QUERIES]
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[searches[i % len(searches)][0].search(searches[i % len(searches)][1])
+                           for i in range(n)])
+
+    return n / (time.perf_counter() - t0)
+
+
+async def main(file, n: int, workers: int):
+    db = uncached(file, pool_size=workers)
+
+    sync_rate = await blocking(db, n)
+
+    async with AsyncDatabase(db, workers=workers) as adb:
+        async_rate = await concurrent(adb, n)
+
+    print(f"{n} searches: blocking {sync_rate:.0f} q/s, "
+          f"asyncio.gather over {workers} workers {async_rate:.0f} q/s")
+
+
+def run(file=DEFAULT_DB, n: int = 2000, workers: int = 4):
+    file = ensure_database(file)
+    asyncio.run(main(file, n, workers))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:3]])
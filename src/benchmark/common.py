@@ -0,0 +1,69 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+import contextlib
+import io
+import pathlib
+import sqlite3
+import time
+
+from src import package_root
+from src.Database import Database
+
+
+DEFAULT_DB = package_root() / "sql/test.db"
+
+
+def has_table(file, table: str) -> bool:
+    conn = sqlite3.connect(file)
+    try:
+        found = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+                             (table,)).fetchone()
+    finally:
+        conn.close()
+
+    return found is not None
+
+
+def ensure_database(file=DEFAULT_DB, tables: tuple = ("pokemon",)):
+    """
+    Build the requested tables from the bundled json data if they are missing
+    """
+    from src.update.CreateDatabase import Learnset, LearnsetSource, Move, Pokemon
+
+    injectors = {"pokemon": Pokemon, "moves": Move, "learnset": Learnset, "learnset_source": LearnsetSource}
+
+    file = pathlib.Path(file)
+    file.parent.mkdir(parents=True, exist_ok=True)
+
+    for table in tables:
+        if has_table(file, table):
+            continue
+        # the build is chatty, keep it out of the benchmark output
+        with contextlib.redirect_stdout(io.StringIO()):
+            injectors[table](file).db.close()
+
+    return file
+
+
+def uncached(file=DEFAULT_DB, tables: tuple | None = None, **kwargs) -> Database:
+    """
+    Database without the result cache, so every query is run by sqlite.
+    Builds `tables` first when given, see ensure_database
+    """
+    if tables is not None:
+        file = ensure_database(file, tables)
+
+    return Database(file, cache_size=0, **kwargs)
+
+
+def rate(func, n: int) -> float:
+    """
+    Call `func` `n` times, returning the calls per second
+    """
+    t0 = time.perf_counter()
+    for _ in range(n):
+        func()
+    dt = time.perf_counter() - t0
+
+    return n / dt
@@ -0,0 +1,48 @@
+"""
+Queries per second for StatSearch and TypeSearch, with a fresh connection
+per query (the old behaviour) versus the pooled connections in Database
+
+python -m src.benchmark.connection_pool [dbfile] [n]
+"""
+import sqlite3
+import sys
+
+from src.benchmark.common import DEFAULT_DB, ensure_database, rate, uncached
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+def fresh_connection_search(search, *args):
+    """
+    Replicates the pre-pool `_search`: connect on every call, never close
+    """
+    cmd = search.cmd(*args)
+    return sqlite3.connect(search.db.file).cursor().execute(cmd).fetchall()
+
+
+def run(file=DEFAULT_DB, n: int = 2000):
+    file = ensure_database(file)
+
+    cases = [(StatSearch, "spe >= 100"),
+             (TypeSearch, "fire")]
+
+    results = {}
+    for cls, query in cases:
+        search = cls(uncached(file))
+
+        before = rate(lambda: fresh_connection_search(search, query), n)
+        after = rate(lambda: search.search(query), n)
+
+        search.db.close()
+
+        label = f"{cls.__name__}.search({query!r})"
+        results[label] = (before, after)
+
+        print(f"{label}: {before:.0f} q/s before, {after:.0f} q/s after ({after / before:.1f}x)")
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
@@ -0,0 +1,70 @@
+"""
+A script shelling out for one search: the Client CLI answering directly
+(cold database, cold learnset index) versus through a warm Daemon
+
+python -m src.benchmark.daemon [dbfile] [n]
+"""
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from src import package_root
+from src.benchmark.common import DEFAULT_DB, ensure_database
+
+
+REQUESTS = [["stat", "spe", ">=", "120"],
+            ["learns", "thunderbolt", "surf"]]
+
+
+def serve(socket_path, file):
+    from src.Daemon import Daemon
+
+    with Daemon(socket_path, file) as daemon:
+        daemon.serve_forever()
+
+
+def cli(args: list, socket_path, file) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "src.Client", "--socket", str(socket_path), "--db", str(file), *args],
+                   cwd=package_root(), check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - t0
+
+
+def run(file=DEFAULT_DB, n: int = 10):
+    file = ensure_database(file, tables=("pokemon", "moves", "learnset"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = os.path.join(tmp, "pokedb.sock")
+
+        results = {}
+        for args in REQUESTS:
+            label = " ".join(args)
+            # no daemon listening yet, the client falls back to direct mode
+            direct = statistics.median(cli(args, socket_path, file) for _ in range(n))
+            results[label] = [direct]
+
+        daemon = multiprocessing.get_context("fork").Process(target=serve, args=(socket_path, file), daemon=True)
+        daemon.start()
+        while not os.path.exists(socket_path):
+            time.sleep(0.01)
+
+        for args in REQUESTS:
+            label = " ".join(args)
+            results[label].append(statistics.median(cli(args, socket_path, file) for _ in range(n)))
+
+        daemon.terminate()
+        daemon.join()
+
+    for label, (direct, served) in results.items():
+        print(f"{label}: {direct * 1e3:.0f} ms direct, {served * 1e3:.0f} ms through the daemon")
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
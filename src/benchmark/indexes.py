@@ -0,0 +1,88 @@
+"""
+VM steps per query shape without and with the schema's secondary indexes
+
+The "before" database is a copy of the build with every index derived from
+Conversion hints dropped, the IndexAdvisor is then run against it to check
+that it finds them again from the recorded workload alone
+
+python -m src.benchmark.indexes [dbfile]
+"""
+import shutil
+import sys
+import tempfile
+
+from src.benchmark.common import DEFAULT_DB, ensure_database, uncached
+from src.Database import Database
+from src.IndexAdvisor import IndexAdvisor
+from src.Instrumentation import QueryStats
+from src.Search.BaseSearch import BaseSearch
+from src.Search.MoveSearch import MoveSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+def workload(db: Database):
+    types, stats, moves = TypeSearch(db), StatSearch(db), MoveSearch(db)
+
+    types.search("fire")
+    types.search(["water", "grass"])
+    stats.search("spe >= 120")
+    stats.search("atk < 40")
+    moves.power(">= 120")
+    moves.priority("> 0")
+    db.find_name("pikachu")
+    BaseSearch(db).search_by_moves(["thunderbolt", "surf"])
+
+
+def measure(file) -> QueryStats:
+    db = uncached(file)
+    db.instrumentation = QueryStats(step_interval=1)
+    workload(db)
+    db.close()
+
+    return db.instrumentation
+
+
+def drop_indexes(file) -> list:
+    db = uncached(file)
+    names = [name for (name,) in db.fetchall("SELECT name FROM sqlite_master WHERE type = 'index' "
+                                             "AND tbl_name IN ('pokemon', 'moves') "
+                                             "AND name NOT LIKE 'sqlite_%'")]
+    for name in names:
+        db.execute(f"DROP INDEX {name}", commit=True)
+    db.execute("ANALYZE", commit=True)
+    db.close()
+
+    return names
+
+
+def run(file=DEFAULT_DB):
+    file = ensure_database(file, tables=("pokemon", "moves", "learnset"))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bare = f"{tmp}/bare.db"
+        shutil.copy(file, bare)
+        dropped = drop_indexes(bare)
+
+        before = measure(bare).stats()
+        after = measure(file).stats()
+
+        print(f"{'steps before':>14} {'steps after':>12}  query")
+        for shape, entry in before.items():
+            print(f"{entry['steps']:>14} {after[shape]['steps']:>12}  {shape[:100]}")
+
+        db = uncached(bare)
+        db.instrumentation = QueryStats(step_interval=1)
+        workload(db)
+        suggestions = IndexAdvisor(db, db.instrumentation).suggest()
+        db.close()
+
+    print(f"\ndropped {len(dropped)} indexes, the advisor suggests:")
+    for suggestion in suggestions:
+        print(f"  {suggestion['sql']}  ({suggestion['total_ms']:.2f} ms over {len(suggestion['queries'])} queries)")
+
+    return before, after, suggestions
+
+
+if __name__ == "__main__":
+    run(*sys.argv[1:2])
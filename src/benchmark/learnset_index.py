@@ -0,0 +1,43 @@
+"""
+Move combination queries through sqlite versus the in-memory LearnsetIndex
+
+python -m src.benchmark.learnset_index [dbfile] [n]
+"""
+import random
+import sys
+
+from src.benchmark.common import DEFAULT_DB, rate, uncached
+from src.Search.BaseSearch import BaseSearch
+
+
+def run(file=DEFAULT_DB, n: int = 2000, size: int = 3, seed: int = 0):
+    sql = BaseSearch(uncached(file, tables=("learnset",)))
+    indexed = BaseSearch(sql.db, learnset_index=True)
+
+    moves = [m for (m,) in sql._search("SELECT DISTINCT move FROM learnset")]
+    rng = random.Random(seed)
+    combos = [rng.sample(moves, size) for _ in range(n)]
+
+    for combo in combos[:50]:
+        if sql.search_by_moves(combo) != indexed.search_by_moves(combo):
+            raise AssertionError(f"index disagrees with sqlite for {combo}")
+
+    # build outside of the timing
+    indexed.learnset_index
+
+    it = iter(combos)
+    before = rate(lambda: sql.search_by_moves(next(it)), n)
+    it = iter(combos)
+    after = rate(lambda: indexed.search_by_moves(next(it)), n)
+
+    sql.db.close()
+
+    print(f"search_by_moves, all of {size} moves: {before:.0f} q/s sqlite, "
+          f"{after:.0f} q/s index ({after / before:.0f}x)")
+
+    return before, after
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
@@ -0,0 +1,59 @@
+"""
+"Learnable in gen N by level up at or below level L": parsing the joined
+source strings of the learnset table in python versus filtering the decoded
+learnset_source table in sqlite
+
+python -m src.benchmark.learnset_source [dbfile] [n]
+"""
+import random
+import sys
+
+from src.benchmark.common import DEFAULT_DB, rate, uncached
+from src.Database import Database
+from src.Search.SourceSearch import SourceSearch
+from src.update.CreateDatabase import parse_source
+
+
+def python_filter(db: Database, move: str, gen: int, max_level: int) -> list:
+    """
+    Without the table: every source string of the move, parsed per query
+    """
+    found = set()
+    for pokemon, sources in db.fetchall("SELECT pokemon, sources FROM learnset WHERE move = ?", (move,)):
+        for code in sources.split(","):
+            g, method, level, _ = parse_source(code)
+            if g == gen and method == "L" and level <= max_level:
+                found.add(pokemon)
+
+    return sorted(found)
+
+
+def run(file=DEFAULT_DB, n: int = 2000, seed: int = 0):
+    db = uncached(file, tables=("learnset", "learnset_source"))
+    search = SourceSearch(db)
+
+    rng = random.Random(seed)
+    moves = [m for (m,) in db.fetchall("SELECT DISTINCT move FROM learnset")]
+    queries = [(rng.choice(moves), rng.randint(7, 9), rng.randint(10, 60)) for _ in range(n)]
+
+    for move, gen, level in queries[:50]:
+        if python_filter(db, move, gen, level) != search.search({"move": move, "gen": gen, "method": "L",
+                                                                 "max_level": level}):
+            raise AssertionError(f"learnset_source disagrees with the parsed strings for {move}")
+
+    it = iter(queries)
+    before = rate(lambda: python_filter(db, *next(it)), n)
+    it = iter(queries)
+    after = rate(lambda: search.search(dict(zip(("move", "gen", "max_level"), next(it)), method="L")), n)
+
+    db.close()
+
+    print(f"level up by gen and level: {before:.0f} q/s parsing strings, "
+          f"{after:.0f} q/s learnset_source ({after / before:.1f}x)")
+
+    return before, after
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
@@ -0,0 +1,44 @@
+"""
+Move attribute searches: the old two round trips (matching move names out
+to python, then back in as one IN list) versus MoveSearch.learners selecting
+the moves within the learnset statement, from broad to narrow predicates
+
+python -m src.benchmark.move_search [dbfile] [n]
+"""
+import sys
+
+from src.benchmark.common import DEFAULT_DB, rate, uncached
+from src.Search.MoveSearch import MoveSearch
+
+QUERIES = ["power > 0", "power > 100", "power > 150", "priority > 0", "critRatio >= 2"]
+
+
+def two_phase(search: MoveSearch, query: str) -> list:
+    """
+    As MoveSearch did before learners
+    """
+    return search.search_by_moves(search.search(query), match_all=False)
+
+
+def run(file=DEFAULT_DB, n: int = 200):
+    search = MoveSearch(uncached(file, tables=("moves", "learnset")))
+
+    results = {}
+    for query in QUERIES:
+        if two_phase(search, query) != search.learners(query):
+            raise AssertionError(f"learners disagrees with the two phase search for {query}")
+
+        before = rate(lambda: two_phase(search, query), n)
+        after = rate(lambda: search.learners(query), n)
+        results[query] = before, after
+
+        print(f"{query:>16}: {before:.0f} q/s two phase, {after:.0f} q/s learners ({after / before:.1f}x)")
+
+    search.db.close()
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
@@ -0,0 +1,83 @@
+"""
+Scaling of ParallelSearch from 1 to N workers, threads and processes,
+against the same batch run serially on one connection
+
+Two batches: stat comparisons (cheap statements, mostly python overhead)
+and move pairs through search_by_moves (sqlite bound, where threads can
+overlap with the GIL released). Results are checked against the serial run
+
+python -m src.benchmark.parallel [dbfile] [n] [max workers]
+"""
+import os
+import random
+import sys
+import time
+
+from src.benchmark.common import DEFAULT_DB, ensure_database, uncached
+from src.Database import Database
+from src.Search.BaseSearch import BaseSearch
+from src.Search.Parallel import ParallelSearch
+from src.Search.StatSearch import StatSearch
+
+
+def batches(file, n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+
+    with Database(file) as db:
+        moves = [m for (m,) in db.fetchall("SELECT DISTINCT move FROM learnset")]
+
+    stats = [f"{rng.choice(['hp', 'atk', 'def', 'spa', 'spd', 'spe'])} >= {rng.randint(40, 150)}"
+             for _ in range(n)]
+    pairs = [rng.sample(moves, 2) for _ in range(n)]
+
+    return [("StatSearch.search", StatSearch, "search", stats),
+            ("BaseSearch.search_by_moves", BaseSearch, "search_by_moves", pairs)]
+
+
+def timed(func) -> tuple:
+    t0 = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - t0
+
+
+def run(file=DEFAULT_DB, n: int = 2000, max_workers: int = 4):
+    file = ensure_database(file, tables=("pokemon", "learnset"))
+
+    print(f"{os.cpu_count()} cpu(s) available")
+
+    counts = [w for w in (1, 2, 4, 8, 16) if w <= max_workers]
+
+    results = {}
+    for name, search_class, method, queries in batches(file, n):
+        # nor in the workers, each query reaches sqlite
+        with uncached(file, readonly=True) as db:
+            search = search_class(db, readonly=True)
+            expected, serial = timed(lambda: [getattr(search, method)(q) for q in queries])
+
+        print(f"{name}, {n} queries: serial {n / serial:.0f} q/s")
+        results[name] = {"serial": n / serial}
+
+        for processes in (False, True):
+            kind = "processes" if processes else "threads"
+            for workers in counts:
+                with ParallelSearch(search_class, file, workers=workers, processes=processes,
+                                    cache_size=0) as pool:
+                    # processes pay their start up on the first chunks
+                    pool.map(method, queries[:workers * 16])
+
+                    got, dt = timed(lambda: pool.map(method, queries))
+                    stolen = pool.stolen
+
+                if got != expected:
+                    raise AssertionError(f"parallel {name} results differ from the serial run")
+
+                results[name][(kind, workers)] = n / dt
+                steals = "" if processes else f", {stolen} chunks stolen"
+                print(f"    {workers:>2} {kind:<9} {n / dt:>7.0f} q/s ({serial / dt:.2f}x{steals})")
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:3]])
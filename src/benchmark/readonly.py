@@ -0,0 +1,95 @@
+"""
+Memory and latency of N worker processes serving searches, with the database
+opened normally versus read-only, immutable and memory-mapped
+
+Private memory is the anonymous part of each worker's RSS (its own page
+cache copies among it), shared is the file backed part, which mmap'd pages
+from the OS page cache count towards
+
+python -m src.benchmark.readonly [dbfile] [workers] [n]
+"""
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+
+from src.benchmark.common import DEFAULT_DB, ensure_database, uncached
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+TYPES = ["fire", "water", "grass", "electric", "psychic", "dragon", "ghost", "steel"]
+STATS = ["hp", "atk", "def", "spa", "spd", "spe"]
+
+
+def memory() -> dict:
+    """
+    RssAnon and RssFile of the calling process in MB (linux only)
+    """
+    out = {}
+    with open("/proc/self/status") as o:
+        for line in o:
+            key, _, value = line.partition(":")
+            if key in ("RssAnon", "RssFile"):
+                out[key] = int(value.split()[0]) / 1024
+
+    return out
+
+
+def worker(file, readonly: bool, n: int, seed: int, queue):
+    rng = random.Random(seed)
+    db = uncached(file, readonly=readonly)
+    types, stats = TypeSearch(db), StatSearch(db)
+
+    latencies = []
+    for _ in range(n):
+        t = time.perf_counter()
+        if rng.random() < 0.5:
+            types.search(rng.choice(TYPES))
+        else:
+            stats.search(f"{rng.choice(STATS)} >= {rng.randint(50, 150)}")
+        # an unindexed filter, reading every page of learnset
+        db.fetchall("SELECT COUNT(*) FROM learnset WHERE sources LIKE ?",
+                    (f"%{rng.randint(1, 9)}L{rng.randint(1, 60)}%",))
+        latencies.append(time.perf_counter() - t)
+
+    queue.put({"latencies": latencies, **memory()})
+    db.close()
+
+
+def run(file=DEFAULT_DB, workers: int = 4, n: int = 200):
+    file = ensure_database(file, tables=("pokemon", "learnset"))
+
+    ctx = multiprocessing.get_context("fork")
+
+    results = {}
+    for readonly in (False, True):
+        queue = ctx.Queue()
+        procs = [ctx.Process(target=worker, args=(file, readonly, n, seed, queue)) for seed in range(workers)]
+
+        t0 = time.perf_counter()
+        for proc in procs:
+            proc.start()
+        reports = [queue.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - t0
+
+        latencies = [t for report in reports for t in report["latencies"]]
+        label = "readonly" if readonly else "default"
+        results[label] = {"p50_ms": statistics.median(latencies) * 1e3,
+                          "throughput": len(latencies) / elapsed,
+                          "private_mb": statistics.mean(r["RssAnon"] for r in reports),
+                          "shared_mb": statistics.mean(r["RssFile"] for r in reports)}
+
+        r = results[label]
+        print(f"{label:>8}, {workers} workers: p50 {r['p50_ms']:.2f} ms, {r['throughput']:.0f} q/s, "
+              f"{r['private_mb']:.1f} MB private + {r['shared_mb']:.1f} MB shared per worker")
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:3]])
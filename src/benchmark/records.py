@@ -0,0 +1,48 @@
+"""
+Memory held by a broad result set: every column as plain tuples (what the
+searches used to fetch), every column as Records, and a two column projection
+
+python -m src.benchmark.records [dbfile]
+"""
+import sys
+import tracemalloc
+
+from src.benchmark.common import DEFAULT_DB, uncached
+from src.Search.MoveSearch import MoveSearch
+
+
+def allocated(func) -> tuple:
+    """
+    Run `func`, returning its result and the bytes still allocated for it
+    """
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, size
+
+
+def run(file=DEFAULT_DB, query: str = "power >= 0"):
+    # nothing kept alive by the result cache
+    search = MoveSearch(uncached(file, tables=("moves",)))
+
+    cmd, params, _ = search._select_cmd(query, None)
+
+    cases = {"tuples, all columns": lambda: search._search(cmd, params),
+             "Records, all columns": lambda: search.rows(query),
+             "Records, name and power": lambda: search.rows(query, ["name", "power"])}
+
+    results = {}
+    for label, func in cases.items():
+        rows, size = allocated(func)
+        results[label] = size / len(rows)
+        print(f"{label}: {len(rows)} rows, {size / 1024:.0f} KiB, {size / len(rows):.0f} B per row")
+
+    search.db.close()
+
+    return results
+
+
+if __name__ == "__main__":
+    run(*sys.argv[1:2])
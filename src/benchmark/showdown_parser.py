@@ -0,0 +1,51 @@
+"""
+Timing and peak memory of the typescript parser against the YAML round trip,
+checking that both produce the same data
+
+python -m src.benchmark.showdown_parser [showdown data directory]
+"""
+import json
+import pathlib
+import sys
+import time
+import tracemalloc
+
+from src import package_root
+from src.update.ShowdownInterface import collect_data, collect_data_yaml
+
+
+def measure(func, file) -> tuple:
+    """
+    Returns (result, seconds, peak traced bytes)
+    """
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func(file)
+    dt = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, dt, peak
+
+
+def run(directory=package_root() / "pokemon-showdown/data", names: tuple = ("pokedex", "moves", "learnsets")):
+    directory = pathlib.Path(directory)
+
+    for name in names:
+        file = directory / f"{name}.ts"
+
+        new, new_dt, new_peak = measure(collect_data, file)
+        old, old_dt, old_peak = measure(collect_data_yaml, file)
+
+        # compare as written to json, where the YAML path's int keys become strings
+        new = json.loads(json.dumps(new))
+        old = json.loads(json.dumps(old))
+        differing = sorted(k for k in new.keys() | old.keys() if new.get(k) != old.get(k))
+
+        print(f"{name}: {len(new)} entries, {len(differing)} differing {differing[:5]}")
+        print(f"  parser {new_dt:.2f}s, peak {new_peak / 1e6:.1f}MB")
+        print(f"  yaml   {old_dt:.2f}s, peak {old_peak / 1e6:.1f}MB")
+
+
+if __name__ == "__main__":
+    run(*sys.argv[1:2])
@@ -0,0 +1,66 @@
+"""
+StatSearch through sqlite versus the columnar PokemonSnapshot, and a compound
+expression versus filtering all rows in python (requires numpy)
+
+python -m src.benchmark.snapshot [dbfile] [n]
+"""
+import random
+import sys
+
+from src.benchmark.common import DEFAULT_DB, rate, uncached
+from src.Database import Database
+from src.Search.StatSearch import StatSearch
+
+
+STATS = ["hp", "atk", "def", "spa", "spd", "spe"]
+
+
+def python_filter(db: Database) -> list:
+    """
+    The alternative without a snapshot: every row into python
+    """
+    rows = db.fetchall("SELECT name, hp, atk, def, spa, spd, spe FROM pokemon")
+    found = [r for r in rows if r[2] + r[4] >= 250 and r[6] > 100]
+    found.sort(key=lambda r: -sum(r[1:]))
+    return [r[0] for r in found]
+
+
+def run(file=DEFAULT_DB, n: int = 2000, seed: int = 0):
+    db = uncached(file, tables=("pokemon",))
+    sql = StatSearch(db)
+    columnar = StatSearch(db, snapshot=True)
+
+    rng = random.Random(seed)
+    queries = [f"{rng.choice(STATS)} {rng.choice(['>=', '<', '=='])} {rng.randint(40, 160)}" for _ in range(n)]
+
+    for query in queries[:50]:
+        if sorted(sql.search(query)) != sorted(columnar.search(query)):
+            raise AssertionError(f"snapshot disagrees with sqlite for {query}")
+
+    # build outside of the timing
+    columnar.snapshot
+
+    it = iter(queries)
+    before = rate(lambda: sql.search(next(it)), n)
+    it = iter(queries)
+    after = rate(lambda: columnar.search(next(it)), n)
+
+    print(f"StatSearch.search, one predicate: {before:.0f} q/s sqlite, "
+          f"{after:.0f} q/s snapshot ({after / before:.1f}x)")
+
+    expression = "atk + spa >= 250 and spe > 100"
+    if python_filter(db) != columnar.expression(expression, order_by="bst", descending=True):
+        raise AssertionError("snapshot disagrees with the python filter")
+
+    before = rate(lambda: python_filter(db), n // 10)
+    after = rate(lambda: columnar.expression(expression, order_by="bst", descending=True), n // 10)
+
+    print(f"{expression!r} sorted by bst: {before:.0f} q/s python, "
+          f"{after:.0f} q/s snapshot ({after / before:.1f}x)")
+
+    db.close()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
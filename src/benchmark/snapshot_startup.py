@@ -0,0 +1,45 @@
+"""
+Time to a first answer from a fresh interpreter: a find_name through sqlite
+(Database) versus through the binary Snapshot
+
+python -m src.benchmark.snapshot_startup [dbfile] [n]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+from src import Snapshot, package_root
+from src.benchmark.common import DEFAULT_DB, ensure_database
+
+
+PROGRAMS = {"python alone": "pass",
+            "Database": "from src.Database import Database\n"
+                        "Database({file!r}).find_name('pikachu')",
+            "Snapshot": "from src.Snapshot import Snapshot\n"
+                        "Snapshot({snapshot!r}).find_name('pikachu')"}
+
+
+def run(file=DEFAULT_DB, n: int = 10):
+    file = ensure_database(file)
+    snapshot = Snapshot.write(file)
+
+    results = {}
+    for label, program in PROGRAMS.items():
+        program = program.format(file=str(file), snapshot=str(snapshot))
+
+        times = []
+        for _ in range(n):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", program], cwd=package_root(), check=True)
+            times.append(time.perf_counter() - t0)
+
+        results[label] = statistics.median(times) * 1e3
+        print(f"{label}: {results[label]:.1f} ms")
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
@@ -0,0 +1,214 @@
+"""
+Build and search benchmarks over synthetic data at several scales
+
+Each case runs in its own process, so that its peak memory can be reported.
+Results can be written as json and compared against an earlier run:
+
+python -m src.benchmark.suite --scales 1 10 --output new.json --compare old.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import pathlib
+import platform
+import random
+import resource
+import sqlite3
+import statistics
+import subprocess
+import tempfile
+import time
+
+from src import package_root
+from src.benchmark import synthetic
+from src.benchmark.common import uncached
+from src.Search.BaseSearch import BaseSearch
+from src.Search.MoveSearch import MoveSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+from src.update.CreateDatabase import Learnset, Move, Pokemon
+
+
+def build(directory: pathlib.Path, file: pathlib.Path, incremental: bool = False):
+    sources = {Pokemon: "pokedex", Move: "moves", Learnset: "learnsets"}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for injector, name in sources.items():
+            injector(file, incremental=incremental, source=directory / f"{name}.json").db.close()
+
+
+def mutate(directory: pathlib.Path, fraction: float = 0.01, seed: int = 1):
+    """
+    Change the base power of a `fraction` of the moves, and drop one pokemon
+    """
+    rng = random.Random(seed)
+
+    path = directory / "moves.json"
+    with open(path) as o:
+        data = json.load(o)
+    for key in rng.sample(list(data), max(1, int(len(data) * fraction))):
+        data[key]["basePower"] += 5
+    with open(path, "w") as o:
+        json.dump(data, o)
+
+    path = directory / "pokedex.json"
+    with open(path) as o:
+        data = json.load(o)
+    del data[rng.choice(list(data))]
+    with open(path, "w") as o:
+        json.dump(data, o)
+
+
+def summarise(latencies: list, elapsed: float) -> dict:
+    if len(latencies) > 1:
+        q = statistics.quantiles(latencies, n=100)
+        p50, p95, p99 = q[49], q[94], q[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+
+    return {"n": len(latencies),
+            "p50_ms": p50 * 1e3,
+            "p95_ms": p95 * 1e3,
+            "p99_ms": p99 * 1e3,
+            "throughput": len(latencies) / elapsed}
+
+
+def timed(func, args: list) -> dict:
+    latencies = []
+    t0 = time.perf_counter()
+    for arg in args:
+        t = time.perf_counter()
+        func(arg)
+        latencies.append(time.perf_counter() - t)
+
+    return summarise(latencies, time.perf_counter() - t0)
+
+
+def case_build(directory, file, incremental=False) -> dict:
+    t0 = time.perf_counter()
+    build(directory, file, incremental=incremental)
+    dt = time.perf_counter() - t0
+
+    conn = sqlite3.connect(file)
+    rows = sum(conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("pokemon", "moves", "learnset"))
+    conn.close()
+
+    return {**summarise([dt], dt), "rows": rows, "rows_per_s": rows / dt}
+
+
+def case_search(directory, file, search: str, n: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    db = uncached(file)
+
+    match search:
+        case "find_name":
+            names = [r[0] for r in db.fetchall("SELECT name FROM pokemon")]
+            return timed(db.find_name, [rng.choice(names) for _ in range(n)])
+        case "TypeSearch":
+            return timed(TypeSearch(db).search, [rng.choice(synthetic.TYPES) for _ in range(n)])
+        case "StatSearch":
+            queries = [f"{rng.choice(synthetic.STATS)} >= {rng.randint(50, 200)}" for _ in range(n)]
+            return timed(StatSearch(db).search, queries)
+        case "MoveSearch.power":
+            return timed(MoveSearch(db).power, [f"> {rng.randint(100, 250)}" for _ in range(n)])
+        case "search_by_moves":
+            moves = [r[0] for r in db.fetchall("SELECT DISTINCT move FROM learnset")]
+            return timed(BaseSearch(db).search_by_moves, [rng.sample(moves, 2) for _ in range(n)])
+
+    raise ValueError(f"Search {search} not recognised!")
+
+
+def isolated(func, *args) -> dict:
+    """
+    Run one case in a fresh process, adding its peak RSS
+    """
+    def target(queue):
+        result = func(*args)
+        result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        queue.put(result)
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=target, args=(queue,))
+    proc.start()
+    result = queue.get()
+    proc.join()
+
+    return result
+
+
+def commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=package_root(),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+SEARCHES = ["find_name", "TypeSearch", "StatSearch", "MoveSearch.power", "search_by_moves"]
+
+
+def run(scales: list = (1, 10), n: int = 200, seed: int = 0) -> dict:
+    report = {"commit": commit(),
+              "python": platform.python_version(),
+              "sqlite": sqlite3.sqlite_version,
+              "results": {}}
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = pathlib.Path(tmp)
+            file = directory / "bench.db"
+
+            synthetic.generate(directory, scale, seed=seed)
+
+            results = {"build": isolated(case_build, directory, file)}
+            for search in SEARCHES:
+                results[search] = isolated(case_search, directory, file, search, n, seed)
+
+            mutate(directory)
+            results["incremental build"] = isolated(case_build, directory, file, True)
+
+        report["results"][f"{scale}x"] = results
+
+        for name, result in results.items():
+            print(f"{scale}x {name:18} p50 {result['p50_ms']:10.2f}ms  p95 {result['p95_ms']:10.2f}ms  "
+                  f"p99 {result['p99_ms']:10.2f}ms  {result['throughput']:10.1f}/s  "
+                  f"peak {result['peak_rss_mb']:7.1f}MB")
+
+    return report
+
+
+def compare(new: dict, old: dict):
+    """
+    Print the change in p50 latency and peak memory of every case in both reports
+    """
+    print(f"comparing {new.get('commit')} against {old.get('commit')}")
+    for scale, results in new["results"].items():
+        for name, result in results.items():
+            before = old["results"].get(scale, {}).get(name)
+            if before is None:
+                continue
+            print(f"{scale} {name:18} p50 x{result['p50_ms'] / before['p50_ms']:.2f}  "
+                  f"peak x{result['peak_rss_mb'] / before['peak_rss_mb']:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10])
+    parser.add_argument("-n", type=int, default=200, help="queries per search benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this json file")
+    parser.add_argument("--compare", help="json results of an earlier run")
+    args = parser.parse_args()
+
+    report = run(args.scales, args.n, args.seed)
+
+    if args.output:
+        with open(args.output, "w") as o:
+            json.dump(report, o, indent=2)
+
+    if args.compare:
+        with open(args.compare) as o:
+            compare(report, json.load(o))
@@ -0,0 +1,85 @@
+"""
+Readers under a live rebuild: errors, worst latencies and build versions
+seen by long-running Database readers while Refresh rebuilds the file in
+place, and while it swaps a staged build in
+
+python -m src.benchmark.swap [dbfile] [readers]
+"""
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from src.benchmark.common import DEFAULT_DB, ensure_database, uncached
+from src.Search.StatSearch import StatSearch
+
+
+def read_until(search: StatSearch, stop: threading.Event, out: dict):
+    i = 0
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            names = search.search(f"spe >= {i % 150}")
+            if len(names) == 0:
+                raise ValueError("no rows")
+            out["versions"].add(search.db.build_version)
+        except Exception as E:
+            out["errors"].append(type(E).__name__)
+        out["latencies"].append(time.perf_counter() - t0)
+        i += 1
+
+
+def under_rebuild(file, readers: int, in_place: bool, readonly: bool) -> dict:
+    out = {"errors": [], "latencies": [], "versions": set()}
+    stop = threading.Event()
+
+    db = uncached(file, pool_size=readers, readonly=readonly)
+    threads = [threading.Thread(target=read_until, args=(StatSearch(db), stop, out)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+
+    args = [sys.executable, "-m", "src.update.Refresh", str(file), "--no-convert"] + (["--in-place"] if in_place else [])
+    # the build prints its progress, keep it out of the benchmark output
+    subprocess.run(args, check=True, stdout=subprocess.DEVNULL)
+    # long enough for every reader to reach the new build
+    time.sleep(0.2)
+
+    stop.set()
+    for thread in threads:
+        thread.join()
+    db.close()
+
+    # otherwise the readers never saw the rebuild, and the numbers say nothing
+    if len(out["versions"]) < 2:
+        raise AssertionError(f"readers of {file} saw {len(out['versions'])} build version(s), expected 2")
+
+    return out
+
+
+def run(file=DEFAULT_DB, readers: int = 4):
+    file = ensure_database(file, tables=("pokemon", "moves", "learnset", "learnset_source"))
+
+    results = {}
+    for in_place, readonly in ((True, False), (False, False), (False, True)):
+        if in_place and readonly:
+            continue
+        name = ("in place" if in_place else "staged swap") + (", readonly" if readonly else "")
+
+        out = under_rebuild(file, readers, in_place, readonly)
+        latencies = sorted(out["latencies"])
+        p99 = latencies[int(len(latencies) * 0.99)]
+
+        errors = {e: out["errors"].count(e) for e in set(out["errors"])}
+        print(f"{name:>20}: {len(latencies)} reads, {len(out['errors'])} errors {errors or ''}, "
+              f"median {statistics.median(latencies) * 1000:.2f} ms, p99 {p99 * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.0f} ms, {len(out['versions'])} build versions seen")
+
+        results[name] = out
+
+    return results
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
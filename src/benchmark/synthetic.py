@@ -0,0 +1,134 @@
+"""
+Deterministic synthetic data in the shape of showdown's pokedex, moves and
+learnsets json, at a multiple of the real dataset's size
+
+python -m src.benchmark.synthetic [directory] [scale]
+"""
+import pathlib
+import random
+import sys
+
+from src.update.ShowdownInterface import dump_entries
+from src.utils.clean_sql import to_id
+
+
+# size of the real dataset, at scale 1
+NPOKEMON = 1500
+NMOVES = 950
+LEARNSET_SIZE = (20, 120)
+
+TYPES = ["Normal", "Fire", "Water", "Grass", "Electric", "Ice", "Fighting", "Poison", "Ground",
+         "Flying", "Psychic", "Bug", "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy"]
+SYLLABLES = ["ka", "zu", "mi", "ro", "ta", "chi", "ne", "bo", "ra", "shi", "ko", "pa",
+             "lu", "ve", "do", "gar", "mon", "zor", "fin", "tal", "ix", "qua", "bel", "dra"]
+FLAGS = ["bite", "bullet", "contact", "dance", "mirror", "powder", "protect", "pulse",
+         "punch", "reflectable", "slicing", "snatch", "sound", "wind"]
+STATS = ["hp", "atk", "def", "spa", "spd", "spe"]
+
+
+def make_name(rng: random.Random, i: int) -> str:
+    # the index keeps names unique at any scale
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{word.title()} {i}"
+
+
+def pokedex(rng: random.Random, n: int):
+    for i in range(1, n + 1):
+        name = make_name(rng, i)
+        data = {"num": i,
+                "name": name,
+                "types": rng.sample(TYPES, rng.choice([1, 2])),
+                "baseStats": {s: rng.randint(5, 255) for s in STATS},
+                "abilities": {"0": make_name(rng, i)},
+                "heightm": round(rng.uniform(0.1, 20), 1),
+                "weightkg": round(rng.uniform(0.1, 999), 1)}
+        if rng.random() < 0.7:
+            data["abilities"]["H"] = make_name(rng, i)
+        if rng.random() < 0.1:
+            data["forme"] = rng.choice(["Mega", "Alola", "Galar", "Hisui"])
+
+        yield to_id(name), data
+
+
+def moves(rng: random.Random, n: int):
+    for i in range(1, n + 1):
+        name = make_name(rng, i)
+        category = rng.choice(["Physical", "Special", "Status"])
+        data = {"num": i,
+                "accuracy": rng.choice([True, 70, 80, 85, 90, 95, 100]),
+                "basePower": 0 if category == "Status" else rng.choice(range(10, 255, 5)),
+                "category": category,
+                "name": name,
+                "pp": rng.choice([1, 5, 10, 15, 20, 25, 30, 35, 40]),
+                "priority": rng.choice([0] * 12 + [-3, 1, 2]),
+                "flags": {f: 1 for f in rng.sample(FLAGS, rng.randint(0, 4))},
+                "secondary": None,
+                "target": rng.choice(["normal", "self", "allAdjacentFoes", "any"]),
+                "type": rng.choice(TYPES)}
+        if rng.random() < 0.1:
+            data["critRatio"] = 2
+        if rng.random() < 0.2:
+            data["secondary"] = {"chance": rng.choice([10, 20, 30, 100]),
+                                 "status": rng.choice(["brn", "par", "psn", "frz"])}
+        if category == "Status" and rng.random() < 0.4:
+            data["boosts"] = {rng.choice(STATS[1:]): rng.choice([-2, -1, 1, 2])}
+        if rng.random() < 0.03:
+            data["isMax"] = True
+
+        yield to_id(name), data
+
+
+def learnsets(rng: random.Random, pokemon: list, moveids: list):
+    lo, hi = LEARNSET_SIZE
+    for poke in pokemon:
+        learnset = {}
+        for move in rng.sample(moveids, min(len(moveids), rng.randint(lo, hi))):
+            codes = []
+            for gen in sorted(rng.sample(range(3, 10), rng.randint(1, 3)), reverse=True):
+                method = rng.choice(["L", "M", "T", "E", "S", "V"])
+                extra = rng.randint(1, 80) if method == "L" else (rng.randint(0, 3) if method == "S" else "")
+                codes.append(f"{gen}{method}{extra}")
+            learnset[move] = codes
+
+        yield poke, {"learnset": learnset}
+
+
+def recording(entries, keys: list):
+    """
+    Pass (key, value) pairs through, appending each key to `keys`
+    """
+    for key, value in entries:
+        keys.append(key)
+        yield key, value
+
+
+def generate(directory, scale: float = 1, seed: int = 0) -> dict:
+    """
+    Write pokedex.json, moves.json and learnsets.json into `directory`
+
+    Returns the paths written, keyed by file name
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    rng = random.Random(seed)
+
+    npokemon = max(1, int(NPOKEMON * scale))
+    nmoves = max(1, int(NMOVES * scale))
+
+    paths = {name: directory / f"{name}.json" for name in ("pokedex", "moves", "learnsets")}
+
+    pokemon = []
+    dump_entries(recording(pokedex(rng, npokemon), pokemon), paths["pokedex"])
+
+    moveids = []
+    dump_entries(recording(moves(rng, nmoves), moveids), paths["moves"])
+
+    dump_entries(learnsets(rng, pokemon, moveids), paths["learnsets"])
+
+    return paths
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    print(generate(*args[:1], *[float(a) for a in args[1:2]]))
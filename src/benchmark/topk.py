@@ -0,0 +1,44 @@
+"""
+"The 10 fastest of a broad search": the full result list sorted in python
+versus ORDER BY/LIMIT pushed into sqlite
+
+python -m src.benchmark.topk [dbfile] [n]
+"""
+import sys
+
+from src.benchmark.common import DEFAULT_DB, rate, uncached
+from src.Search.TypeSearch import TypeSearch
+
+
+def full_sort(search: TypeSearch, query) -> list:
+    """
+    Without pushdown: every matching row, then sorted and cut in python
+    """
+    rows = search._search(search.cmd(query))
+    rows.sort(key=lambda row: -row[9])
+    return [row[1] for row in rows[:10]]
+
+
+def run(file=DEFAULT_DB, n: int = 2000):
+    search = TypeSearch(uncached(file, tables=("pokemon",)))
+    query = ["water", "grass"]
+
+    # ties at the cut may be broken differently, compare the speeds
+    speed = {row[1]: row[9] for row in search._search(search.cmd(query))}
+    if sorted(speed[p] for p in full_sort(search, query)) != sorted(speed[p] for p in search.top(query, "spe", k=10)):
+        raise AssertionError("top disagrees with the full sort")
+
+    before = rate(lambda: full_sort(search, query), n)
+    after = rate(lambda: search.top(query, "spe", k=10), n)
+
+    search.db.close()
+
+    print(f"top 10 by spe of TypeSearch {query}: {before:.0f} q/s full sort, "
+          f"{after:.0f} q/s pushdown ({after / before:.1f}x)")
+
+    return before, after
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    run(*args[:1], *[int(a) for a in args[1:2]])
@@ -1,9 +1,14 @@
+import hashlib
 import json
-import math
+import os
 import pathlib
+import re
+import sqlite3
+import sys
 
-from src import package_root
-from src.Database import Database
+from src import Snapshot, package_root
+from src.Database import BUILD_PRAGMAS, UPDATE_PRAGMAS, Database
+from src.update import Staging
 from src.utils.clean_sql import remove_sql_illegal_characters
 
 
@@ -11,20 +16,177 @@ SOURCE_LEARNSET = package_root() / "jsondata/learnsets.json"
 SOURCE_POKES = package_root() / "jsondata/pokedex.json"
 SOURCE_MOVES = package_root() / "jsondata/moves.json"
 
+# generation, method letter, then the level or event index if any
+SOURCE_CODE = re.compile(r"(\d+)([A-Z])(.*)")
+SOURCE_METHODS = {"M": "machine",
+                  "T": "tutor",
+                  "L": "level up",
+                  "E": "egg",
+                  "S": "event",
+                  "D": "dream world",
+                  "V": "virtual console transfer",
+                  "R": "restricted"}
+
+
+def entry_hash(rows: list) -> str:
+    """
+    Content hash of the rows produced by one json entry
+    """
+    return hashlib.sha1(json.dumps(rows).encode()).hexdigest()
+
+
+def parse_source(code: str) -> tuple:
+    """
+    (gen, method, level, extra) of a showdown learnset source code, "8L12"
+    -> (8, "L", 12, None), "6S0" -> (6, "S", None, "0")
+    """
+    match = SOURCE_CODE.fullmatch(code)
+    if match is None:
+        raise ValueError(f"Learnset source {code!r} not recognised!")
+
+    gen, method, extra = match.groups()
+
+    if method == "L":
+        return int(gen), method, int(extra), None
+
+    return int(gen), method, None, extra or None
+
+
+def drop_learnset_chunks(db: Database):
+    """
+    Clear out the wide learnset_N chunk tables of older builds
+    """
+    with db.checkout() as conn:
+        chunks = conn.execute("SELECT name FROM sqlite_master "
+                              "WHERE type='table' AND name GLOB 'learnset_[0-9]*'").fetchall()
+    for (table,) in chunks:
+        db.execute(f"DROP TABLE IF EXISTS {table}")
+
 
 class Conversion:
     """
     Simple class that stores information on converting the json data to sql
     """
 
-    __slots__ = ["fieldname", "jsonpath", "datatype", "multipath"]
+    __slots__ = ["fieldname", "jsonpath", "datatype", "multipath", "index", "_getter"]
 
-    def __init__(self, fieldname: str, jsonpath: list, datatype: str):
+    def __init__(self, fieldname: str, jsonpath: list, datatype: str, index: bool | list = False):
         self.fieldname = fieldname
         self.jsonpath = jsonpath
         self.datatype = datatype
         # if we give a list of lists, flag this conversion as multi-key
         self.multipath = isinstance(jsonpath[0], list)
+        # index this column, a list of further columns makes it a covering index
+        self.index = index
+
+        self._getter = None
+
+    @property
+    def index_columns(self) -> list | None:
+        if self.index is False:
+            return None
+        if self.index is True:
+            return [self.fieldname]
+        return [self.fieldname] + list(self.index)
+
+    @property
+    def paths(self) -> list:
+        if self.multipath:
+            return self.jsonpath
+        return [self.jsonpath]
+
+    @staticmethod
+    def compile_path(path: list):
+        """
+        Compile a json path into a direct nested lookup, `data["a"]["b"][0]`
+
+        Returns None wherever the path does not exist. String keys are
+        followed before int indices, and (without indices) only leaf values
+        are returned, never dicts
+        """
+        keys = [item for item in path if not isinstance(item, int)]
+        idx = [item for item in path if isinstance(item, int)]
+
+        lookup = "".join(f"[{item!r}]" for item in keys + idx)
+        leaf = "" if idx else "\n    if isinstance(value, dict):\n        return None"
+
+        source = (f"def get(data):\n"
+                  f"    try:\n"
+                  f"        value = data{lookup}\n"
+                  f"    except (KeyError, IndexError, TypeError):\n"
+                  f"        return None{leaf}\n"
+                  f"    return value\n")
+
+        namespace = {}
+        exec(source, namespace)
+
+        return namespace["get"]
+
+    def compile(self):
+        """
+        Build a function returning this field's sql ready value from a json entry
+        """
+        field = self.fieldname
+        lookups = [self.compile_path(p) for p in self.paths]
+
+        if len(lookups) == 1:
+            lookup = lookups[0]
+        else:
+            def lookup(data):
+                # all paths must agree, where they exist
+                value = None
+                for get in lookups:
+                    v = get(data)
+                    if value is None:
+                        value = v
+                    elif v != value and v is not None:
+                        raise ValueError(f"got differing values for field {field}, {v} vs {value}")
+                return value
+
+        match self.datatype:
+            case "TEXT":
+                def getter(data):
+                    value = lookup(data)
+                    if value is None:
+                        return None
+                    return remove_sql_illegal_characters(str(value))
+            case "BOOL":
+                def getter(data):
+                    value = lookup(data)
+                    if value is None:
+                        return None
+                    return int(bool(value))
+            case "INT":
+                def getter(data):
+                    value = lookup(data)
+                    if isinstance(value, bool):
+                        return 101
+                    return value
+            case _:
+                getter = lookup
+
+        return getter
+
+    @property
+    def getter(self):
+        """
+        Compiled on first use
+        """
+        if self._getter is None:
+            self._getter = self.compile()
+        return self._getter
+
+
+def compile_row(conversions: list):
+    """
+    Function producing a row tuple from a json entry, one value per conversion
+    """
+    getters = [conversion.getter for conversion in conversions]
+
+    def row(data: dict) -> tuple:
+        return tuple([get(data) for get in getters])
+
+    return row
 
 
 class Injector:
@@ -36,11 +198,46 @@ class Injector:
     Schema definition is done by a list of Conversion objects within a `convert` property
     """
 
-    def __init__(self, file):
+    # column lists to index, created once the table is filled (along with
+    # those hinted by the conversions)
+    indexes = []
+    # column identifying which json entry a row came from
+    key = "id"
+
+    def __init__(self, file, verbose: bool = False, incremental: bool = False, report: bool = False,
+                 source=None, pragmas: dict | None = None):
+        # a file that already exists may be served, only build without a
+        # journal where asked to (a private staging file), see Database.bulk
+        if pragmas is None:
+            pragmas = UPDATE_PRAGMAS if os.path.exists(file) else BUILD_PRAGMAS
+        self._pragmas = pragmas
+
         self._db = Database(file)
+        self._verbose = verbose
+
+        # build from another json file than the class default
+        if source is not None:
+            self.source = source
 
-        self.create()
-        self.fill()
+        if report:
+            self.report()
+
+        self.summary = None
+        if incremental and self.can_update():
+            self.summary = self.update()
+
+            changed = sum(len(keys) for keys in self.summary.values())
+            print(f"{self.name}: " + ", ".join(f"{len(v)} {k}" for k, v in self.summary.items()))
+            if changed == 0:
+                # nothing to invalidate
+                return
+        else:
+            self.create()
+            self.fill()
+            self.create_indexes()
+
+        # lets long-lived readers (and their caches) notice the new data
+        self.db.stamp_build_version()
 
     @property
     def db(self):
@@ -54,6 +251,10 @@ class Injector:
     def connection(self):
         return self.db.connection
 
+    @property
+    def verbose(self):
+        return self._verbose
+
     @property
     def name(self):
         raise NotImplementedError
@@ -66,6 +267,28 @@ class Injector:
     def convert(self):
         raise NotImplementedError
 
+    @property
+    def columns(self) -> list:
+        return [conversion.fieldname for conversion in self.convert]
+
+    def log(self, *args, **kwargs):
+        """
+        Per-entry progress output, only printed when verbose
+        """
+        if self.verbose:
+            print(*args, **kwargs)
+
+    def load(self) -> dict:
+        with open(self.source) as o:
+            return json.load(o)
+
+    def prepare(self, name: str, data: dict) -> dict:
+        """
+        A json entry as the conversions see it, with its key as the id
+        """
+        # the json key is the showdown id, which learnsets refer to
+        return {**data, "id": name}
+
     def create(self):
         print("recreating database")
         cols = []
@@ -76,211 +299,262 @@ class Injector:
 
         self.db.create_table(self.name, cols, types, force=True)
 
-    def fill(self):
+    def entries(self):
+        """
+        Yield (key, rows) for each json entry, rows being tuples ordered as `columns`
+        """
+        row = compile_row(self.convert)
 
-        def flatten_dict(data: dict) -> [list, list]:
-            """
-            Return a list of all keys within a dict
-            """
-            keys = []
-            vals = []
+        for name, data in self.load().items():
+            if data["num"] < 0:
+                self.log(f"skipped item {name}")
+                continue
+
+            self.log(f"parsing item {name}")
+
+            yield name, [row(self.prepare(name, data))]
+
+    def coverage(self) -> dict:
+        """
+        Map each (flattened, "a/b/c") json key in the source to whether
+        any conversion takes a value from it
+        """
+
+        def walk(data: dict, prefix: str = ""):
             for k, v in data.items():
                 if isinstance(v, dict):
-                    newkeys, newvals =  flatten_dict(v)
+                    walk(v, f"{prefix}{k}/")
+                elif f"{prefix}{k}" not in data_fields:
+                    data_fields[f"{prefix}{k}"] = False
 
-                    keys += [f"{k}/{val}" for val in newkeys]
-                    vals += newvals
-                else:
-                    keys.append(k)
-                    vals.append(v)
+        lookups = []
+        for conversion in self.convert:
+            for p in conversion.paths:
+                path = "/".join(item for item in p if not isinstance(item, int))
+                lookups.append((path, Conversion.compile_path(p)))
 
-            return keys, vals
+        data_fields = {}
+        for name, data in self.load().items():
+            data = self.prepare(name, data)
+            walk(data)
 
-        with open(self.source) as o:
-            raw = json.load(o)
+            if data["num"] < 0:
+                continue
 
-        conn = self.connection
-        data_fields = {}
-        for name, data in raw.items():
-            print(f"parsing item {name}", end="... ")
+            for path, get in lookups:
+                if not data_fields.get(path) and get(data) is not None:
+                    data_fields[path] = True
 
-            keys, vals = flatten_dict(data)
-            flat_data = {k: v for k, v in zip(keys, vals)}
+        return data_fields
 
-            for key in keys:
-                if key not in data_fields:
-                    data_fields[key] = False
+    def report(self):
+        """
+        Print the json keys used by the conversions
+        """
+        data_fields = self.coverage()
+
+        print("data types used:")
+        maxlen = max([len(k) for k in data_fields], default=0)
+        for key in sorted(list(data_fields.keys())):
+            v = data_fields[key]
+            print(key.ljust(maxlen), v)
 
-            num = data["num"]
+    def rows(self):
+        for _, rows in self.entries():
+            yield from rows
 
-            if num < 0:
-                print("Skipped.")
-                continue
+    @property
+    def insert_cmd(self) -> str:
+        cols = self.columns
 
-            fields = []
-            values = []
-            for convert in self.convert:
-                # get the field, path(s) and data type
-                field = convert.fieldname
-                jpath = convert.jsonpath
-                dtype = convert.datatype
-                # if we're not multipathing, just add the path to a list and proceed
-                if not convert.multipath:
-                    jpath = [jpath]
-
-                # iterate over all paths, adding the result to vals, to be reduced later
-                vals = []
-                for p in jpath:
-                    # need to separate out string and int "paths"
-                    path = []
-                    idx = []
-                    for item in p:
-                        if isinstance(item, int):
-                            idx.append(item)
-                        else:
-                            path.append(item)
-                    path = "/".join(path)
-
-                    value = flat_data.get(path, None)
-
-                    for i in idx:
-                        try:
-                            value = value[i]
-                        except IndexError:
-                            # this index doesn't exist, invalidate the result
-                            value = None
-
-                    if value is not None:
-                        data_fields[path] = True
-
-                    vals.append(value)
+        return (f"INSERT INTO {self.name} (" + ", ".join(cols) + ") "
+                f"VALUES (" + ", ".join(["?"] * len(cols)) + ")")
 
-                value = None
-                for v in vals:
-                    if value is None:
-                        value = v
-                    elif v != value and v is not None:
-                        raise ValueError(f"got differing values for field {field}, {v} vs {value}")
+    def create_hash_table(self):
+        self.db.execute("CREATE TABLE if NOT EXISTS entry_hash "
+                        "(tablename TEXT, key TEXT, hash TEXT, PRIMARY KEY (tablename, key))")
 
-                if value is None:
+    def fill(self):
+        """
+        Insert all `rows` in a single bulk transaction, recording entry hashes
+        """
+        self.create_hash_table()
+
+        hashes = []
+
+        def rows():
+            for key, entry in self.entries():
+                hashes.append((self.name, key, entry_hash(entry)))
+                yield from entry
+
+        with self.db.bulk(self._pragmas) as conn:
+            conn.executemany(self.insert_cmd, rows())
+
+            conn.execute("DELETE FROM entry_hash WHERE tablename = ?", (self.name,))
+            conn.executemany("INSERT INTO entry_hash (tablename, key, hash) VALUES (?, ?, ?)", hashes)
+
+    def can_update(self) -> bool:
+        """
+        An incremental update needs a table of the same schema, built with entry hashes
+        """
+        with self.db.checkout() as conn:
+            existing = [c[1] for c in conn.execute(f"PRAGMA table_info({self.name})")]
+            try:
+                hashed = conn.execute("SELECT 1 FROM entry_hash WHERE tablename = ? LIMIT 1",
+                                      (self.name,)).fetchone()
+            except sqlite3.OperationalError:
+                hashed = None
+
+        return existing == list(self.columns) and hashed is not None
+
+    def update(self) -> dict:
+        """
+        Apply only the entries that changed since the last build
+
+        Returns the keys touched, as {"inserted": [...], "updated": [...], "deleted": [...]}
+        """
+        with self.db.checkout() as conn:
+            stored = dict(conn.execute("SELECT key, hash FROM entry_hash WHERE tablename = ?",
+                                       (self.name,)).fetchall())
+
+        summary = {"inserted": [], "updated": [], "deleted": []}
+        delete = f"DELETE FROM {self.name} WHERE {self.key} = ?"
+        record = "INSERT OR REPLACE INTO entry_hash (tablename, key, hash) VALUES (?, ?, ?)"
+
+        # edits a served table, keep the journal so a failure rolls back
+        with self.db.bulk(UPDATE_PRAGMAS) as conn:
+            seen = set()
+            for key, entry in self.entries():
+                seen.add(key)
+
+                digest = entry_hash(entry)
+                previous = stored.get(key)
+                if previous == digest:
                     continue
 
-                if dtype == "INT" and isinstance(value, bool):
-                    value = 101
-
-                if dtype == "TEXT":
-                    values.append(f"'{remove_sql_illegal_characters(str(value))}'")
-                elif dtype == "BOOL":
-                    values.append(str(bool(value)))
+                if previous is None:
+                    summary["inserted"].append(key)
                 else:
-                    values.append(str(value))
+                    conn.execute(delete, (key,))
+                    summary["updated"].append(key)
+
+                conn.executemany(self.insert_cmd, entry)
+                conn.execute(record, (self.name, key, digest))
 
-                fields.append(field)
+            for key in sorted(stored.keys() - seen):
+                conn.execute(delete, (key,))
+                conn.execute("DELETE FROM entry_hash WHERE tablename = ? AND key = ?", (self.name, key))
+                summary["deleted"].append(key)
 
-            cmd = f"INSERT INTO {self.name} (" + ", ".join(fields) + ")\nVALUES (" + ", ".join(values) + ")"
+        for action, keys in summary.items():
+            for key in keys:
+                self.log(f"{action} {key}")
 
-            print("Done.")
+        return summary
 
-            cur = conn.cursor()
-            cur.execute(cmd)
-        conn.commit()
+    @property
+    def index_columns(self) -> list:
+        hinted = [c.index_columns for c in self.convert if c.index_columns is not None]
+        return self.indexes + hinted
 
-        print("data types used:")
-        maxlen = max([len(k) for k in data_fields])
-        for key in sorted(list(data_fields.keys())):
-            v = data_fields[key]
-            print(key.ljust(maxlen), v)
+    def create_indexes(self):
+        for columns in self.index_columns:
+            self.db.create_index(self.name, columns)
+
+        # statistics for the query planner to choose between them
+        self.db.execute(f"ANALYZE {self.name}")
 
 
 class Learnset(Injector):
+    """
+    Learnsets are stored in long format, one (pokemon, move) pair per row
+    """
 
     name = "learnset"
     source = SOURCE_LEARNSET
 
-    def create(self):
-        with open(self.source) as o:
-            rawdata = json.load(o)
-
-        flat = {}
-        allmoves = []
-        for poke, data in rawdata.items():
-            learnset = data.get("learnset", {})
-
-            flat[poke] = {}
-            for move, details in learnset.items():
-                if move not in allmoves:
-                    allmoves.append(move)
-
-                flat[poke][move] = ",".join(details)
+    convert = []
+    columns = ["pokemon", "move", "sources"]
+    indexes = [["move", "pokemon"],
+               ["pokemon", "move"]]
+    key = "pokemon"
 
-        # need to chunk the moves
-        chunksize = 100
-        nchunks = math.ceil(len(allmoves) / chunksize)
-
-        print(f"creating {nchunks} tables of size {chunksize} for {len(allmoves)} moves")
+    def create(self):
+        drop_learnset_chunks(self.db)
 
-        locations = {}
-        for i in range(nchunks):
-            name = f"{self.name}_{i}"
+        self.db.create_table(self.name, self.columns, ["TEXT"] * len(self.columns), force=True)
 
-            u = i * chunksize
-            v = min((i + 1) * chunksize, len(allmoves))
+    def entries(self):
+        for poke, data in self.load().items():
+            learnset = data.get("learnset", {})
 
-            slice = allmoves[u:v]
+            yield poke, [(poke, move, ",".join(details)) for move, details in learnset.items()]
 
-            locations[name] = slice
+            self.log(f"added learnset for pokemon {poke}")
 
-            self.db.create_table(name, ["pokemon"] + slice, ["TEXT"] * ((v - u) + 1), force=True)
+    def coverage(self) -> dict:
+        # stored verbatim, no conversions to report on
+        return {}
 
-        conn = self.connection
-        cur = conn.cursor()
-        for poke, learnset in flat.items():
-            if len(learnset) == 0:
-                continue
 
-            # need to fill all the tables one by one
-            for table, moves in locations.items():
-                overlap = list(set(moves) & set(learnset))
+class LearnsetSource(Injector):
+    """
+    The showdown source codes of each learnset entry, decoded one per row
 
-                this_learnset = []
-                for move in overlap:
-                    this_learnset.append(f"'{learnset[move]}'")
+    "8L12" is generation 8, method L (level up) at level 12, "6S0" is an
+    event (S) with the index of the event as `extra`. Methods are kept as
+    showdown's letters, see SOURCE_METHODS
+    """
 
-                # print(f"from table {table}, {poke} learns {this_learnset}")
+    name = "learnset_source"
+    source = SOURCE_LEARNSET
 
-                cols = ",".join(["pokemon"] + overlap)
-                vals = ",".join([f"'{poke}'"] + this_learnset)
+    convert = []
+    columns = ["pokemon", "move", "gen", "method", "level", "extra"]
+    types = ["TEXT", "TEXT", "INT", "TEXT", "INT", "TEXT"]
+    indexes = [["gen", "move"],
+               ["move", "method"],
+               ["pokemon", "move"]]
+    key = "pokemon"
 
-                cmd = f"INSERT INTO {table} ({cols}) VALUES ({vals})"
+    def create(self):
+        self.db.create_table(self.name, self.columns, self.types, force=True)
 
-                cur.execute(cmd)
+    def entries(self):
+        for poke, data in self.load().items():
+            rows = []
+            for move, details in data.get("learnset", {}).items():
+                for code in details:
+                    rows.append((poke, move) + parse_source(code))
 
-            print(f"added learnset for pokemon {poke}")
+            yield poke, rows
 
-        conn.commit()
+            self.log(f"added learnset sources for pokemon {poke}")
 
-    def fill(self):
-        return None
+    def coverage(self) -> dict:
+        # stored verbatim, no conversions to report on
+        return {}
 
 
 class Pokemon(Injector):
 
     convert = [Conversion("num", ["num"], "INT"),
-               Conversion("name", ["name"], "TEXT"),
-               Conversion("type1", ["types", 0], "TEXT"),
-               Conversion("type2", ["types", 1], "TEXT"),
-               Conversion("hp", ["baseStats", "hp"], "INT"),
-               Conversion("atk", ["baseStats", "atk"], "INT"),
-               Conversion("def", ["baseStats", "def"], "INT"),
-               Conversion("spa", ["baseStats", "spa"], "INT"),
-               Conversion("spd", ["baseStats", "spd"], "INT"),
-               Conversion("spe", ["baseStats", "spe"], "INT"),
+               Conversion("name", ["name"], "TEXT", index=True),
+               Conversion("type1", ["types", 0], "TEXT", index=["name"]),
+               Conversion("type2", ["types", 1], "TEXT", index=["name"]),
+               Conversion("hp", ["baseStats", "hp"], "INT", index=True),
+               Conversion("atk", ["baseStats", "atk"], "INT", index=True),
+               Conversion("def", ["baseStats", "def"], "INT", index=True),
+               Conversion("spa", ["baseStats", "spa"], "INT", index=True),
+               Conversion("spd", ["baseStats", "spd"], "INT", index=True),
+               Conversion("spe", ["baseStats", "spe"], "INT", index=True),
                Conversion("ability1", ["abilities", "0"],"TEXT"),
                Conversion("ability2", ["abilities", "1"], "TEXT"),
                Conversion("abilityH", ["abilities", "H"], "TEXT"),
                Conversion("abilityS", ["abilities", "S"], "TEXT"),
                Conversion("weight", ["weightkg"], "FLOAT"),
                Conversion("forme", ["forme"], "TEXT"),
+               Conversion("id", ["id"], "TEXT", index=True),
                ]
 
     name = "pokemon"
@@ -297,14 +571,14 @@ class Move(Injector):
     convert = [Conversion("num", ["num"], "INT"),
                Conversion("accuracy", ["accuracy"], "INT"),
                Conversion("breaksProtect", ["breaksProtect"], "BOOL"),
-               Conversion("category", ["category"], "TEXT"),
-               Conversion("critRatio", ["critRatio"], "INT"),
-               Conversion("power", ["basePower"], "INT"),
-               Conversion("name", ["name"], "TEXT"),
-               Conversion("type", ["type"], "TEXT"),
+               Conversion("category", ["category"], "TEXT", index=True),
+               Conversion("critRatio", ["critRatio"], "INT", index=True),
+               Conversion("power", ["basePower"], "INT", index=True),
+               Conversion("name", ["name"], "TEXT", index=True),
+               Conversion("type", ["type"], "TEXT", index=True),
                Conversion("target", ["target"], "TEXT"),
-               Conversion("pp", ["pp"], "INT"),
-               Conversion("priority", ["priority"], "INT"),
+               Conversion("pp", ["pp"], "INT", index=True),
+               Conversion("priority", ["priority"], "INT", index=True),
                # Conversion("recoilA", ["recoil", 0], "INT"),
                # Conversion("recoilB", ["recoil", 1], "INT"),
                Conversion("status", ["status"], "TEXT"),
@@ -373,16 +647,51 @@ class Move(Injector):
                Conversion("willCrit", ["willCrit"], "BOOL"),
                Conversion("volatileStatus", ["volatileStatus"], "TEXT"),
                Conversion("selfvolatileStatus", ["self," "volatileStatus"], "TEXT"),
+               Conversion("id", ["id"], "TEXT", index=True),
+               Conversion("isMax", ["isMax"], "BOOL"),
+               Conversion("isZ", ["isZ"], "BOOL"),
+               Conversion("hiddenPower", ["hiddenPower"], "BOOL"),
                ]
 
     name = "moves"
     source = SOURCE_MOVES
 
+    # move searches leave out the max, z and hidden power variants
+    indexes = [["isMax", "isZ", "hiddenPower"]]
+
+    def prepare(self, name: str, data: dict) -> dict:
+        """
+        Adds the flags as 0/1 rather than NULL when absent. isMax and isZ
+        hold the species or crystal name where set
+        """
+        return {**super().prepare(name, data),
+                "isMax": bool(data.get("isMax")),
+                "isZ": bool(data.get("isZ")),
+                "hiddenPower": name.startswith("hiddenpower")}
+
 
 if __name__ == "__main__":
 
     path = package_root() / pathlib.Path("sql/test.db")
 
-    pokes = Pokemon(path)
-    moves = Move(path)
-    learn = Learnset(path)
+    # only apply changed entries with `--incremental`
+    incremental = "--incremental" in sys.argv
+    # print the json keys used by the conversions with `--report`
+    report = "--report" in sys.argv
+    # build into a staging file and rename it over `path` with `--swap`
+    # (`--wal` to build it in WAL mode), rather than rebuild in place
+    swap = "--swap" in sys.argv
+
+    if swap:
+        injectors = [Pokemon, Move, Learnset, LearnsetSource]
+        with Staging.staged(path, injectors, wal="--wal" in sys.argv) as db:
+            for injector in injectors:
+                injector(db.file, report=report, pragmas=BUILD_PRAGMAS).db.close()
+    else:
+        pokes = Pokemon(path, incremental=incremental, report=report)
+        moves = Move(path, incremental=incremental, report=report)
+        learn = Learnset(path, incremental=incremental, report=report)
+        sources = LearnsetSource(path, incremental=incremental, report=report)
+
+    # for processes that only need quick lookups, see src/Snapshot.py
+    Snapshot.write(path)
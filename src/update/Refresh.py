@@ -0,0 +1,152 @@
+"""
+End to end data refresh: showdown typescript -> json -> database
+
+The three showdown conversions run concurrently in a process pool, and each
+table is built into its own staging database as soon as its json is ready.
+The staging databases are then attached and merged into a new file, which
+is validated and renamed over the target (see Staging.py), so readers of
+the target never see a partial build.
+"""
+import concurrent.futures
+import pathlib
+import sys
+import tempfile
+
+from src import Snapshot, package_root
+from src.Database import BUILD_PRAGMAS, UPDATE_PRAGMAS, Database
+from src.update import ShowdownInterface, Staging
+from src.update.CreateDatabase import Learnset, LearnsetSource, Move, Pokemon, drop_learnset_chunks
+
+
+# showdown file name -> the Injectors building from its json
+INJECTORS = {"pokedex": (Pokemon,),
+             "moves": (Move,),
+             "learnsets": (Learnset, LearnsetSource)}
+
+# bookkeeping tables, merged separately from the data tables
+INTERNAL = ("metadata", "entry_hash")
+
+
+def build_stage(name: str, file) -> str:
+    """
+    Build the tables for showdown file `name` into its own database at `file`
+    """
+    for injector in INJECTORS[name]:
+        # nobody reads a stage, build it without a journal
+        injector(file, pragmas=BUILD_PRAGMAS).db.close()
+    return name
+
+
+def merge(db: Database, stages: dict, pragmas: dict = BUILD_PRAGMAS):
+    """
+    Copy every table (with its indexes and entry hashes) from the staging
+    databases in `stages` into `db`, in a single transaction
+
+    Pass UPDATE_PRAGMAS when `db` is being served, see Database.bulk
+    """
+    drop_learnset_chunks(db)
+
+    with db.checkout() as conn:
+        # ATTACH is not allowed inside a transaction
+        for i, file in enumerate(stages.values()):
+            conn.execute(f"ATTACH DATABASE ? AS stage{i}", (str(file),))
+
+        try:
+            conn.execute("CREATE TABLE if NOT EXISTS entry_hash "
+                         "(tablename TEXT, key TEXT, hash TEXT, PRIMARY KEY (tablename, key))")
+
+            with db.bulk(pragmas):
+                for i in range(len(stages)):
+                    schema = conn.execute(f"SELECT type, name, sql FROM stage{i}.sqlite_master "
+                                          f"WHERE sql IS NOT NULL").fetchall()
+
+                    tables = [(name, sql) for kind, name, sql in schema
+                              if kind == "table" and name not in INTERNAL and not name.startswith("sqlite_")]
+                    indexes = [sql for kind, name, sql in schema
+                               if kind == "index" and not name.startswith("sqlite_")]
+
+                    for name, sql in tables:
+                        print(f"merging table {name}")
+                        conn.execute(f"DROP TABLE IF EXISTS main.{name}")
+                        conn.execute(sql)
+                        conn.execute(f"INSERT INTO main.{name} SELECT * FROM stage{i}.{name}")
+
+                        conn.execute("DELETE FROM main.entry_hash WHERE tablename = ?", (name,))
+                        conn.execute(f"INSERT INTO main.entry_hash SELECT * FROM stage{i}.entry_hash "
+                                     f"WHERE tablename = ?", (name,))
+
+                    for sql in indexes:
+                        conn.execute(sql)
+        finally:
+            for i in range(len(stages)):
+                conn.execute(f"DETACH DATABASE stage{i}")
+
+    db.execute("ANALYZE")
+    db.stamp_build_version()
+
+
+def stage_counts(stages: dict) -> dict:
+    """
+    Rows per data table across the staging databases, what the merge must hold
+    """
+    counts = {}
+    for file in stages.values():
+        with Database(file, cache_size=0) as db:
+            for (table,) in db.fetchall("SELECT name FROM sqlite_master WHERE type = 'table'"):
+                if table not in INTERNAL and not table.startswith("sqlite_"):
+                    counts[table] = db.fetchall(f"SELECT COUNT(*) FROM {table}")[0][0]
+
+    return counts
+
+
+def refresh(target=package_root() / "sql/test.db", convert: bool = True, workers: int | None = None,
+            swap: bool = True, wal: bool = False):
+    """
+    Convert the showdown data (unless `convert` is False) and rebuild `target`
+
+    By default the merge goes to a staging file swapped in over `target`
+    once it validates (`wal` builds it in WAL mode). With `swap` False the
+    tables of `target` are replaced in place
+    """
+    target = pathlib.Path(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=target.parent) as tmp:
+        stages = {name: pathlib.Path(tmp) / f"{name}.db" for name in INJECTORS}
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            if convert:
+                pending = {pool.submit(ShowdownInterface.update, name): name for name in INJECTORS}
+            else:
+                pending = {pool.submit(build_stage, name, stages[name]): None for name in INJECTORS}
+
+            # start each table build as soon as its conversion is done
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    converted = pending.pop(future)
+                    future.result()
+
+                    if converted is not None:
+                        pending[pool.submit(build_stage, converted, stages[converted])] = None
+
+        if swap:
+            injectors = [injector for group in INJECTORS.values() for injector in group]
+            with Staging.staged(target, injectors, wal=wal, expected=stage_counts(stages)) as db:
+                merge(db, stages)
+        else:
+            with Database(target) as db:
+                merge(db, stages, UPDATE_PRAGMAS)
+
+    Snapshot.write(target)
+
+
+if __name__ == "__main__":
+    # `--no-convert` rebuilds from the existing json files, `--in-place`
+    # replaces the tables of the served file rather than swapping in a new one.
+    # The database to rebuild may be given, sql/test.db by default
+    files = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    target = files[0] if files else package_root() / "sql/test.db"
+
+    refresh(target, convert="--no-convert" not in sys.argv, swap="--in-place" not in sys.argv,
+            wal="--wal" in sys.argv)
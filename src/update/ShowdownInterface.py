@@ -6,9 +6,8 @@ https://github.com/smogon/pokemon-showdown/blob/master/sim/global-types.ts
 """
 import json
 
-import yaml
-
 from src import package_root
+from src.update.TypescriptParser import iter_entries
 
 
 ROOT = package_root()
@@ -18,8 +17,16 @@ def collect_data(file: str) -> dict:
     """
     Extract Information from the showdown typescript files
     """
+    return dict(iter_entries(file))
+
+
+def collect_data_yaml(file: str) -> dict:
+    """
+    Original extraction, rewriting the typescript into YAML line by line
 
-    file =
+    Slow and memory hungry, kept as a reference for `collect_data`
+    """
+    import yaml
 
     with open(file) as o:
         raw = o.readlines()
@@ -90,11 +97,24 @@ def dump_data(data, file):
         json.dump(data, o, indent = 2)
 
 
+def dump_entries(entries, file):
+    """
+    Write (key, value) pairs as they arrive, identical to `dump_data` of their dict
+    """
+    with open(file, "w+") as o:
+        o.write("{")
+        sep = "\n"
+        for key, value in entries:
+            body = json.dumps(value, indent = 2).replace("\n", "\n  ")
+            o.write(f"{sep}  {json.dumps(key)}: {body}")
+            sep = ",\n"
+        o.write("\n}" if sep != "\n" else "}")
+
+
 def update(name):
     print(f"updating {name}")
-    data = collect_data(ROOT / f"pokemon-showdown/data/{name}.ts")
-    with open(ROOT / f"jsondata/{name}.json", "w+") as o:
-        json.dump(data, o, indent = 2)
+    entries = iter_entries(ROOT / f"pokemon-showdown/data/{name}.ts")
+    dump_entries(entries, ROOT / f"jsondata/{name}.json")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Zero-downtime rebuilds: the new database is built in a staging file next to
+the served one, checked, and renamed over it in one atomic step
+
+Readers never see a half-built file. Those with the old file open keep
+reading it (the rename leaves their inode alone) until they notice the
+swap and reopen, see Database.checkout
+"""
+import os
+import pathlib
+import sqlite3
+from contextlib import contextmanager
+
+from src.Database import Database
+
+
+def staging_path(target) -> pathlib.Path:
+    """
+    Where the next build of `target` is written, on the same filesystem so
+    that the swap is a rename
+    """
+    target = pathlib.Path(target)
+    return target.with_name(target.name + ".staging")
+
+
+def remove(file):
+    """
+    Delete a database file along with any journal sqlite left beside it
+    """
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        try:
+            os.remove(f"{file}{suffix}")
+        except FileNotFoundError:
+            pass
+
+
+def validate(file, injectors: list, expected: dict | None = None) -> dict:
+    """
+    Check a built database before it is served, returning its row counts
+
+    Every injector's table must exist with the injector's columns and hold
+    rows (exactly `expected[table]` of them if given), the file must pass
+    sqlite's quick_check and carry a build version. Raises ValueError
+    """
+    expected = {} if expected is None else expected
+
+    counts = {}
+    conn = sqlite3.connect(file)
+    try:
+        check = conn.execute("PRAGMA quick_check").fetchall()
+        if check != [("ok",)]:
+            raise ValueError(f"{file} failed quick_check: {check}")
+
+        for injector in injectors:
+            table = injector.name
+            if len(injector.convert) == 0:
+                wanted = list(injector.columns)
+            else:
+                wanted = [c.fieldname for c in injector.convert]
+
+            columns = [c[1] for c in conn.execute(f"PRAGMA table_info({table})")]
+            if columns != wanted:
+                raise ValueError(f"{file}: table {table} has columns {columns}, expected {wanted}")
+
+            counts[table] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            if counts[table] == 0:
+                raise ValueError(f"{file}: table {table} is empty")
+            if table in expected and counts[table] != expected[table]:
+                raise ValueError(f"{file}: table {table} has {counts[table]} rows, expected {expected[table]}")
+
+        try:
+            version = conn.execute("SELECT value FROM metadata WHERE key = 'build_version'").fetchone()
+        except sqlite3.OperationalError:
+            version = None
+        if version is None:
+            raise ValueError(f"{file} has no build version")
+    finally:
+        conn.close()
+
+    return counts
+
+
+def swap(staging, target):
+    """
+    Atomically replace `target` with the finished `staging` file
+    """
+    # a journal left by the old file would be replayed into the new one
+    for suffix in ("-journal", "-wal", "-shm"):
+        if os.path.exists(f"{staging}{suffix}"):
+            raise ValueError(f"{staging} still has a {suffix[1:]} file, close its connections first")
+
+    os.replace(staging, target)
+
+
+@contextmanager
+def staged(target, injectors: list, wal: bool = False, expected: dict | None = None):
+    """
+    Yield a Database on a fresh staging file for `target`, then validate
+    and swap it in once the block completes. The injectors (or merge) stamp
+    the build version as they finish
+
+    With `wal`, the build runs in WAL mode. The file is returned to a
+    rollback journal before the swap, as readers of a WAL database find its
+    -wal file by path, and would pick up the old file's
+
+    Nothing is swapped if the block (or the validation) raises, the staging
+    file is removed and `target` is left as it was
+
+    >>> with staged("test.db", [Pokemon]) as db:
+    >>>     Pokemon(db.file, pragmas=BUILD_PRAGMAS)
+    """
+    target = pathlib.Path(target)
+    staging = staging_path(target)
+
+    # left over from a build that died
+    remove(staging)
+
+    try:
+        with Database(staging) as db:
+            if wal:
+                db.execute("PRAGMA journal_mode = WAL")
+
+            yield db
+
+            if wal:
+                db.execute("PRAGMA journal_mode = DELETE")
+
+        counts = validate(staging, injectors, expected)
+        swap(staging, target)
+    except BaseException:
+        remove(staging)
+        raise
+
+    print(f"swapped in {target}: " + ", ".join(f"{n} {table}" for table, n in counts.items()))
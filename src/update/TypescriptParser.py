@@ -0,0 +1,283 @@
+"""
+Single pass parser for the object literals in showdown's data files
+
+Only the data subset of typescript is understood: objects, arrays, strings,
+numbers and literals. Functions (methods, `function` expressions and arrow
+functions) are skipped over by bracket matching, flagging the top level
+entry with `callback: True`, as are the `condition` blocks that hold them.
+"""
+import ast
+import re
+
+from src import package_root
+
+
+TOKEN = re.compile(r"""
+      (?P<ws>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\]|\\.)*`)
+    | (?P<number>-?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<name>[A-Za-z_$][\w$]*)
+    | (?P<punct>=>|\.\.\.|\S)
+    """, re.VERBOSE | re.DOTALL)
+
+LITERALS = {"true": True, "false": False, "null": None, "undefined": None}
+
+OPEN = {"{": "}", "[": "]", "(": ")"}
+CLOSE = {"}", "]", ")"}
+
+# marker for skipped function values
+CODE = object()
+
+
+def tokenize(text: str):
+    """
+    Yield (kind, text) tokens, dropping whitespace and comments
+    """
+    for match in TOKEN.finditer(text):
+        kind = match.lastgroup
+        if kind == "ws" or kind == "comment":
+            continue
+        yield kind, match.group()
+
+
+def decode_string(token: str) -> str:
+    body = token[1:-1]
+    if "\\" not in body:
+        return body
+
+    if token[0] == "`":
+        token = '"' + body.replace('"', '\\"') + '"'
+
+    return ast.literal_eval(token)
+
+
+def decode_number(token: str) -> int | float:
+    if "." in token or "e" in token or "E" in token:
+        return float(token)
+    return int(token)
+
+
+class ObjectParser:
+    """
+    Recursive descent over a token stream, see module docstring
+    """
+
+    def __init__(self, text: str):
+        self._tokens = tokenize(text)
+        self._peeked = None
+
+        # set whenever a function is skipped, reset per top level entry
+        self.had_code = False
+
+    def next(self) -> tuple:
+        if self._peeked is not None:
+            token, self._peeked = self._peeked, None
+            return token
+
+        try:
+            return next(self._tokens)
+        except StopIteration:
+            raise ValueError("unexpected end of file") from None
+
+    def peek(self) -> tuple:
+        if self._peeked is None:
+            self._peeked = self.next()
+        return self._peeked
+
+    def expect(self, text: str):
+        _, found = self.next()
+        if found != text:
+            raise ValueError(f"expected {text!r}, got {found!r}")
+
+    def skip_to_export(self):
+        """
+        Skip the imports and type annotations, up to the `= {` of the export
+        """
+        while self.next() != ("name", "export"):
+            pass
+        while self.next()[1] != "=":
+            pass
+        self.expect("{")
+
+    def skip_balanced(self, depth: int = 0):
+        """
+        Skip tokens until the bracket open at `depth` is closed
+        """
+        while True:
+            _, text = self.next()
+            if text in OPEN:
+                depth += 1
+            elif text in CLOSE:
+                depth -= 1
+                if depth <= 0:
+                    return
+
+    def skip_function(self, in_params: bool = False):
+        """
+        Skip the remainder of a method or `function`, through its body
+        """
+        if in_params:
+            self.skip_balanced(1)
+
+        # parameters and any return type annotation, up to the body
+        while True:
+            _, text = self.next()
+            if text == "{":
+                break
+            if text == "(":
+                self.skip_balanced(1)
+
+        self.skip_balanced(1)
+        self.had_code = True
+
+    def skip_arrow_body(self):
+        if self.peek()[1] == "{":
+            self.next()
+            self.skip_balanced(1)
+        else:
+            # expression body, runs until the enclosing , or close
+            depth = 0
+            while True:
+                _, text = self.peek()
+                if depth == 0 and (text == "," or text in CLOSE):
+                    break
+                self.next()
+                if text in OPEN:
+                    depth += 1
+                elif text in CLOSE:
+                    depth -= 1
+
+        self.had_code = True
+
+    def key(self, kind: str, text: str) -> str:
+        if kind == "string":
+            return decode_string(text)
+        if kind == "name" or kind == "number":
+            return text
+        raise ValueError(f"unexpected key {text!r}")
+
+    def parse_value(self):
+        kind, text = self.next()
+
+        if text == "{":
+            return self.parse_object()
+        if text == "[":
+            return self.parse_array()
+        if kind == "string":
+            return decode_string(text)
+        if kind == "number":
+            return decode_number(text)
+
+        if kind == "name":
+            if text == "function":
+                self.skip_function()
+                return CODE
+            if self.peek()[1] == "=>":
+                self.next()
+                self.skip_arrow_body()
+                return CODE
+            if text in LITERALS:
+                return LITERALS[text]
+            # bare references to constants, kept as their name
+            return text
+
+        if text == "(":
+            # the parameter list of an arrow function
+            self.skip_balanced(1)
+            self.expect("=>")
+            self.skip_arrow_body()
+            return CODE
+
+        raise ValueError(f"unexpected token {text!r}")
+
+    def parse_array(self) -> list:
+        out = []
+        while True:
+            if self.peek()[1] == "]":
+                self.next()
+                return out
+
+            value = self.parse_value()
+            if value is not CODE:
+                out.append(value)
+
+            _, text = self.next()
+            if text == "]":
+                return out
+            if text != ",":
+                raise ValueError(f"expected ',' or ']', got {text!r}")
+
+    def parse_object(self) -> dict:
+        out = {}
+        while True:
+            kind, text = self.next()
+            if text == "}":
+                return out
+            if text == ",":
+                continue
+
+            key = self.key(kind, text)
+
+            kind, text = self.next()
+            # modifiers such as `async` or `get` before a method name
+            while kind == "name":
+                key = text
+                kind, text = self.next()
+
+            if text == "(":
+                # method shorthand, `onHit(target) {...}`
+                self.skip_function(in_params=True)
+                continue
+            if text != ":":
+                raise ValueError(f"expected ':' after {key!r}, got {text!r}")
+
+            if key == "condition":
+                # effect definitions, made almost entirely of callbacks
+                self.parse_value()
+                self.had_code = True
+                continue
+
+            value = self.parse_value()
+            if value is not CODE:
+                out[key] = value
+
+    def entries(self):
+        """
+        Yield (key, value) for each top level entry of the exported object
+        """
+        self.skip_to_export()
+
+        while True:
+            kind, text = self.next()
+            if text == "}":
+                return
+            if text == ",":
+                continue
+
+            key = self.key(kind, text)
+            self.expect(":")
+
+            self.had_code = False
+            value = self.parse_value()
+
+            if isinstance(value, dict) and self.had_code:
+                value["callback"] = True
+
+            yield key, value
+
+
+def iter_entries(file):
+    """
+    Yield (key, value) for each entry of a showdown data file, one at a time
+    """
+    with open(file) as o:
+        text = o.read()
+
+    yield from ObjectParser(text).entries()
+
+
+if __name__ == "__main__":
+    for key, value in iter_entries(package_root() / "pokemon-showdown/data/pokedex.ts"):
+        print(key, value)
+        break
@@ -8,7 +8,15 @@ def remove_sql_illegal_characters(input_string: str) -> str:
     return cleaned_string
 
 
+def to_id(name: str) -> str:
+    """
+    Convert a display name to a showdown id, "Swords Dance" -> "swordsdance"
+    """
+    return re.sub(r'[^a-z0-9]', '', name.lower())
+
+
 if __name__ == "__main__":
     input_string = "my table-n'ame!_123"
     cleaned_identifier = remove_sql_illegal_characters(input_string)
     print(cleaned_identifier)
+    print(to_id("10,000,000 Volt Thunderbolt"))
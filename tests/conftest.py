@@ -0,0 +1,46 @@
+import pathlib
+
+import pytest
+
+from src.Database import Database
+from src.update.CreateDatabase import Learnset, LearnsetSource, Move, Pokemon
+
+
+FIXTURES = pathlib.Path(__file__).parent / "fixtures"
+
+# injector -> its fixture json, a small slice of the showdown data
+SOURCES = {Pokemon: FIXTURES / "pokedex.json",
+           Move: FIXTURES / "moves.json",
+           Learnset: FIXTURES / "learnsets.json",
+           LearnsetSource: FIXTURES / "learnsets.json"}
+
+
+def build(file, sources: dict | None = None, **kwargs):
+    """
+    Build every table into `file` from the fixtures, or from `sources`
+    (injector -> json) where given
+    """
+    sources = {**SOURCES, **(sources or {})}
+
+    for injector, source in sources.items():
+        injector(file, source=source, **kwargs).db.close()
+
+    return file
+
+
+@pytest.fixture(scope="session")
+def dbfile(tmp_path_factory):
+    """
+    A database built from the fixtures, shared by the whole session: never
+    write to it, copy it first
+    """
+    return build(tmp_path_factory.mktemp("db") / "test.db")
+
+
+@pytest.fixture
+def db(dbfile):
+    """
+    The fixture database, without the result cache
+    """
+    with Database(dbfile, cache_size=0) as db:
+        yield db
@@ -0,0 +1,46 @@
+import asyncio
+
+from src.AsyncDatabase import AsyncDatabase
+from src.Search.AsyncSearch import AsyncMoveSearch, AsyncStatSearch, AsyncTypeSearch
+from src.Search.MoveSearch import MoveSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+def test_results_match_sync(db, dbfile):
+    async def main():
+        async with AsyncDatabase(dbfile) as adb:
+            return await asyncio.gather(AsyncTypeSearch(adb).search("fire"),
+                                        AsyncStatSearch(adb).search("spe >= 100"),
+                                        AsyncMoveSearch(adb).power("> 100"))
+
+    fire, fast, strong = asyncio.run(main())
+
+    assert fire == TypeSearch(db).search("fire")
+    assert fast == StatSearch(db).search("spe >= 100")
+    assert strong == MoveSearch(db).power("> 100")
+
+
+def test_search_closes_the_database_it_opened(dbfile):
+    async def main():
+        async with AsyncTypeSearch(dbfile) as types:
+            await types.search("fire")
+        return types
+
+    types = asyncio.run(main())
+
+    assert types.adb.db.pool.closed
+    assert types.adb._executor._shutdown
+
+
+def test_search_leaves_a_shared_database_open(dbfile):
+    async def main():
+        async with AsyncDatabase(dbfile) as adb:
+            async with AsyncTypeSearch(adb) as types:
+                await types.search("fire")
+
+            # still usable by its owner
+            assert not adb.db.pool.closed
+            return await AsyncStatSearch(adb).search("spe >= 100")
+
+    assert asyncio.run(main())
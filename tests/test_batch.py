@@ -0,0 +1,56 @@
+from src.Search.BaseSearch import BaseSearch
+from src.Search.Batch import Batch
+from src.Search.MoveSearch import MoveSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+REQUESTS = [("find_name", "Bulbasaur"),
+            ("find_name", ["Charizard", "Mew", "Bulbasaur"]),
+            # name order and table order differ
+            ("find_name", ["Vulpix", "Mew", "Bulbasaur"]),
+            ("find_name", "Nothere"),
+            ("type", "fire"),
+            ("type", ["water", "grass"]),
+            ("stat", "spe >= 100"),
+            ("stat", "hp < 50"),
+            ("stat", "atk != 49"),
+            ("learns", ["Tackle"]),
+            ("learns", ["tackle", "flamethrower"]),
+            ("learns", ["tackle", "flamethrower"], False),
+            ("learns", ["notamove"]),
+            ("power", "> 100"),
+            ("pp", "<= 5"),
+            ("priority", "> 0"),
+            ("crit_ratio", ">= 2")]
+
+
+def individually(db, request: tuple) -> list:
+    kind, *args = request
+
+    match kind:
+        case "find_name":
+            return db.find_name(*args)
+        case "type":
+            return TypeSearch(db).search(*args)
+        case "stat":
+            return StatSearch(db).search(*args)
+        case "learns":
+            return BaseSearch(db).search_by_moves(*args)
+
+    return getattr(MoveSearch(db), kind)(*args)
+
+
+def test_batch_matches_individual_calls(db):
+    results = Batch(db).run(REQUESTS)
+
+    for request in REQUESTS:
+        assert results[Batch.key(request)] == individually(db, request), request
+
+
+def test_batch_runs_duplicates_once(db):
+    requests = [("type", "fire"), ("type", "fire"), ("stat", "spe >= 100")]
+
+    results = Batch(db).run(requests)
+
+    assert len(results) == 2
@@ -0,0 +1,70 @@
+import shutil
+
+from src.Daemon import Service
+from src.Database import Database
+from src.Search.TypeSearch import TypeSearch
+
+
+def test_service_answers_requests(db, dbfile):
+    service = Service(dbfile)
+    try:
+        assert service.handle({"request": ["type", "fire"]}) == {"ok": True, "result": TypeSearch(db).search("fire")}
+        assert service.handle({"batch": [["type", "fire"], ["find_name", "Mew"]]})["result"] \
+            == [TypeSearch(db).search("fire"), db.find_name("Mew")]
+
+        error = service.handle({"request": ["nope"]})
+        assert not error["ok"] and error["error"] == "ValueError"
+    finally:
+        service.close()
+
+
+def test_service_waits_for_a_missing_database(dbfile, tmp_path):
+    file = tmp_path / "later.db"
+
+    service = Service(file)
+    try:
+        assert service.build_version is None
+        # opening the file must not have created it
+        assert not file.exists()
+
+        error = service.handle({"request": ["type", "fire"]})
+        assert not error["ok"] and error["error"] == "FileNotFoundError"
+
+        shutil.copy(dbfile, file)
+        assert service.handle({"request": ["type", "fire"]})["ok"]
+        assert service.build_version is not None
+    finally:
+        service.close()
+
+
+def test_reload_closes_the_replaced_database(dbfile, tmp_path):
+    file = shutil.copy(dbfile, tmp_path / "served.db")
+
+    service = Service(file)
+    try:
+        old = service.db
+        with service._current():
+            # a rebuild swapped in while a request is running
+            shutil.copy(dbfile, tmp_path / "next.db")
+            (tmp_path / "next.db").replace(file)
+
+            assert service.reload()
+            assert not old.pool.closed
+
+        assert old.pool.closed
+        assert service.db is not old
+    finally:
+        service.close()
+
+
+def test_missing_learnset_still_serves(dbfile, tmp_path):
+    file = shutil.copy(dbfile, tmp_path / "nolearnset.db")
+    with Database(file) as db:
+        db.execute("DROP TABLE learnset", commit=True)
+
+    # warming the learnset index fails, the other searches answer
+    service = Service(file)
+    try:
+        assert service.handle({"request": ["type", "fire"]})["ok"]
+    finally:
+        service.close()
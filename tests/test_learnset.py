@@ -0,0 +1,62 @@
+import shutil
+
+import pytest
+
+from src.Database import Database
+from src.Search.SourceSearch import SourceSearch
+from src.update.CreateDatabase import Learnset, parse_source
+from tests.conftest import SOURCES
+
+
+def tables(file) -> set:
+    with Database(file, cache_size=0) as db:
+        return {name for (name,) in db.fetchall("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_rebuilding_learnset_keeps_learnset_source(dbfile, tmp_path):
+    copy = shutil.copy(dbfile, tmp_path / "test.db")
+
+    # wide chunk tables, as older builds left them
+    with Database(copy) as db:
+        for i in (0, 1, 12):
+            db.execute(f"CREATE TABLE learnset_{i} (pokemon TEXT)", commit=True)
+
+    Learnset(copy, source=SOURCES[Learnset]).db.close()
+
+    found = tables(copy)
+    assert "learnset_source" in found
+    assert "learnset" in found
+    assert not {"learnset_0", "learnset_1", "learnset_12"} & found
+
+    with Database(copy, cache_size=0) as db:
+        assert db.fetchall("SELECT COUNT(*) FROM learnset_source")[0][0] > 0
+
+
+@pytest.mark.parametrize("code, expected", [("8L12", (8, "L", 12, None)),
+                                            ("6S0", (6, "S", None, "0")),
+                                            ("7M", (7, "M", None, None))])
+def test_parse_source(code, expected):
+    assert parse_source(code) == expected
+
+
+def test_parse_source_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_source("L12")
+
+
+def test_source_search_matches_parsed_strings(db):
+    search = SourceSearch(db)
+
+    for move, in db.fetchall("SELECT DISTINCT move FROM learnset ORDER BY move LIMIT 20"):
+        expected = set()
+        for pokemon, sources in db.fetchall("SELECT pokemon, sources FROM learnset WHERE move = ?", (move,)):
+            for code in sources.split(","):
+                gen, method, level, _ = parse_source(code)
+                if gen >= 7 and method == "L" and level <= 40:
+                    expected.add(pokemon)
+
+        found = set()
+        for gen in (7, 8, 9):
+            found |= set(search.search({"move": move, "gen": gen, "method": "L", "max_level": 40}))
+
+        assert found == expected, move
@@ -0,0 +1,64 @@
+import pytest
+
+from src.Search.MoveSearch import MoveSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+def full_sort(rows: list, descending: bool) -> list:
+    """
+    Names of (name, value, rowid) rows sorted as sqlite ranks them: NULLs
+    last in either direction, rowid breaking ties
+    """
+    sign = -1 if descending else 1
+    return [row[0] for row in sorted(rows, key=lambda r: (r[1] is None, sign * (r[1] or 0), sign * r[2]))]
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("size", [1, 7, 50])
+def test_page_through_nullable_column(db, descending, size):
+    search = MoveSearch(db)
+    where, params = search.where("pp > 0")
+    rows = search._search(f"SELECT name, critRatio, rowid FROM moves WHERE {where}", params)
+
+    # the case under test: some of the ranked rows are NULL, some not
+    assert any(r[1] is None for r in rows) and any(r[1] is not None for r in rows)
+
+    found, cursor = search.page("pp > 0", "critRatio", size=size, descending=descending)
+    while cursor is not None:
+        more, cursor = search.page("pp > 0", "critRatio", size=size, after=cursor, descending=descending)
+        assert len(more) > 0
+        found += more
+
+    assert found == full_sort(rows, descending)
+
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_ranked_nullable_column(db, descending):
+    search = MoveSearch(db)
+    where, params = search.where("pp > 0")
+    rows = search._search(f"SELECT name, critRatio, rowid FROM moves WHERE {where}", params)
+
+    assert list(search.ranked("pp > 0", "critRatio", descending=descending)) == full_sort(rows, descending)
+    assert list(search.ranked("pp > 0", "critRatio", descending=descending, limit=5, offset=3)) \
+        == full_sort(rows, descending)[3:8]
+
+
+def test_page_without_nulls(db):
+    search = TypeSearch(db)
+    rows = search._search("SELECT name, spe, rowid FROM pokemon WHERE type1 = 'Fire' OR type2 = 'Fire'")
+
+    found, cursor = search.page("fire", "spe", size=2)
+    while cursor is not None:
+        more, cursor = search.page("fire", "spe", size=2, after=cursor)
+        found += more
+
+    assert found == full_sort(rows, False)
+
+
+def test_top(db):
+    search = TypeSearch(db)
+    speeds = sorted((row[0] for row in db.fetchall("SELECT spe FROM pokemon WHERE type1 = 'Fire' OR type2 = 'Fire'")),
+                    reverse=True)
+    spe = dict(db.fetchall("SELECT name, spe FROM pokemon"))
+
+    assert [spe[name] for name in search.top("fire", "spe", k=3)] == speeds[:3]
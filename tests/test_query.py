@@ -0,0 +1,71 @@
+import pytest
+
+from src.Search.Query import Query
+
+
+@pytest.fixture
+def pokemon(db) -> dict:
+    """
+    name -> (type1, type2, hp, spe) of every pokemon
+    """
+    return {row[0]: row[1:] for row in db.fetchall("SELECT name, type1, type2, hp, spe FROM pokemon")}
+
+
+def names(pokemon: dict, test) -> set:
+    return {name for name, row in pokemon.items() if test(*row)}
+
+
+def test_type_matches_either_slot(db, pokemon):
+    expected = names(pokemon, lambda t1, t2, hp, spe: "Fire" in (t1, t2))
+
+    assert expected
+    assert set(Query(db).type("fire")) == expected
+
+
+def test_chained_predicates_are_anded(db, pokemon):
+    expected = names(pokemon, lambda t1, t2, hp, spe: "Fire" in (t1, t2) and spe >= 90)
+
+    assert set(Query(db).type("fire").stat("spe >= 90")) == expected
+    assert set(Query(db).type("fire") & Query(db).stat("spe >= 90")) == expected
+
+
+def test_or(db, pokemon):
+    expected = names(pokemon, lambda t1, t2, hp, spe: t1 == "Water" or t2 == "Water" or hp >= 100)
+
+    assert set(Query(db).type("water") | Query(db).stat("hp >= 100")) == expected
+
+
+def test_or_with_empty_query_matches_everything(db, pokemon):
+    assert set(Query(db).type("water") | Query(db)) == set(pokemon)
+
+
+def test_learns(db):
+    learners = {p for (p,) in db.fetchall("SELECT pokemon FROM learnset WHERE move = 'tackle'")}
+    ids = {name: i for name, i in db.fetchall("SELECT name, id FROM pokemon")}
+
+    assert learners
+    assert {ids[name] for name in Query(db).learns(["Tackle"])} == learners
+
+
+def test_not_is_the_complement(db, pokemon):
+    fire = set(Query(db).type("fire"))
+
+    assert set(~Query(db).type("fire")) == set(pokemon) - fire
+    assert set(~~Query(db).type("fire")) == fire
+
+
+def test_not_over_null_columns(db, pokemon):
+    # type2 is NULL for single typed pokemon, the comparison alone is NULL
+    single = names(pokemon, lambda t1, t2, hp, spe: t2 is None)
+    assert single
+
+    query = Query(db).type("water") | Query(db).stat("hp >= 100")
+    expected = set(pokemon) - set(query)
+
+    assert set(~query) == expected
+    assert set(~query & Query(db).stat("spe >= 50")) == names(
+        pokemon, lambda t1, t2, hp, spe: "Water" not in (t1, t2) and hp < 100 and spe >= 50)
+
+
+def test_not_of_empty_query_matches_nothing(db):
+    assert list(~Query(db)) == []
@@ -0,0 +1,29 @@
+import pytest
+
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+@pytest.mark.parametrize("query, where", [("spe >= 100", "spe >= 100"),
+                                          ("hp != 45", "hp <> 45"),
+                                          ("atk < 50", "atk < 50")])
+def test_stat_search_in_table_order(db, query, where):
+    expected = [name for (name,) in db.fetchall(f"SELECT name FROM pokemon WHERE {where} ORDER BY rowid")]
+
+    assert expected
+    assert StatSearch(db).search(query) == expected
+
+
+@pytest.mark.parametrize("query, types", [("fire", ("Fire",)), (["water", "grass"], ("Water", "Grass"))])
+def test_type_search_in_table_order(db, query, types):
+    rows = db.fetchall("SELECT name, type1, type2 FROM pokemon ORDER BY rowid")
+    expected = [name for name, type1, type2 in rows if type1 in types or type2 in types]
+
+    assert expected
+    assert TypeSearch(db).search(query) == expected
+
+
+def test_rows_in_table_order(db):
+    expected = db.fetchall("SELECT name, spe FROM pokemon WHERE spe >= 100 ORDER BY rowid")
+
+    assert [(p.name, p.spe) for p in StatSearch(db).rows("spe >= 100", ["name", "spe"])] == expected
@@ -0,0 +1,75 @@
+import shutil
+
+import pytest
+
+from src.Database import Database
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+np = pytest.importorskip("numpy")
+
+from src.Search.PokemonSnapshot import PokemonSnapshot  # noqa: E402
+
+
+# valid sql and snapshot expressions alike, over columns holding NULLs
+EXPRESSIONS = ["type2 = 'Flying'",
+               "type2 <> 'Flying'",
+               "type2 != 'Poison' AND spe > 60",
+               "NOT type2 = 'Flying'",
+               "NOT (type2 = 'Flying' OR hp > 100)",
+               "type2 <> 'Flying' OR spe > 100",
+               "type2 = 'Flying' OR spe > 100",
+               "type2 IN ('Flying', 'Poison')",
+               "type2 NOT IN ('Flying', 'Poison')",
+               "NOT type2 IN ('Flying')",
+               "abilityH <> 'Chlorophyll' AND hp >= 50",
+               "spe <> 100",
+               "NOT spe > 90",
+               "spe + atk >= 180",
+               "spe + atk < 180 OR type1 = 'Fire'",
+               "hp = 45"]
+
+
+@pytest.fixture
+def nullable(dbfile, tmp_path):
+    """
+    A copy of the fixture database with NULL stats as well
+    """
+    copy = shutil.copy(dbfile, tmp_path / "nullable.db")
+    with Database(copy) as db:
+        db.execute("UPDATE pokemon SET spe = NULL WHERE name IN ('Mew', 'Pikachu', 'Charizard')", commit=True)
+        db.execute("UPDATE pokemon SET hp = NULL WHERE name = 'Bulbasaur'", commit=True)
+
+    with Database(copy, cache_size=0) as db:
+        yield db
+
+
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_expression_matches_sql(nullable, expression):
+    expected = [name for (name,) in nullable.fetchall(f"SELECT name FROM pokemon WHERE {expression} ORDER BY rowid")]
+
+    assert PokemonSnapshot.load(nullable).names(expression) == expected
+
+
+@pytest.mark.parametrize("query", ["spe >= 100", "spe > 100", "spe == 100", "spe != 100", "spe <> 100",
+                                   "spe < 50", "spe <= 50", "hp != 45"])
+def test_stat_search_backends_agree(nullable, query):
+    expected = StatSearch(nullable).search(query)
+
+    assert StatSearch(nullable, snapshot=True).search(query) == expected
+
+
+def test_bst_is_null_with_any_stat(nullable):
+    snapshot = PokemonSnapshot.load(nullable)
+    expected = [name for (name,) in nullable.fetchall("SELECT name FROM pokemon "
+                                                      "WHERE hp + atk + def + spa + spd + spe > 300 ORDER BY rowid")]
+
+    assert snapshot.names("bst > 300") == expected
+    assert "Mew" not in snapshot.names("bst > 0")
+
+
+def test_snapshot_follows_rebuilds(db):
+    snapshot = PokemonSnapshot.load(db)
+
+    assert PokemonSnapshot.load(db) is snapshot
+    assert snapshot.names("type1 = 'Fire' OR type2 = 'Fire'") == TypeSearch(db).search("fire")
@@ -0,0 +1,57 @@
+import shutil
+
+import pytest
+
+from src import Snapshot
+from src.Database import Database
+from src.Search.BaseSearch import BaseSearch
+from src.Search.StatSearch import StatSearch
+from src.Search.TypeSearch import TypeSearch
+
+
+@pytest.fixture
+def snapshot(dbfile, tmp_path):
+    """
+    A snapshot of a copy of the fixture database, with the copy
+    """
+    copy = shutil.copy(dbfile, tmp_path / "test.db")
+    with Snapshot.Snapshot(Snapshot.write(copy)) as snapshot:
+        yield snapshot, copy
+
+
+@pytest.mark.parametrize("query", ["fire", "water", ["water", "grass"], "notatype"])
+def test_type_matches_type_search(db, snapshot, query):
+    assert snapshot[0].type(query) == TypeSearch(db).search(query)
+
+
+@pytest.mark.parametrize("query", ["spe >= 100", "spe > 100", "hp == 45", "atk != 49", "def <> 49",
+                                   "spa < 50", "spd <= 50"])
+def test_stat_matches_stat_search(db, snapshot, query):
+    assert snapshot[0].stat(query) == StatSearch(db).search(query)
+
+
+@pytest.mark.parametrize("name", ["pikachu", "Mew", ["Vulpix", "Mew", "Bulbasaur"], ["Nothere"]])
+def test_find_name_matches_database(db, snapshot, name):
+    assert snapshot[0].find_name(name) == db.find_name(name)
+
+
+@pytest.mark.parametrize("moves, match_all", [(["tackle"], True),
+                                              (["tackle", "flamethrower"], True),
+                                              (["tackle", "flamethrower"], False),
+                                              (["Flame Thrower", "notamove"], False)])
+def test_learns_matches_search_by_moves(db, snapshot, moves, match_all):
+    assert snapshot[0].learns(moves, match_all) == BaseSearch(db).search_by_moves(moves, match_all)
+
+
+def test_stale_after_rebuild_or_removal(snapshot):
+    snapshot, copy = snapshot
+    assert not snapshot.stale(copy)
+
+    with Database(copy) as db:
+        db.stamp_build_version()
+    assert snapshot.stale(copy)
+
+    copy.unlink()
+    assert snapshot.stale(copy)
+    # probing did not leave an empty database behind
+    assert not copy.exists()
@@ -0,0 +1,105 @@
+import json
+import shutil
+
+import pytest
+
+from src.Database import BUILD_PRAGMAS, UPDATE_PRAGMAS, Database
+from src.update.CreateDatabase import Learnset, LearnsetSource, Move, Pokemon
+from tests.conftest import SOURCES, build
+
+
+TABLES = ("pokemon", "moves", "learnset", "learnset_source")
+
+
+def edited(tmp_path) -> dict:
+    """
+    The fixtures with entries changed, removed and added, as injector -> json
+    """
+    pokedex = json.loads(SOURCES[Pokemon].read_text())
+    pokedex["bulbasaur"]["baseStats"]["spe"] = 145
+    del pokedex["ivysaur"]
+    pokedex["testmon"] = {**pokedex["charmander"], "num": 9999, "name": "Testmon", "types": ["Water"]}
+
+    moves = json.loads(SOURCES[Move].read_text())
+    moves["tackle"]["basePower"] = 55
+    del moves["surf"]
+
+    learnsets = json.loads(SOURCES[Learnset].read_text())
+    learnsets["bulbasaur"]["learnset"]["tackle"] = ["9L1", "8E"]
+    del learnsets["venusaur"]
+    learnsets["testmon"] = {"learnset": {"flamethrower": ["9M"]}}
+
+    files = {}
+    for injector, data in ((Pokemon, pokedex), (Move, moves), (Learnset, learnsets), (LearnsetSource, learnsets)):
+        files[injector] = tmp_path / f"{injector.name}.json"
+        files[injector].write_text(json.dumps(data))
+
+    return files
+
+
+def contents(file) -> dict:
+    with Database(file, cache_size=0) as db:
+        return {table: sorted(db.fetchall(f"SELECT * FROM {table}"), key=repr) for table in TABLES}
+
+
+def test_incremental_update_matches_rebuild(dbfile, tmp_path):
+    sources = edited(tmp_path)
+
+    updated = tmp_path / "updated.db"
+    shutil.copy(dbfile, updated)
+    with Database(updated) as db:
+        before = db.build_version
+
+    build(updated, sources, incremental=True)
+    rebuilt = build(tmp_path / "rebuilt.db", sources)
+
+    assert contents(updated) == contents(rebuilt)
+
+    with Database(updated) as db:
+        assert db.build_version != before
+
+
+def test_incremental_update_summary(dbfile, tmp_path):
+    sources = edited(tmp_path)
+
+    updated = tmp_path / "updated.db"
+    shutil.copy(dbfile, updated)
+
+    pokes = Pokemon(updated, incremental=True, source=sources[Pokemon])
+    pokes.db.close()
+
+    assert pokes.summary == {"inserted": ["testmon"], "updated": ["bulbasaur"], "deleted": ["ivysaur"]}
+
+
+def test_unchanged_update_keeps_build_version(dbfile, tmp_path):
+    updated = tmp_path / "updated.db"
+    shutil.copy(dbfile, updated)
+    with Database(updated) as db:
+        before = db.build_version
+
+    build(updated, incremental=True)
+
+    with Database(updated) as db:
+        assert db.build_version == before
+
+
+@pytest.mark.parametrize("table", TABLES)
+def test_fixture_tables_are_filled(dbfile, table):
+    with Database(dbfile, cache_size=0) as db:
+        assert db.fetchall(f"SELECT COUNT(*) FROM {table}")[0][0] > 0
+
+
+def test_build_pragmas_only_for_new_files(dbfile, tmp_path):
+    # journal_mode OFF must never touch a file that may be served
+    existing = shutil.copy(dbfile, tmp_path / "served.db")
+    pokes = Pokemon(existing, source=SOURCES[Pokemon])
+    pokes.db.close()
+    assert pokes._pragmas == UPDATE_PRAGMAS
+
+    fresh = Pokemon(tmp_path / "new.db", source=SOURCES[Pokemon])
+    fresh.db.close()
+    assert fresh._pragmas == BUILD_PRAGMAS
+
+    with Database(existing) as db:
+        assert db.fetchall("PRAGMA journal_mode")[0][0] != "off"
+        assert contents(existing)["pokemon"] == contents(dbfile)["pokemon"]